@@ -1,13 +1,42 @@
+import time
+STARTUP_T0 = time.perf_counter()  # referencia del modo --startup-time
 import json
+import csv
+import argparse
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, filedialog, simpledialog
-import requests
 import base64
 from urllib.parse import urlparse
 import os
 import re
 import sys
+import queue
+import logging
+import logging.handlers
+import contextlib
+import collections
+import random
+import bisect
+import difflib
+import hashlib
+import subprocess
+import threading
 import tkinter.font as tkfont
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("nwlmanager")
+
+# requests (con su pila TLS) es con diferencia lo más lento de importar: se carga en el
+# primer uso para que la ventana aparezca antes
+requests = None
+
+def load_requests():
+    """Importa requests si aún no se ha hecho y lo deja en el global del módulo."""
+    global requests
+    if requests is None:
+        import requests as module
+        requests = module
+    return requests
 
 # DPI Awareness para una mejor renderización en Windows
 try:
@@ -18,8 +47,1881 @@ except ImportError:
 except Exception:
     pass  # Para versiones antiguas de Windows
 
+class GitHubTokenAuth:
+    """Añade el token solo a las peticiones dirigidas a la API de GitHub (no a AREDL)."""
+
+    def __init__(self, token, host="api.github.com"):
+        self.token = token
+        self.host = host
+
+    def __call__(self, request):
+        if urlparse(request.url).hostname == self.host:
+            request.headers['Authorization'] = f'token {self.token}'
+        return request
+
+class RateLimitError(IOError):
+    """La cuota de la API está agotada; reset es el instante (epoch) en que se restablece.
+
+    Deriva de IOError, como las excepciones de requests, para no tener que importarlo al arrancar.
+    """
+
+    def __init__(self, message, reset=None, response=None):
+        super().__init__(message)
+        self.reset = reset
+        self.response = response
+
+class RateLimitTracker:
+    """Estado de la cuota de cada API según las cabeceras de todas sus respuestas.
+
+    Lee X-RateLimit-Limit/Remaining/Reset y Retry-After. Con la cuota baja reparte las
+    peticiones que quedan hasta el reinicio (las encola entre todos los hilos); agotada,
+    espera si el reinicio está cerca o falla enseguida con un mensaje claro.
+    """
+
+    LOW_FRACTION = 0.1     # por debajo de esta fracción del límite se empieza a frenar
+    MAX_PACING = 2.0       # espera máxima entre peticiones al frenar
+    MAX_QUEUE_WAIT = 60.0  # hasta cuánto se espera a que la cuota se restablezca
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hosts = {}  # host -> {"limit", "remaining", "reset", "blocked_until", "warned_reset"}
+        self._next_slot = {}  # host -> instante a partir del cual puede salir la próxima petición
+
+    def update(self, response):
+        """Registra las cabeceras de cuota de una respuesta."""
+        headers = response.headers
+        host = urlparse(response.url).hostname
+        retry_after = headers.get("Retry-After")
+        if "X-RateLimit-Remaining" not in headers and not retry_after:
+            return
+        with self.lock:
+            state = self.hosts.setdefault(host, {"limit": None, "remaining": None, "reset": None,
+                                                 "blocked_until": 0.0, "warned_reset": None})
+            try:
+                if "X-RateLimit-Remaining" in headers:
+                    state["remaining"] = int(headers["X-RateLimit-Remaining"])
+                    state["limit"] = int(headers.get("X-RateLimit-Limit", state["limit"] or 0)) or None
+                    state["reset"] = float(headers.get("X-RateLimit-Reset", state["reset"] or 0)) or None
+                if retry_after and response.status_code in (403, 429):
+                    state["blocked_until"] = time.time() + float(retry_after)
+            except ValueError:
+                return
+            if (state["remaining"] is not None and state["limit"]
+                    and state["remaining"] <= state["limit"] * self.LOW_FRACTION
+                    and state["warned_reset"] != state["reset"]):
+                state["warned_reset"] = state["reset"]
+                logger.warning("%s: quedan %d de %d peticiones hasta %s", host, state["remaining"], state["limit"],
+                               time.strftime("%H:%M:%S", time.localtime(state["reset"] or time.time())))
+
+    def is_exhausted(self, response):
+        """True si la respuesta es un rechazo por cuota agotada (no un 403 de permisos)."""
+        return (response.status_code in (403, 429)
+                and response.headers.get("X-RateLimit-Remaining") == "0")
+
+    def snapshot(self, host):
+        with self.lock:
+            state = self.hosts.get(host)
+            return dict(state) if state else None
+
+    def wait(self, url):
+        """Espera lo necesario antes de enviar una petición a url.
+
+        Lanza RateLimitError si la cuota está agotada y no se restablece pronto.
+        """
+        host = urlparse(url).hostname
+        now = time.time()
+        with self.lock:
+            state = self.hosts.get(host)
+            if not state:
+                return
+            resume = state["blocked_until"]
+            if state["remaining"] == 0 and state["reset"] and state["reset"] > now:
+                resume = max(resume, state["reset"] + 1)
+            if resume > now:
+                if resume - now > self.MAX_QUEUE_WAIT:
+                    raise RateLimitError(f"{host}: API rate limit exhausted until "
+                                         f"{time.strftime('%H:%M:%S', time.localtime(resume))}", reset=resume)
+                delay = resume - now
+            elif state["remaining"] is not None and state["limit"] and state["reset"] and \
+                    state["remaining"] <= state["limit"] * self.LOW_FRACTION:
+                # Repartir lo que queda hasta el reinicio, reservando turnos entre hilos
+                pacing = min(self.MAX_PACING, max(0.0, state["reset"] - now) / max(state["remaining"], 1))
+                start = max(now, self._next_slot.get(host, 0.0))
+                self._next_slot[host] = start + pacing
+                delay = start - now
+            else:
+                return
+        if delay > 0:
+            time.sleep(delay)
+
+class Trace:
+    """Una operación medida (abrir, guardar, reordenar, importar...) y sus fases."""
+
+    def __init__(self, tracer, trace_id, operation, attrs):
+        self.tracer = tracer
+        self.id = trace_id
+        self.operation = operation
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.finished = False
+
+    def span(self, phase, **attrs):
+        return self.tracer.span(phase, trace=self, **attrs)
+
+    def finish(self, **attrs):
+        """Registra la duración total (fase "total"); solo cuenta la primera llamada."""
+        if not self.finished:
+            self.finished = True
+            self.tracer.record(self, "total", time.perf_counter() - self.start, dict(self.attrs, **attrs))
+
+class Tracer:
+    """Instrumentación opcional ("tracing": true en config.json).
+
+    Cada fase medida se escribe como una línea JSON en trace.jsonl (rotado por tamaño) y
+    se guarda en memoria para el resumen p50/p95. Desactivado no escribe nada y apenas
+    cuesta. La operación activa de cada hilo se hereda, así las peticiones HTTP se
+    atribuyen a la carga o al guardado que las lanzó; los pools de hilos auxiliares la
+    reciben envolviendo su trabajo con bind().
+    """
+
+    MAX_SPANS = 5000
+    MAX_BYTES = 1024 * 1024
+    BACKUPS = 3
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.spans = collections.deque(maxlen=self.MAX_SPANS)
+        self.lock = threading.Lock()
+        self._local = threading.local()
+        self._ids = 0
+        self._writer = None
+
+    def configure(self, path, enabled=True):
+        self.enabled = enabled
+        self.path = path
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+        if enabled and path:
+            try:
+                self._writer = logging.handlers.RotatingFileHandler(path, maxBytes=self.MAX_BYTES,
+                                                                    backupCount=self.BACKUPS, encoding="utf-8")
+                self._writer.setFormatter(logging.Formatter("%(message)s"))
+            except OSError:
+                self._writer = None  # Sin archivo se sigue teniendo el resumen en memoria
+
+    def start(self, operation, **attrs):
+        with self.lock:
+            self._ids += 1
+            return Trace(self, self._ids, operation, attrs)
+
+    def current(self):
+        return getattr(self._local, "trace", None)
+
+    def bind(self, func):
+        """Envuelve func para que, ejecutada en otro hilo, cuente para la operación activa de este."""
+        trace = self.current()
+        if trace is None:
+            return func
+
+        def run(*args, **kwargs):
+            with self.activate(trace):
+                return func(*args, **kwargs)
+        return run
+
+    @contextlib.contextmanager
+    def activate(self, trace):
+        """Hace que las fases de este hilo (p. ej. HTTP) cuenten para trace."""
+        previous = self.current()
+        self._local.trace = trace
+        try:
+            yield trace
+        finally:
+            self._local.trace = previous
+
+    @contextlib.contextmanager
+    def span(self, phase, trace=None, **attrs):
+        """Mide un bloque. Se entrega el dict de atributos para añadir tamaños o estados."""
+        if not self.enabled:
+            yield attrs
+            return
+        trace = trace or self.current()
+        start = time.perf_counter()
+        try:
+            yield attrs
+        except Exception as e:
+            attrs["error"] = type(e).__name__
+            raise
+        finally:
+            self.record(trace, phase, time.perf_counter() - start, attrs)
+
+    def record(self, trace, phase, seconds, attrs):
+        if not self.enabled:
+            return
+        span = {
+            "ts": round(time.time(), 3),
+            "trace": trace.id if trace else None,
+            "operation": trace.operation if trace else "background",
+            "phase": phase,
+            "ms": round(seconds * 1000, 3),
+        }
+        span.update(attrs)
+        with self.lock:
+            self.spans.append(span)
+            if self._writer:
+                self._writer.emit(logging.makeLogRecord({"msg": json.dumps(span, ensure_ascii=False, default=str)}))
+
+    def summary(self):
+        """Devuelve [(operación, fase, número, p50 ms, p95 ms)] de las fases registradas."""
+        groups = {}
+        with self.lock:
+            for span in self.spans:
+                groups.setdefault((span["operation"], span["phase"]), []).append(span["ms"])
+        rows = []
+        for (operation, phase), values in sorted(groups.items()):
+            values.sort()
+            rows.append((operation, phase, len(values), self._percentile(values, 50), self._percentile(values, 95)))
+        return rows
+
+    @staticmethod
+    def _percentile(sorted_values, percent):
+        """Percentil por rango más cercano."""
+        rank = max(1, -(-len(sorted_values) * percent // 100))
+        return sorted_values[rank - 1]
+
+tracer = Tracer()
+
+class HttpSession:
+    """Sesión HTTP compartida con conexiones persistentes y reintentos con espera exponencial.
+
+    Reintenta los errores 5xx y los límites de tasa secundarios de GitHub (403/429 con
+    Retry-After o con el mensaje correspondiente) usando una espera con jitter.
+    """
+
+    RETRY_STATUSES = {500, 502, 503, 504}
+    IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "PATCH"}
+    MAX_RETRIES = 4
+    BACKOFF_BASE = 0.5
+    BACKOFF_MAX = 60.0
+    DEFAULT_TIMEOUT = (5, 30)  # (conexión, lectura) en segundos
+
+    def __init__(self, token="", pool_size=8):
+        self.token = token
+        self.pool_size = pool_size
+        self._session = None
+        self._session_lock = threading.Lock()
+        self.rate_limits = RateLimitTracker()
+
+    @property
+    def session(self):
+        """La sesión de requests se crea (e importa requests) con la primera petición."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    load_requests()
+                    session = requests.Session()
+                    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update({"User-Agent": "NWLManager"})
+                    session.auth = GitHubTokenAuth(self.token) if self.token else None
+                    self._session = session
+        return self._session
+
+    def set_token(self, token):
+        self.token = token
+        if self._session is not None:
+            self._session.auth = GitHubTokenAuth(token) if token else None
+
+    def request(self, method, url, **kwargs):
+        method = method.upper()
+        with tracer.span("http", method=method, url=urlparse(url).path) as span:
+            response = self._request(method, url, **kwargs)
+            if tracer.enabled:
+                span["status"] = response.status_code
+                # Con stream=True el cuerpo aún no se ha leído: basta la cabecera
+                span["bytes"] = int(response.headers.get("Content-Length") or 0) if kwargs.get("stream") else len(response.content)
+        return response
+
+    def _request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.DEFAULT_TIMEOUT)
+        session = self.session
+        attempt = 0
+        while True:
+            self.rate_limits.wait(url)
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                # Un POST pudo llegar al servidor: solo se repiten los métodos idempotentes
+                if attempt >= self.MAX_RETRIES or method not in self.IDEMPOTENT_METHODS:
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            self.rate_limits.update(response)
+            delay = self._retry_delay(response, attempt)
+            if delay is None or attempt >= self.MAX_RETRIES:
+                if self.rate_limits.is_exhausted(response):
+                    reset = self.rate_limits.snapshot(urlparse(url).hostname)["reset"]
+                    raise RateLimitError("API rate limit exhausted until "
+                                         f"{time.strftime('%H:%M:%S', time.localtime(reset or time.time()))}",
+                                         reset=reset, response=response)
+                return response
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+    def _backoff(self, attempt):
+        """Espera exponencial con jitter completo."""
+        return random.uniform(self.BACKOFF_BASE, min(self.BACKOFF_MAX, self.BACKOFF_BASE * (2 ** (attempt + 1))))
+
+    def _retry_delay(self, response, attempt):
+        """Devuelve cuántos segundos esperar antes de reintentar, o None si no hay que reintentar."""
+        if response.status_code in self.RETRY_STATUSES:
+            return self._backoff(attempt)
+        if response.status_code in (403, 429):
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.BACKOFF_MAX)
+                except ValueError:
+                    return self._backoff(attempt)
+            if response.status_code == 429 or "secondary rate limit" in response.text.lower():
+                return self._backoff(attempt)
+        return None
+
+def git_blob_sha(data):
+    """Calcula el SHA que GitHub asigna a un blob con este contenido."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+class JsonStyle:
+    """Formato de un archivo JSON: sangría, separadores, escapes y saltos de línea.
+
+    Se deduce del archivo descargado para reescribirlo igual: como los dict conservan
+    el orden de las claves, el diff de git muestra solo lo que cambia de verdad. Sin
+    archivo de referencia se usa el formato de la app (sangría de 2, sin escapar los
+    caracteres no ASCII, sin salto de línea final).
+    """
+
+    DETECT_BYTES = 4096
+    INDENT = re.compile(rb'\n([ \t]+)\S')
+    KEY_SEPARATOR = re.compile(rb'"[ \t]*:( ?)')
+    STRING = re.compile(rb'"(?:[^"\\]|\\.)*"')
+
+    def __init__(self, indent=2, item_separator=",", key_separator=": ", ensure_ascii=False, newline="\n", final_newline=False):
+        self.indent = indent
+        self.item_separator = item_separator
+        self.key_separator = key_separator
+        self.ensure_ascii = ensure_ascii
+        self.newline = newline
+        self.final_newline = final_newline
+
+    @classmethod
+    def detect(cls, data):
+        """Formato de data (bytes de un JSON); lo que no se puede deducir queda como en la app."""
+        # Se vacían las cadenas para que sus comas y dos puntos no cuenten como separadores
+        head = cls.STRING.sub(b'""', data[:cls.DETECT_BYTES])
+        indent = cls.INDENT.search(head)
+        key = cls.KEY_SEPARATOR.search(head)
+        return cls(
+            indent=indent.group(1).decode('ascii') if indent else None,
+            # Con sangría json.dumps separa los elementos con "," y salto de línea
+            item_separator="," if indent or b", " not in head else ", ",
+            key_separator=":" + (key.group(1).decode('ascii') if key else " "),
+            ensure_ascii=data.isascii() and b"\\u" in data,
+            newline="\r\n" if b"\r\n" in head else "\n",
+            final_newline=data.endswith(b"\n"),
+        )
+
+    def dumps(self, doc):
+        text = json.dumps(doc, indent=self.indent, separators=(self.item_separator, self.key_separator),
+                          ensure_ascii=self.ensure_ascii)
+        if self.newline != "\n":
+            text = text.replace("\n", self.newline)  # Dentro de las cadenas los saltos van escapados
+        return text + self.newline if self.final_newline else text
+
+    def encode(self, doc):
+        return self.dumps(doc).encode('utf-8')
+
+DEFAULT_JSON_STYLE = JsonStyle()
+
+class ContentCache:
+    """Caché en disco junto a config.json.
+
+    Guarda el contenido decodificado de cada archivo por el SHA de su blob (es inmutable,
+    así que nunca caduca) y las respuestas de la API con su ETag para poder hacer
+    peticiones condicionales (If-None-Match) que GitHub responde con 304.
+
+    Con max_age, las respuestas más antiguas se descartan al guardar el índice.
+    """
+
+    def __init__(self, base_dir, max_age=None):
+        self.base_dir = base_dir
+        self.blobs_dir = os.path.join(base_dir, "blobs")
+        self.index_path = os.path.join(base_dir, "index.json")
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.entries = {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (IOError, json.JSONDecodeError):
+            # Sin índice o corrupto: se empieza con la caché vacía
+            self.entries = {}
+
+    def _blob_path(self, sha):
+        return os.path.join(self.blobs_dir, sha[:2], sha[2:])
+
+    def get_blob(self, sha):
+        """Devuelve los bytes del blob o None si no está (o está dañado)."""
+        try:
+            with open(self._blob_path(sha), "rb") as f:
+                data = f.read()
+        except IOError:
+            return None
+        return data if git_blob_sha(data) == sha else None
+
+    def has_blob(self, sha):
+        return os.path.exists(self._blob_path(sha))
+
+    def put_blob(self, sha, data):
+        path = self._blob_path(sha)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._write_atomic(path, data)
+        except IOError:
+            pass  # La caché es opcional: un fallo de disco no debe romper la carga
+
+    def get_entry(self, url):
+        """Devuelve {"etag": ..., "data": ...} para una URL, o None."""
+        with self.lock:
+            return self.entries.get(url)
+
+    def put_entry(self, url, etag, data, persist=True):
+        """Guarda una respuesta; con persist=False queda en memoria hasta el próximo flush()."""
+        with self.lock:
+            self.entries[url] = {"etag": etag, "data": data, "fetched": time.time()}
+        if persist:
+            self.flush()
+
+    def drop_entries(self, prefix):
+        """Olvida las respuestas de las URL que empiezan por prefix."""
+        with self.lock:
+            stale = [url for url in self.entries if url.startswith(prefix)]
+            for url in stale:
+                del self.entries[url]
+        if stale:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            if self.max_age is not None:
+                oldest = time.time() - self.max_age
+                self.entries = {url: entry for url, entry in self.entries.items() if entry.get("fetched", 0) >= oldest}
+            snapshot = json.dumps(self.entries, ensure_ascii=False)
+        try:
+            os.makedirs(self.base_dir, exist_ok=True)
+            self._write_atomic(self.index_path, snapshot.encode("utf-8"))
+        except IOError:
+            pass
+
+    def _write_atomic(self, path, data):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+def parse_github_url(url):
+    """Extrae el propietario y el nombre del repo de una URL de GitHub."""
+    parsed = urlparse(url)
+    path_parts = parsed.path.strip('/').split('/')
+
+    if len(path_parts) >= 2:
+        owner = path_parts[0]
+        repo = path_parts[1]
+        return owner, repo
+    return None, None
+
+class GitHubClient:
+    """Acceso a la carpeta de JSONs de un repositorio de GitHub, sin dependencias de Tk.
+
+    Todos los métodos hacen E/S de red y deben llamarse desde un hilo de trabajo.
+    """
+
+    API_BASE = "https://api.github.com"
+
+    def __init__(self, http, cache, repo_url, folder_path):
+        self.http = http
+        self.cache = cache
+        self.owner, self.repo = parse_github_url(repo_url)
+        self.folder_path = folder_path.strip('/')
+        self.base_url = f"{self.API_BASE}/repos/{self.owner}/{self.repo}"
+
+    def contents_url(self, file_name=None):
+        if file_name is None:
+            return f"{self.base_url}/contents/{self.folder_path}"
+        return f"{self.base_url}/contents/{self.folder_path}/{file_name}"
+
+    def get_json_cached(self, api_url, transform=None):
+        """GET condicional: reutiliza la respuesta guardada si GitHub contesta 304 Not Modified.
+
+        transform reduce la respuesta a lo que merece la pena guardar en la caché.
+        """
+        entry = self.cache.get_entry(api_url)
+        headers = {'If-None-Match': entry['etag']} if entry else {}
+        response = self.http.get(api_url, headers=headers)
+        if response.status_code == 304 and entry:
+            return entry['data']
+        response.raise_for_status()
+        data = response.json()
+        if transform:
+            data = transform(data)
+        etag = response.headers.get('ETag')
+        if etag:
+            self.cache.put_entry(api_url, etag, data)
+        return data
+
+    def default_branch(self):
+        repo_info = self.get_json_cached(self.base_url, lambda info: {"default_branch": info['default_branch']})
+        return repo_info['default_branch']
+
+    def cached_listing(self):
+        """Último listado de la carpeta guardado en la caché (sin red), o None si no hay."""
+        entry = self.cache.get_entry(self.contents_url())
+        if not entry or not isinstance(entry.get('data'), list):
+            return None
+        return [file for file in entry['data'] if file['name'].endswith('.json')]
+
+    def list_files(self):
+        """Devuelve [{"name", "sha"}] con los JSON de la carpeta."""
+        files = self.get_json_cached(self.contents_url(), lambda files: [{"name": f['name'], "sha": f['sha']} for f in files])
+        return [file for file in files if file['name'].endswith('.json')]
+
+    def read_file(self, file_name, known_sha=None):
+        """Devuelve (bytes, sha) de un archivo de la carpeta.
+
+        Si el listado ya indicó el SHA y ese blob está en la caché no se hace ninguna
+        petición; si no, se pregunta a GitHub con If-None-Match.
+        """
+        if known_sha:
+            data = self.cache.get_blob(known_sha)
+            if data is not None:
+                return data, known_sha
+
+        api_url = self.contents_url(file_name)
+        entry = self.cache.get_entry(api_url)
+        headers = {'If-None-Match': entry['etag']} if entry else {}
+        response = self.http.get(api_url, headers=headers)
+        if response.status_code == 304 and entry:
+            sha = entry['data']['sha']
+            data = self.cache.get_blob(sha)
+            if data is not None:
+                return data, sha
+            # El blob desapareció de la caché: pedirlo de nuevo sin condición
+            response = self.http.get(api_url)
+        response.raise_for_status()
+
+        file_data = response.json()
+        if file_data.get('encoding') == 'base64' and (file_data.get('content') or not file_data.get('size')):
+            with tracer.span("decode", bytes=len(file_data['content'])):
+                data = base64.b64decode(file_data['content'])
+        else:
+            # Más de 1 MB: la API Contents no incluye el contenido ("encoding": "none")
+            data = self.download_blob(file_data['sha'])
+        self.cache.put_blob(file_data['sha'], data)
+        etag = response.headers.get('ETag')
+        if etag:
+            self.cache.put_entry(api_url, etag, {"sha": file_data['sha']})
+        return data, file_data['sha']
+
+    BLOB_CHUNK_SIZE = 256 * 1024
+
+    def download_blob(self, sha):
+        """Descarga un blob en crudo (sin base64) leyendo la respuesta por trozos.
+
+        La API Git Blobs con el media type raw sirve archivos de hasta 100 MB. Se
+        comprueba el SHA para no guardar en la caché un contenido incompleto.
+        """
+        with self.http.get(f"{self.base_url}/git/blobs/{sha}", headers={"Accept": "application/vnd.github.raw"}, stream=True) as response:
+            response.raise_for_status()
+            with tracer.span("download", sha=sha) as span:
+                data = b"".join(response.iter_content(chunk_size=self.BLOB_CHUNK_SIZE))
+                span["bytes"] = len(data)
+        if git_blob_sha(data) != sha:
+            raise load_requests().exceptions.ContentDecodingError(f"blob {sha}: downloaded content does not match its SHA")
+        return data
+
+    def sync_folder(self, max_workers=8):
+        """Rellena la caché con todos los JSON de la carpeta.
+
+        Usa el árbol recursivo de la rama (una petición) y pide en paralelo solo los
+        blobs que aún no están en caché. Devuelve los archivos encontrados y las
+        estadísticas (bytes, descargas, tiempo).
+        """
+        start = time.perf_counter()
+        stats = {"bytes": 0, "downloaded": 0}
+        stats_lock = threading.Lock()
+
+        response = self.http.get(f"{self.base_url}/git/trees/{self.default_branch()}", params={"recursive": "1"})
+        response.raise_for_status()
+        stats["bytes"] += len(response.content)
+        tree = response.json()
+
+        # Mismo criterio que el listado de la carpeta: solo los JSON de primer nivel
+        prefix = f"{self.folder_path}/"
+        files = [
+            {"name": entry['path'][len(prefix):], "sha": entry['sha']}
+            for entry in tree.get('tree', [])
+            if entry['type'] == 'blob' and entry['path'].startswith(prefix)
+            and '/' not in entry['path'][len(prefix):] and entry['path'].endswith('.json')
+        ]
+        files.sort(key=lambda f: f['name'])
+
+        def download(sha):
+            data = self.download_blob(sha)
+            self.cache.put_blob(sha, data)
+            with stats_lock:
+                stats["bytes"] += len(data)
+                stats["downloaded"] += 1
+
+        missing = list({f['sha'] for f in files if not self.cache.has_blob(f['sha'])})
+        if missing:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nwl-sync") as pool:
+                for future in [pool.submit(tracer.bind(download), sha) for sha in missing]:
+                    future.result()  # Propaga el primer error
+
+        return {
+            "files": files,
+            "truncated": tree.get('truncated', False),
+            "bytes": stats["bytes"],
+            "downloaded": stats["downloaded"],
+            "elapsed": time.perf_counter() - start,
+        }
+
+    # Respuestas de la API Contents cuando el SHA enviado no es el del archivo en la rama
+    SHA_CONFLICT_STATUSES = (409, 422)
+
+    def current_sha(self, file_name):
+        """Consulta el SHA actual de un archivo (condicional, así un 304 no gasta cuota)."""
+        return self.get_json_cached(self.contents_url(file_name), lambda file_data: {"sha": file_data['sha']})['sha']
+
+    def put_file(self, file_name, data, message, sha=None):
+        """Crea o actualiza un archivo con la API Contents. Devuelve el SHA del nuevo blob.
+
+        Se usa el SHA conocido; solo si GitHub lo rechaza (409/422) se consulta el
+        actual y se reintenta una vez.
+        """
+        commit_data = {"message": message, "content": base64.b64encode(data).decode('utf-8')}
+        if sha:
+            commit_data["sha"] = sha
+        response = self.http.put(self.contents_url(file_name), json=commit_data)
+        if response.status_code in self.SHA_CONFLICT_STATUSES:
+            commit_data["sha"] = self.current_sha(file_name)
+            response = self.http.put(self.contents_url(file_name), json=commit_data)
+        response.raise_for_status()
+        new_sha = response.json()['content']['sha']
+        self.cache.put_blob(new_sha, data)
+        return new_sha
+
+    def delete_file(self, file_name, sha, message):
+        commit_data = {"message": message, "sha": sha}
+        response = self.http.delete(self.contents_url(file_name), json=commit_data)
+        if response.status_code in self.SHA_CONFLICT_STATUSES:
+            commit_data["sha"] = self.current_sha(file_name)
+            response = self.http.delete(self.contents_url(file_name), json=commit_data)
+        response.raise_for_status()
+
+    def publish(self, changes, message, max_workers=4):
+        """Publica varios archivos en un único commit atómico con la API Git Data.
+
+        changes es {file_name: bytes, o None para borrarlo}. Se crean los blobs, un
+        árbol, un commit y se mueve la rama. Devuelve {file_name: sha nuevo o None}.
+        """
+        branch = self.default_branch()
+        response = self.http.get(f"{self.base_url}/git/ref/heads/{branch}")
+        response.raise_for_status()
+        head_sha = response.json()['object']['sha']
+
+        response = self.http.get(f"{self.base_url}/git/commits/{head_sha}")
+        response.raise_for_status()
+        base_tree = response.json()['tree']['sha']
+
+        def create_blob(data):
+            blob_response = self.http.post(f"{self.base_url}/git/blobs",
+                                           json={"content": base64.b64encode(data).decode('utf-8'), "encoding": "base64"})
+            blob_response.raise_for_status()
+            return blob_response.json()['sha']
+
+        uploads = {name: data for name, data in changes.items() if data is not None}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nwl-blob") as pool:
+            blob_futures = {name: pool.submit(tracer.bind(create_blob), data) for name, data in uploads.items()}
+            new_shas = {name: future.result() for name, future in blob_futures.items()}
+
+        tree_entries = [
+            {"path": f"{self.folder_path}/{name}", "mode": "100644", "type": "blob", "sha": new_shas.get(name)}
+            for name in changes
+        ]
+        response = self.http.post(f"{self.base_url}/git/trees", json={"base_tree": base_tree, "tree": tree_entries})
+        response.raise_for_status()
+        tree_sha = response.json()['sha']
+
+        response = self.http.post(f"{self.base_url}/git/commits",
+                                  json={"message": message, "tree": tree_sha, "parents": [head_sha]})
+        response.raise_for_status()
+        commit_sha = response.json()['sha']
+
+        # Sin force: si alguien publicó entretanto, GitHub rechaza el avance con 422
+        response = self.http.patch(f"{self.base_url}/git/refs/heads/{branch}", json={"sha": commit_sha})
+        response.raise_for_status()
+
+        for name, sha in new_shas.items():
+            self.cache.put_blob(sha, uploads[name])
+        return {name: new_shas.get(name) for name in changes}
+
+class GitCommandError(Exception):
+    """Fallo de una orden de git en el modo de copia local."""
+
+class LocalGitBackend:
+    """Backend de copia de trabajo: un clon local del repositorio editado con E/S de disco.
+
+    Tiene la misma interfaz que GitHubClient. Leer y listar no usa la red; escribir
+    crea commits locales. publish() y sync_folder() son los únicos que hablan con el
+    remoto: los commits pendientes se suben juntos en un solo push.
+    """
+
+    GIT = "git"
+    # Un único lock para todas las instancias: git no admite órdenes simultáneas sobre un mismo repo
+    lock = threading.Lock()
+
+    def __init__(self, repo_url, folder_path, clone_dir, remote=None, token=""):
+        self.owner, self.repo = parse_github_url(repo_url)
+        self.folder_path = folder_path.strip('/')
+        self.clone_dir = clone_dir
+        self.remote = remote or f"https://github.com/{self.owner}/{self.repo}.git"
+        self.token = token
+
+    def _git(self, *args, network=False, cwd=True):
+        command = [self.GIT]
+        if network and self.token and self.remote.startswith("https://github.com/"):
+            # El token va en una cabecera de esta orden; no se guarda en .git/config
+            credentials = base64.b64encode(f"x-access-token:{self.token}".encode()).decode()
+            command += ["-c", f"http.https://github.com/.extraheader=AUTHORIZATION: basic {credentials}"]
+        if cwd:
+            command += ["-C", self.clone_dir]
+        env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+        # El ejecutable se construye con --windowed: sin esto cada orden de git abriría una consola
+        flags = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
+        try:
+            result = subprocess.run(command + list(args), capture_output=True, text=True, env=env, creationflags=flags)
+        except OSError as e:
+            raise GitCommandError(f"git: {e}")
+        if result.returncode != 0:
+            raise GitCommandError((result.stderr or result.stdout).strip() or f"git {args[0]} failed")
+        return result.stdout
+
+    def _ensure_clone(self):
+        if os.path.isdir(os.path.join(self.clone_dir, ".git")):
+            return
+        with self.lock:
+            if not os.path.isdir(os.path.join(self.clone_dir, ".git")):
+                os.makedirs(os.path.dirname(os.path.abspath(self.clone_dir)), exist_ok=True)
+                self._git("clone", "--no-tags", "--single-branch", self.remote, self.clone_dir, network=True, cwd=False)
+                # Sin identidad global git no deja hacer commits ni rebases: se fija una para este clon
+                if not self._git_config("user.email"):
+                    self._git("config", "user.name", "NWL Manager")
+                    self._git("config", "user.email", "nwl-manager@users.noreply.github.com")
+
+    def _path(self, file_name):
+        return os.path.join(self.clone_dir, self.folder_path, file_name)
+
+    def _repo_path(self, file_name):
+        return f"{self.folder_path}/{file_name}" if self.folder_path else file_name
+
+    def default_branch(self):
+        self._ensure_clone()
+        return self._git("rev-parse", "--abbrev-ref", "HEAD").strip()
+
+    def cached_listing(self):
+        """El clon ya es local: list_files no usa la red, no hace falta un listado guardado."""
+        return None
+
+    def list_files(self):
+        """Devuelve [{"name", "sha"}] con los JSON de la carpeta del clon."""
+        self._ensure_clone()
+        folder = os.path.join(self.clone_dir, self.folder_path)
+        try:
+            names = sorted(name for name in os.listdir(folder) if name.endswith('.json') and os.path.isfile(os.path.join(folder, name)))
+        except FileNotFoundError:
+            return []
+        files = []
+        for name in names:
+            with open(os.path.join(folder, name), "rb") as f:
+                files.append({"name": name, "sha": git_blob_sha(f.read())})
+        return files
+
+    def read_file(self, file_name, known_sha=None):
+        self._ensure_clone()
+        with open(self._path(file_name), "rb") as f:
+            data = f.read()
+        return data, git_blob_sha(data)
+
+    def sync_folder(self, max_workers=None):
+        """Trae los cambios del remoto (rebase) y sube los commits locales pendientes."""
+        start = time.perf_counter()
+        self._ensure_clone()
+        with self.lock:
+            before = self._git("rev-parse", "HEAD").strip()
+            self._git("pull", "--rebase", "--no-tags", network=True)
+            changed = self._git("diff", "--name-only", before, "HEAD", "--", self.folder_path or ".").split()
+            self._push_pending()
+        return {
+            "files": self.list_files(),
+            "truncated": False,
+            "bytes": 0,
+            "downloaded": len(changed),
+            "elapsed": time.perf_counter() - start,
+        }
+
+    def _push_pending(self):
+        """Sube los commits locales; si el remoto avanzó, rebasa una vez y reintenta."""
+        try:
+            self._git("push", "origin", "HEAD", network=True)
+        except GitCommandError:
+            self._git("pull", "--rebase", "--no-tags", network=True)
+            self._git("push", "origin", "HEAD", network=True)
+
+    def _commit(self, paths, message):
+        present = [path for path in paths if os.path.exists(os.path.join(self.clone_dir, path))]
+        removed = [path for path in paths if path not in present]
+        if present:
+            self._git("add", "--", *present)
+        if removed:
+            self._git("rm", "-q", "--cached", "--ignore-unmatch", "--", *removed)
+        if not self._git("diff", "--cached", "--name-only"):
+            return False
+        self._git("commit", "-q", "-m", message)
+        return True
+
+    def _git_config(self, key):
+        try:
+            return self._git("config", "--get", key).strip()
+        except GitCommandError:
+            return ""
+
+    def _write(self, file_name, data):
+        path = self._path(file_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def put_file(self, file_name, data, message, sha=None):
+        """Escribe el archivo y crea un commit local (se sube con el próximo publish o sync)."""
+        self._ensure_clone()
+        with self.lock:
+            self._write(file_name, data)
+            self._commit([self._repo_path(file_name)], message)
+        return git_blob_sha(data)
+
+    def delete_file(self, file_name, sha, message):
+        self._ensure_clone()
+        with self.lock:
+            try:
+                os.remove(self._path(file_name))
+            except FileNotFoundError:
+                pass
+            self._commit([self._repo_path(file_name)], message)
+
+    def unpushed_commits(self):
+        """Número de commits locales que aún no están en la rama remota."""
+        if not os.path.isdir(os.path.join(self.clone_dir, ".git")):
+            return 0
+        try:
+            return int(self._git("rev-list", "--count", "@{u}..HEAD").strip() or 0)
+        except (GitCommandError, ValueError):
+            return 0  # Sin rama remota configurada no hay con qué comparar
+
+    def publish(self, changes, message, max_workers=None):
+        """Aplica todos los cambios en un único commit local y lo sube con un solo push."""
+        self._ensure_clone()
+        new_shas = {}
+        with self.lock:
+            for file_name, data in changes.items():
+                if data is None:
+                    try:
+                        os.remove(self._path(file_name))
+                    except FileNotFoundError:
+                        pass
+                    new_shas[file_name] = None
+                else:
+                    self._write(file_name, data)
+                    new_shas[file_name] = git_blob_sha(data)
+            self._commit([self._repo_path(name) for name in changes], message)
+            self._push_pending()
+        return new_shas
+
+def open_backend(config, http, cache, repo_url, folder_path):
+    """Backend configurado: la API de GitHub o, con "backend": "local", un clon con git."""
+    if config.get("backend") == "local":
+        clone_dir = config.get("local_clone") or os.path.join(os.path.dirname(get_config_path()), "clone")
+        return LocalGitBackend(repo_url, folder_path, clone_dir, config.get("git_remote"), config.get("github_token", ""))
+    return GitHubClient(http, cache, repo_url, folder_path)
+
+def backend_errors():
+    """Errores de red o del backend que se muestran al usuario como tales (no como inesperados)."""
+    return (load_requests().exceptions.RequestException, RateLimitError, GitCommandError)
+
+class AREDLClient:
+    """Cliente de la API de AREDL con caché en disco de duración limitada (TTL).
+
+    Los datos de un nivel apenas cambian, así que se reutilizan durante CACHE_TTL
+    segundos; pasado ese tiempo se revalidan con If-None-Match si hay ETag.
+    """
+
+    API_BASE = "https://api.aredl.net/v2/api/aredl/levels"
+    CACHE_TTL = 24 * 3600
+    # Pasado el TTL la respuesta aún sirve para revalidar con ETag; después se descarta
+    CACHE_KEEP = 7 * 24 * 3600
+
+    def __init__(self, http, cache, api_base=None, ttl=None):
+        self.http = http
+        self.cache = cache
+        self.api_base = (api_base or self.API_BASE).rstrip('/')
+        self.ttl = self.CACHE_TTL if ttl is None else ttl
+
+    def get_json(self, url, persist=True):
+        entry = self.cache.get_entry(url)
+        if entry and time.time() - entry.get("fetched", 0) < self.ttl:
+            return entry["data"]
+
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        response = self.http.get(url, headers=headers)
+        if response.status_code == 304 and entry:
+            self.cache.put_entry(url, entry["etag"], entry["data"], persist=persist)
+            return entry["data"]
+        response.raise_for_status()
+        data = response.json()
+        self.cache.put_entry(url, response.headers.get("ETag"), data, persist=persist)
+        return data
+
+    def level_urls(self, level_id):
+        return f"{self.api_base}/{level_id}", f"{self.api_base}/{level_id}/creators"
+
+    def fetch_levels(self, level_ids, max_workers=6):
+        """Descarga la información y los creadores de varios niveles en paralelo.
+
+        Devuelve {level_id: (info, creators)} o, para los que fallan, la excepción.
+        """
+        results = {}
+        try:
+            get_json = tracer.bind(self.get_json)
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = {level_id: [pool.submit(get_json, url, False) for url in self.level_urls(level_id)]
+                           for level_id in level_ids}
+                for level_id, (info, creators) in futures.items():
+                    try:
+                        results[level_id] = (info.result(), creators.result())
+                    except Exception as e:
+                        results[level_id] = e
+        finally:
+            self.cache.flush()
+        return results
+
+    def fetch_level(self, level_id):
+        """Información y creadores de un nivel; ambas peticiones van a la vez."""
+        result = self.fetch_levels([level_id], max_workers=2)[level_id]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+def aredl_level_content(info, creators):
+    """Convierte la respuesta de AREDL al formato de los archivos de nivel."""
+    author = (info.get('publisher') or {}).get('global_name', '')
+    verifications = info.get('verifications') or []
+    verification = verifications[0] if verifications else {}
+    creator_names = [c.get('global_name') for c in creators or [] if c.get('global_name')]
+    return {
+        "id": info.get('level_id', ''),
+        "name": info.get('name', ''),
+        "author": author,
+        "verifier": (verification.get('submitted_by') or {}).get('global_name', ''),
+        "creators": creator_names or ([author] if author else []),
+        "verification": verification.get('video_url', ''),
+        "percentToQualify": 100,
+        "records": []
+    }
+
+# Metadatos de un nivel que se mantienen al día con AREDL
+AREDL_SYNC_FIELDS = ("author", "verifier", "creators", "verification")
+
+def aredl_metadata_diff(doc, fresh, fields=AREDL_SYNC_FIELDS):
+    """Devuelve [(campo, valor_actual, valor_aredl)] con los campos que difieren.
+
+    Los valores vacíos de AREDL no se proponen: no se borra información del archivo.
+    """
+    return [(field, doc.get(field), fresh[field]) for field in fields
+            if fresh.get(field) and doc.get(field) != fresh[field]]
+
+def level_file_name(name):
+    """Nombre de archivo para un nivel ("Sonic Wave" -> "sonic_wave.json"), o None si no es válido."""
+    safe_name = re.sub(r'[^a-z0-9_]', '', name.lower().replace(' ', '_'))
+    return f"{safe_name}.json" if safe_name else None
+
+def build_record(user, link, percent, hz="", mobile=False):
+    """Record con el formato de los archivos de nivel ("mobile" solo aparece si es True)."""
+    record = {"user": user, "link": link, "percent": percent, "hz": hz}
+    if mobile:
+        record["mobile"] = True
+    return record
+
+def upsert_record(doc, fields):
+    """Añade un record al nivel o, si ya hay uno del mismo usuario, actualiza sus campos.
+
+    fields lleva user, link y percent; hz y mobile solo se tocan si vienen. Devuelve
+    "added" o "updated".
+    """
+    records = doc.setdefault("records", [])
+    key = fields["user"].casefold()
+    for existing in records:
+        if str(existing.get("user", "")).casefold() == key:
+            existing.update({k: v for k, v in fields.items() if k not in ("user", "mobile")})
+            if fields.get("mobile"):
+                existing["mobile"] = True
+            elif "mobile" in fields:
+                existing.pop("mobile", None)
+            return "updated"
+    records.append(build_record(fields["user"], fields["link"], fields["percent"], fields.get("hz", ""), fields.get("mobile", False)))
+    return "added"
+
+class StagedChanges:
+    """Cambios pendientes de publicar, por archivo; el último cambio de cada archivo gana."""
+
+    def __init__(self):
+        self.changes = {}  # file_name -> {"data": bytes | None, "messages": [...], "new": bool}
+
+    def __len__(self):
+        return len(self.changes)
+
+    def __contains__(self, file_name):
+        return file_name in self.changes
+
+    def get(self, file_name):
+        return self.changes.get(file_name)
+
+    def items(self):
+        return self.changes.items()
+
+    def clear(self):
+        self.changes.clear()
+
+    def stage(self, file_name, data, message, new=False):
+        entry = self.changes.setdefault(file_name, {"data": None, "messages": [], "new": new})
+        entry["data"] = data
+        if message not in entry["messages"]:
+            entry["messages"].append(message)
+
+    def stage_delete(self, file_name, message):
+        entry = self.changes.get(file_name)
+        if entry and entry["new"]:
+            # Nunca llegó a publicarse: basta con olvidarlo
+            del self.changes[file_name]
+            return
+        self.stage(file_name, None, message)
+
+    def snapshot(self):
+        """Devuelve {file_name: bytes o None} con lo que hay que publicar."""
+        return {name: entry["data"] for name, entry in self.changes.items()}
+
+    def commit_message(self, summary):
+        """Un solo cambio usa su propio mensaje; varios se resumen con una lista."""
+        messages = [message for entry in self.changes.values() for message in entry["messages"]]
+        if len(messages) == 1:
+            return messages[0]
+        return summary + "\n\n" + "\n".join(f"- {message}" for message in messages)
+
+    def discard_published(self, published):
+        """Quita los cambios publicados, salvo los que se modificaron mientras tanto."""
+        for name, data in published.items():
+            entry = self.changes.get(name)
+            if entry is not None and entry["data"] == data:
+                del self.changes[name]
+
+class Workspace:
+    """Niveles abiertos y ya parseados, con o sin cambios sin guardar.
+
+    Cambiar de archivo no descarta nada: los documentos con cambios se quedan hasta
+    guardarlos o descartarlos, y los demás forman una LRU acotada en número y en tamaño
+    (los bytes del archivo descargado, como aproximación de lo que ocupan). Volver a un
+    nivel reciente no descarga ni parsea nada.
+    """
+
+    MAX_CLEAN_DOCS = 16
+    MAX_CLEAN_BYTES = 24 * 1024 * 1024
+
+    def __init__(self):
+        self.entries = collections.OrderedDict()  # file_name -> {"doc", "sha", "size", "dirty", "revision"}; el más reciente al final
+        self.active = None  # archivo abierto en el editor: nunca se expulsa
+
+    def __contains__(self, file_name):
+        return file_name in self.entries
+
+    def get(self, file_name, sha=None):
+        """Entrada abierta de file_name. Si sha muestra que cambió en GitHub y no tiene cambios, se olvida."""
+        entry = self.entries.get(file_name)
+        if entry is None:
+            return None
+        if sha and entry["sha"] and sha != entry["sha"] and not entry["dirty"]:
+            del self.entries[file_name]
+            return None
+        self.entries.move_to_end(file_name)
+        self.active = file_name
+        return entry
+
+    def peek(self, file_name):
+        """Como get, sin contar como uso."""
+        return self.entries.get(file_name)
+
+    def open(self, file_name, doc, sha, size=0):
+        """Añade (o reemplaza) un documento recién cargado y lo deja como activo."""
+        self.entries[file_name] = {"doc": doc, "sha": sha, "size": size, "dirty": False, "revision": 0}
+        self.entries.move_to_end(file_name)
+        self.active = file_name
+        self.evict()
+
+    def mark_dirty(self, file_name, doc=None):
+        """Anota un cambio en memoria; doc si el documento se reemplazó por otro objeto."""
+        entry = self.entries.get(file_name)
+        if entry is None:
+            return
+        if doc is not None:
+            entry["doc"] = doc
+        entry["dirty"] = True
+        entry["revision"] += 1
+
+    def revision(self, file_name):
+        entry = self.entries.get(file_name)
+        return entry["revision"] if entry else None
+
+    def update_sha(self, file_name, sha):
+        """Nueva versión base en GitHub (p. ej. al publicar lo pendiente); la marca no cambia."""
+        entry = self.entries.get(file_name)
+        if entry is not None and sha:
+            entry["sha"] = sha
+
+    def mark_saved(self, file_name, sha=None, revision=None, doc=None):
+        """Tras guardar: quita la marca salvo que haya habido cambios después de serializar."""
+        entry = self.entries.get(file_name)
+        if entry is None:
+            return
+        if doc is not None:
+            entry["doc"] = doc
+        if sha:
+            entry["sha"] = sha
+        if revision is None or revision == entry["revision"]:
+            entry["dirty"] = False
+        self.evict()
+
+    def discard(self, file_name):
+        self.entries.pop(file_name, None)
+        if self.active == file_name:
+            self.active = None
+
+    def dirty_files(self):
+        return [name for name, entry in self.entries.items() if entry["dirty"]]
+
+    def evict(self):
+        """Expulsa los documentos sin cambios menos usados hasta volver a los límites."""
+        clean = [(name, entry) for name, entry in self.entries.items() if not entry["dirty"] and name != self.active]
+        count, size = len(clean), sum(entry["size"] for _, entry in clean)
+        for name, entry in clean:
+            if count <= self.MAX_CLEAN_DOCS and size <= self.MAX_CLEAN_BYTES:
+                break
+            del self.entries[name]
+            count -= 1
+            size -= entry["size"]
+
+class SearchIndex:
+    """Índice invertido en memoria sobre los records y los metadatos de todos los niveles.
+
+    Cada token apunta a {archivo: {fila: {campos}}}, donde fila es None para los
+    metadatos del nivel o el índice del record. Actualizar un archivo solo toca sus
+    propios tokens.
+    """
+
+    LEVEL_FIELDS = ("name", "author", "verifier", "creators", "id")
+    RECORD_FIELDS = ("user", "link")
+    MAX_RESULTS = 500
+
+    def __init__(self):
+        self.postings = {}    # token -> {file_name: {row: {fields}}}
+        self.doc_tokens = {}  # file_name -> {tokens}
+        self.labels = {}      # file_name -> {row: texto a mostrar}
+        self.shas = {}        # file_name -> SHA indexado (para saber si está al día)
+        self._sorted_tokens = None
+
+    @staticmethod
+    def tokenize(value):
+        if isinstance(value, (list, tuple)):
+            return [token for item in value for token in SearchIndex.tokenize(item)]
+        return re.findall(r"\w+", str(value).casefold())
+
+    def __len__(self):
+        return len(self.doc_tokens)
+
+    def update_document(self, file_name, doc, sha=None):
+        """(Re)indexa un archivo. Los documentos que no son niveles (p. ej. el orden) se ignoran."""
+        self.remove_document(file_name)
+        if not isinstance(doc, dict):
+            # Se recuerda igualmente para no volver a leerlo en cada actualización
+            self.doc_tokens[file_name] = set()
+            self.labels[file_name] = {}
+            self.shas[file_name] = sha
+            return
+        tokens = set()
+        labels = {None: f"{doc.get('name', '')} ({doc.get('author', '')})"}
+
+        def add(row, field, value):
+            for token in self.tokenize(value):
+                self.postings.setdefault(token, {}).setdefault(file_name, {}).setdefault(row, set()).add(field)
+                tokens.add(token)
+
+        for field in self.LEVEL_FIELDS:
+            if field in doc:
+                add(None, field, doc[field])
+        for row, record in enumerate(doc.get("records", [])):
+            if not isinstance(record, dict):
+                continue
+            for field in self.RECORD_FIELDS:
+                if field in record:
+                    add(row, field, record[field])
+            labels[row] = f"{record.get('user', '')} — {record.get('link', '')}"
+
+        self.doc_tokens[file_name] = tokens
+        self.labels[file_name] = labels
+        self.shas[file_name] = sha
+        self._sorted_tokens = None
+
+    def remove_document(self, file_name):
+        for token in self.doc_tokens.pop(file_name, ()):
+            files = self.postings.get(token)
+            if files is not None:
+                files.pop(file_name, None)
+                if not files:
+                    del self.postings[token]
+        self.labels.pop(file_name, None)
+        self.shas.pop(file_name, None)
+        self._sorted_tokens = None
+
+    def _matching_tokens(self, prefix):
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self.postings)
+        start = bisect.bisect_left(self._sorted_tokens, prefix)
+        for token in self._sorted_tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            yield token
+
+    def search(self, query):
+        """Devuelve [(file_name, fila, campos, texto)] que contienen todas las palabras (por prefijo)."""
+        query_tokens = self.tokenize(query)
+        if not query_tokens:
+            return []
+        expanded = [list(self._matching_tokens(query_token)) for query_token in query_tokens]
+        # Empezar por la palabra más selectiva y solo comprobar sus candidatos con el resto
+        expanded.sort(key=lambda tokens: sum(len(self.postings[token]) for token in tokens))
+
+        matches = {}
+        for token in expanded[0]:
+            for file_name, rows in self.postings[token].items():
+                for row, fields in rows.items():
+                    matches.setdefault((file_name, row), set()).update(fields)
+
+        for tokens in expanded[1:]:
+            narrowed = {}
+            for (file_name, row), fields in matches.items():
+                for token in tokens:
+                    token_fields = self.postings[token].get(file_name, {}).get(row)
+                    if token_fields:
+                        narrowed.setdefault((file_name, row), set(fields)).update(token_fields)
+            matches = narrowed
+            if not matches:
+                return []
+
+        results = []
+        for (file_name, row), fields in sorted(matches.items(), key=lambda item: (item[0][0], -1 if item[0][1] is None else item[0][1])):
+            results.append((file_name, row, sorted(fields), self.labels[file_name].get(row, "")))
+            if len(results) >= self.MAX_RESULTS:
+                break
+        return results
+
+class FileNameIndex:
+    """Índice de trigramas sobre los nombres de archivo para filtrar el listado.
+
+    Los nombres se normalizan (casefold) una sola vez al cambiar el listado. Las
+    coincidencias exactas se ordenan por posición (inicio de nombre, inicio de
+    palabra, resto); después van las aproximadas por trigramas compartidos, que
+    toleran erratas.
+    """
+
+    MIN_SIMILARITY = 0.5  # fracción de trigramas de la búsqueda que debe contener el nombre
+
+    def __init__(self):
+        self.names = []
+        self.folded = []
+        self.trigrams = {}  # trigrama -> {índices de nombres}
+
+    @staticmethod
+    def _trigrams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def update(self, names):
+        """Reconstruye el índice solo si el listado ha cambiado."""
+        if names == self.names:
+            return
+        self.names = list(names)
+        self.folded = [name.casefold() for name in self.names]
+        self.trigrams = {}
+        for i, folded in enumerate(self.folded):
+            for trigram in self._trigrams(folded):
+                self.trigrams.setdefault(trigram, set()).add(i)
+
+    def match(self, query):
+        """Devuelve los nombres que encajan con la búsqueda, de mejor a peor."""
+        query = query.strip().casefold()
+        if not query:
+            return list(self.names)
+
+        query_trigrams = self._trigrams(query)
+        if query_trigrams:
+            # Candidatos exactos: nombres que contienen todos los trigramas de la búsqueda
+            sets = sorted((self.trigrams.get(t, set()) for t in query_trigrams), key=len)
+            candidates = set(sets[0]).intersection(*sets[1:])
+        else:
+            candidates = range(len(self.names))
+
+        exact = []
+        for i in candidates:
+            folded = self.folded[i]
+            position = folded.find(query)
+            if position < 0:
+                continue
+            if position == 0:
+                rank = 0
+            elif not folded[position - 1].isalnum():
+                rank = 1
+            else:
+                rank = 2
+            exact.append((rank, position, folded, i))
+        exact.sort()
+        result = [self.names[i] for _, _, _, i in exact]
+
+        if query_trigrams:
+            found = {i for _, _, _, i in exact}
+            shared = {}
+            for trigram in query_trigrams:
+                for i in self.trigrams.get(trigram, ()):
+                    if i not in found:
+                        shared[i] = shared.get(i, 0) + 1
+            needed = self.MIN_SIMILARITY * len(query_trigrams)
+            fuzzy = sorted((-count, self.folded[i], i) for i, count in shared.items() if count >= needed)
+            result.extend(self.names[i] for _, _, i in fuzzy)
+        return result
+
+class ReorderModel:
+    """Orden editable de una lista de niveles.
+
+    Cada operación solo reescribe el tramo de la lista que cambia y devuelve las nuevas
+    posiciones de los elementos movidos y el rango afectado (lo, hi), que es lo único
+    que hay que volver a numerar en pantalla. Subir o bajar un nivel toca dos posiciones.
+    """
+
+    def __init__(self, items):
+        self.items = list(items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def shift(self, indices, delta):
+        """Desplaza los elementos indicados delta posiciones conservando sus huecos.
+
+        El desplazamiento se recorta para que el bloque no se salga de la lista.
+        Devuelve (nuevas_posiciones, (lo, hi)) o None si no hay nada que mover.
+        """
+        selected = sorted(set(indices))
+        if not selected:
+            return None
+        delta = max(-selected[0], min(len(self.items) - 1 - selected[-1], delta))
+        if delta == 0:
+            return None
+        lo, hi = selected[0] + min(delta, 0), selected[-1] + max(delta, 0)
+        segment = self.items[lo:hi + 1]
+        moved = {i - lo for i in selected}
+        new_positions = [i + delta for i in selected]
+        empty = object()
+        result = [empty] * len(segment)
+        for i in selected:
+            result[i + delta - lo] = segment[i - lo]
+        rest = iter(item for k, item in enumerate(segment) if k not in moved)
+        for k in range(len(result)):
+            if result[k] is empty:
+                result[k] = next(rest)
+        self.items[lo:hi + 1] = result
+        return new_positions, (lo, hi)
+
+    def move_to(self, indices, position):
+        """Junta los elementos indicados en un bloque que empieza en position (base 0)."""
+        selected = sorted(set(indices))
+        if not selected:
+            return None
+        position = max(0, min(len(self.items) - len(selected), position))
+        lo = min(selected[0], position)
+        hi = max(selected[-1], position + len(selected) - 1)
+        segment = self.items[lo:hi + 1]
+        moved = {i - lo for i in selected}
+        rest = [item for k, item in enumerate(segment) if k not in moved]
+        block = [segment[i - lo] for i in selected]
+        offset = position - lo
+        self.items[lo:hi + 1] = rest[:offset] + block + rest[offset:]
+        return list(range(position, position + len(selected))), (lo, hi)
+
+    def insert(self, index, item):
+        index = max(0, min(len(self.items), index))
+        self.items.insert(index, item)
+        return [index], (index, len(self.items) - 1)
+
+    def delete(self, indices):
+        selected = sorted(set(indices))
+        if not selected:
+            return None
+        for i in reversed(selected):
+            del self.items[i]
+        return [], (selected[0], max(selected[0], len(self.items) - 1))
+
+class RecordModel:
+    """Da a cada record del documento abierto un identificador estable.
+
+    Los identificadores sobreviven a ediciones, reordenaciones y borrados de otros
+    records, así la tabla puede actualizar solo las filas que cambian.
+    """
+
+    def __init__(self):
+        self._by_object = {}  # id(record) -> (record, uid); se guarda el record para que id() no se reutilice
+        self._next_uid = 0
+        self.order = []       # uids en el orden actual de los records
+        self._positions = {}  # uid -> índice en records
+        self._records = {}    # uid -> record
+
+    def sync(self, records):
+        """Asocia un uid a cada record (nuevo si no se había visto) y olvida los que ya no están.
+
+        Un record se reconoce por identidad; si el documento se reemplazó entero (p. ej.
+        desde el editor de texto) se reconoce por tener exactamente el mismo contenido.
+        """
+        by_object = {}
+        self.order = []
+        self._records = {}
+        unmatched = None
+        claimed = set()
+        for record in records:
+            known = self._by_object.get(id(record))
+            if known is not None and known[0] is record and known[1] not in claimed:
+                uid = known[1]
+            else:
+                if unmatched is None:
+                    present = {id(r) for r in records}
+                    unmatched = {}
+                    for old_record, old_uid in self._by_object.values():
+                        if id(old_record) not in present:
+                            unmatched.setdefault(self._content_key(old_record), []).append(old_uid)
+                candidates = unmatched.get(self._content_key(record)) if unmatched else None
+                if candidates:
+                    uid = candidates.pop(0)
+                else:
+                    self._next_uid += 1
+                    uid = f"r{self._next_uid}"
+            claimed.add(uid)
+            by_object[id(record)] = (record, uid)
+            self.order.append(uid)
+            self._records[uid] = record
+        self._by_object = by_object
+        self._positions = {uid: i for i, uid in enumerate(self.order)}
+        return self.order
+
+    @staticmethod
+    def _content_key(record):
+        return json.dumps(record, sort_keys=True, ensure_ascii=False)
+
+    def index_of(self, uid):
+        return self._positions.get(uid)
+
+    def uid_at(self, index):
+        return self.order[index] if 0 <= index < len(self.order) else None
+
+    def record(self, uid):
+        return self._records.get(uid)
+
+    def extend(self, records):
+        """Añade al final records nuevos (p. ej. los que llegan mientras se parsea un archivo)."""
+        for record in records:
+            self._next_uid += 1
+            uid = f"r{self._next_uid}"
+            self._by_object[id(record)] = (record, uid)
+            self._positions[uid] = len(self.order)
+            self.order.append(uid)
+            self._records[uid] = record
+        return self.order
+
+class IncrementalLevelParser:
+    """Parsea un nivel por partes: primero los metadatos y después "records" por lotes.
+
+    Cada valor se decodifica con raw_decode (el escáner en C del módulo json), así el
+    resultado es el mismo que con json.loads, incluido el orden de las claves, y cada
+    paso cuesta solo lo que ocupan los records que devuelve. Un documento que no es un
+    objeto se parsea de una vez.
+    """
+
+    WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+        self.doc = None
+        self.records = None  # lista de doc["records"] mientras quedan records por leer
+        self.done = False
+
+    def _skip(self):
+        self.pos = self.WHITESPACE.match(self.text, self.pos).end()
+
+    def _error(self, message):
+        return json.JSONDecodeError(message, self.text, self.pos)
+
+    def _expect(self, chars):
+        """Consume uno de los separadores indicados y lo devuelve."""
+        self._skip()
+        char = self.text[self.pos:self.pos + 1]
+        if not char or char not in chars:
+            raise self._error(f"Expecting {chars[0]!r} delimiter")  # el mismo mensaje que json.loads
+        self.pos += 1
+        return char
+
+    def _value(self):
+        self._skip()
+        try:
+            value, self.pos = self.decoder.raw_decode(self.text, self.pos)
+        except StopIteration:
+            raise self._error("Expecting value")
+        return value
+
+    def _finish(self):
+        self._skip()
+        if self.pos != len(self.text):
+            raise self._error("Extra data")
+        self.done = True
+        self.text = None  # El texto ya no hace falta: que no ocupe memoria mientras el documento siga abierto
+
+    def _read_members(self):
+        """Lee pares clave-valor hasta el final del objeto o hasta entrar en la lista "records"."""
+        while True:
+            self._skip()
+            if not self.text.startswith('"', self.pos):
+                raise self._error("Expecting property name enclosed in double quotes")
+            key = self._value()
+            self._expect(":")
+            self._skip()
+            if key == "records" and self.text.startswith("[", self.pos):
+                self.pos += 1
+                self.records = self.doc["records"] = []
+                self._skip()
+                if not self.text.startswith("]", self.pos):
+                    return
+                self.pos += 1
+                self.records = None
+            else:
+                self.doc[key] = self._value()
+            if self._expect(",}") == "}":
+                self._finish()
+                return
+
+    def read_metadata(self):
+        """Lee el documento hasta el primer record. Devuelve doc (con "records" aún por llenar)."""
+        self._skip()
+        if not self.text.startswith("{", self.pos):
+            self.doc = json.loads(self.text)
+            self.done = True
+            self.text = None
+            return self.doc
+        self.pos += 1
+        self.doc = {}
+        self._skip()
+        if self.text.startswith("}", self.pos):
+            self.pos += 1
+            self._finish()
+        else:
+            self._read_members()
+        return self.doc
+
+    def read_records(self, limit):
+        """Añade a doc["records"] hasta limit records más y los devuelve.
+
+        Al terminar la lista sigue con el resto del documento; done indica el final.
+        """
+        records = self.records
+        if records is None:
+            return []
+        start = len(records)
+        # Bucle caliente: variables locales y el escáner de json sin pasar por raw_decode
+        text, scan, skip = self.text, self.decoder.scan_once, self.WHITESPACE.match
+        pos = self.pos
+        for _ in range(limit):
+            pos = skip(text, pos).end()
+            try:
+                value, pos = scan(text, pos)
+            except StopIteration:
+                self.pos = pos
+                raise self._error("Expecting value")
+            records.append(value)
+            pos = skip(text, pos).end()
+            char = text[pos:pos + 1]
+            pos += 1
+            if char == ",":
+                continue
+            self.pos = pos
+            if char != "]":
+                self.pos -= 1
+                raise self._error("Expecting ',' delimiter")
+            self.records = None
+            if self._expect(",}") == "}":
+                self._finish()
+            else:
+                self._read_members()
+            return records[start:]
+        self.pos = pos
+        return records[start:]
+
+class TreeviewDiffer:
+    """Lleva un ttk.Treeview plano al estado deseado tocando solo las filas que cambian.
+
+    Las filas que conservan su posición relativa (la subsecuencia creciente más larga
+    de sus posiciones anteriores) no se mueven; el resto se inserta, se mueve o se
+    borra. Así editar un record cuesta una sola llamada a Tk y se conserva el scroll.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.values = {}  # iid -> valores mostrados (evita consultar a Tk)
+
+    def clear(self):
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self.values = {}
+
+    def render(self, rows):
+        """rows es una lista [(iid, valores)] en el orden en que deben mostrarse."""
+        tree = self.tree
+        wanted = {iid for iid, _ in rows}
+        current = list(tree.get_children())
+
+        stale = [iid for iid in current if iid not in wanted]
+        if stale:
+            tree.delete(*stale)
+            for iid in stale:
+                self.values.pop(iid, None)
+        old_positions = {iid: i for i, iid in enumerate(iid for iid in current if iid in wanted)}
+
+        stable = self._stable_rows([iid for iid, _ in rows if iid in old_positions], old_positions)
+
+        previous = None
+        for iid, values in rows:
+            if iid not in old_positions:
+                index = tree.index(previous) + 1 if previous is not None else 0
+                tree.insert("", index, iid=iid, values=values)
+            else:
+                if iid not in stable:
+                    # Se saca de la lista para que el índice del anterior sea el definitivo
+                    tree.detach(iid)
+                    index = tree.index(previous) + 1 if previous is not None else 0
+                    tree.move(iid, "", index)
+                if self.values.get(iid) != values:
+                    tree.item(iid, values=values)
+            self.values[iid] = values
+            previous = iid
+
+    @staticmethod
+    def _stable_rows(iids, old_positions):
+        """Devuelve los iids de la subsecuencia creciente más larga de posiciones antiguas."""
+        tails, tails_index, parents = [], [], [None] * len(iids)
+        for i, iid in enumerate(iids):
+            position = old_positions[iid]
+            k = bisect.bisect_left(tails, position)
+            if k == len(tails):
+                tails.append(position)
+                tails_index.append(i)
+            else:
+                tails[k] = position
+                tails_index[k] = i
+            parents[i] = tails_index[k - 1] if k > 0 else None
+        stable = set()
+        i = tails_index[-1] if tails_index else None
+        while i is not None:
+            stable.add(iids[i])
+            i = parents[i]
+        return stable
+
+class TaskRunner:
+    """Ejecuta operaciones de E/S en un pool de hilos y entrega los resultados en el hilo de Tk.
+
+    Tkinter no es seguro entre hilos: los trabajadores solo dejan el resultado en una cola
+    que el hilo principal vacía periódicamente con root.after.
+    """
+
+    POLL_INTERVAL_MS = 25
+
+    # Canales que no pueden arrancar mientras alguno de estos otros esté activo.
+    # Un canal sin conflictos (p. ej. "load") se sustituye: gana la última petición.
+    CONFLICTS = {
+        "list": {"list", "write"},
+        "write": {"list", "write"},
+        "aredl": {"aredl"},
+        "resync": {"resync"},
+    }
+
+    def __init__(self, root, max_workers=4, on_state_change=None):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nwl-io")
+        self.results = queue.Queue()
+        self.active = {}  # canal -> token de la tarea vigente
+        self.on_state_change = on_state_change
+        self._next_token = 0
+        self._poll_scheduled = False
+
+    def is_busy(self, *channels):
+        """Indica si hay tareas activas (en cualquier canal o en los indicados)."""
+        if not channels:
+            return bool(self.active)
+        return any(channel in self.active for channel in channels)
+
+    def can_start(self, channel):
+        conflicts = self.CONFLICTS.get(channel)
+        return not conflicts or not self.is_busy(*conflicts)
+
+    def submit(self, channel, func, on_success=None, on_error=None):
+        """Lanza func() en segundo plano. Devuelve False si hay una tarea en conflicto en curso."""
+        if not self.can_start(channel):
+            return False
+        self._next_token += 1
+        token = self._next_token
+        self.active[channel] = token
+        future = self.executor.submit(func)
+        future.add_done_callback(lambda f: self.results.put((channel, token, f, on_success, on_error)))
+        self._notify()
+        self._schedule_poll()
+        return True
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _notify(self):
+        if self.on_state_change:
+            self.on_state_change()
+
+    def _schedule_poll(self):
+        if not self._poll_scheduled:
+            self._poll_scheduled = True
+            self.root.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        self._poll_scheduled = False
+        try:
+            while True:
+                try:
+                    channel, token, future, on_success, on_error = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                if self.active.get(channel) != token:
+                    continue  # Resultado obsoleto: otra tarea del mismo canal lo ha reemplazado
+                # Se libera el canal antes de los callbacks para que puedan encadenar otra tarea
+                del self.active[channel]
+                self._notify()
+                try:
+                    self._deliver(future, on_success, on_error)
+                except Exception:
+                    # Un callback roto no debe dejar sin entregar el resto de resultados
+                    self.root.report_callback_exception(*sys.exc_info())
+        finally:
+            if self.active or not self.results.empty():
+                self._schedule_poll()
+
+    @staticmethod
+    def _deliver(future, on_success, on_error):
+        try:
+            result = future.result()
+        except Exception as e:
+            if on_error:
+                on_error(e)
+            return
+        try:
+            if on_success:
+                on_success(result)
+        except Exception as e:
+            if on_error:
+                on_error(e)
+
+def get_config_path():
+    """Devuelve la ruta a config.json (junto al ejecutable o al script)."""
+    if getattr(sys, 'frozen', False):
+        # Si la aplicación está "congelada" (ejecutable), la base es el directorio del .exe
+        base_path = os.path.dirname(sys.executable)
+    else:
+        # Si se está ejecutando como un script normal, la base es el directorio del script
+        base_path = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_path, "config.json")
+
+def read_config():
+    """Lee config.json; devuelve {} si no existe o está corrupto (se usan los valores por defecto)."""
+    try:
+        with open(get_config_path(), "r", encoding="utf-8") as f:
+            config = json.load(f)
+    except (IOError, json.JSONDecodeError):
+        return {}
+    return config if isinstance(config, dict) else {}
+
 class GitHubJSONEditor:
-    def __init__(self, root):
+    # A partir de cuántos records la tabla pasa a crear solo las filas visibles
+    VIRTUAL_RECORDS_THRESHOLD = 500
+    VIRTUAL_RECORDS_BUFFER = 5
+    # Archivos a partir de este tamaño se parsean por partes mientras se muestran
+    STREAM_PARSE_MIN_BYTES = 512 * 1024
+    STREAM_FIRST_RECORDS = 100  # records que se parsean antes de mostrar el archivo
+    STREAM_BATCH = 500
+    STREAM_SLICE_MS = 12        # tiempo de parseo por turno de Tk, para no bloquear la interfaz
+    # Espera tras la última tecla antes de filtrar el listado de archivos
+    SEARCH_DELAY_MS = 150
+
+    def __init__(self, root, startup_timing=False):
         self.root = root
         
         self.root.geometry("1000x700")
@@ -37,11 +1939,37 @@ class GitHubJSONEditor:
         self.folder_path = "data"
         self.current_lang = "es"
         self.github_token = ""
+        self.batch_commits = False
+        self.aredl_api = AREDLClient.API_BASE
+        self.backend_config = {}
+        self.tracing = False
         self.load_config()
+        tracer.configure(os.path.join(os.path.dirname(self.get_config_path()), "trace.jsonl"), self.tracing)
 
         self.current_file_content = None
         self.selected_record_id = None
         self.current_file_sha = None
+        self.staged = StagedChanges()
+        self.search_index = SearchIndex()
+        self.record_model = RecordModel()
+        self.file_index = FileNameIndex()
+        self.search_after_id = None
+        self.virtual_records = False  # True si la tabla solo muestra una ventana de los records
+        self.records_offset = 0       # índice del primer record visible en modo virtual
+        self.load_generation = 0      # cambia con cada carga; un parseo por partes anterior se abandona
+        self.file_styles = {}         # archivo -> JsonStyle con el que se descargó
+        self.workspace = Workspace()  # niveles abiertos: cambiar de archivo no pierde ediciones
+
+        # Una única sesión HTTP reutiliza las conexiones TLS entre peticiones
+        self.http = HttpSession(self.github_token)
+        self.cache = ContentCache(os.path.join(os.path.dirname(self.get_config_path()), "cache"))
+        # AREDL tiene su propio índice, acotado: no engorda el de GitHub al importar o resincronizar
+        aredl_cache = ContentCache(os.path.join(self.cache.base_dir, "aredl"), max_age=AREDLClient.CACHE_KEEP)
+        self.aredl = AREDLClient(self.http, aredl_cache, api_base=self.aredl_api)
+        self.cache.drop_entries(self.aredl.api_base)  # respuestas que versiones anteriores guardaban ahí
+
+        # Todas las llamadas de red se ejecutan fuera del hilo de Tk
+        self.tasks = TaskRunner(self.root, on_state_change=self.on_tasks_changed)
 
         self.setup_translations()
         # self.current_lang ya está establecido por load_config o por defecto
@@ -49,21 +1977,30 @@ class GitHubJSONEditor:
         self.create_widgets()
         
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+        # Arranque: primero se pinta la ventana; luego se muestra el último listado
+        # guardado y se refresca en segundo plano
+        self.startup_timing = startup_timing
+        self.startup_times = {}
+        self.startup_trace = tracer.start("startup")
+        self.root.after_idle(self.on_first_paint)
         
     def create_widgets(self):
+        # Widgets con texto traducible: update_ui_language los reetiqueta sin reconstruir la UI
+        self.translated_widgets = []
         self.root.title(self.translate("title"))
         # Frame para configuración de GitHub
-        github_frame = ttk.LabelFrame(self.root, text=self.translate("github_config"), padding="10")
+        github_frame = self.translatable(ttk.LabelFrame(self.root, padding="10"), "github_config")
         github_frame.grid(row=0, column=0, sticky="ew", padx=10, pady=5)
         github_frame.columnconfigure(1, weight=1)
 
-        ttk.Label(github_frame, text=self.translate("repo_url"), font=self.font_normal).grid(row=0, column=0, sticky="w", pady=5)
+        self.translatable(ttk.Label(github_frame, font=self.font_normal), "repo_url").grid(row=0, column=0, sticky="w", pady=5)
         self.repo_url_entry = ttk.Entry(github_frame, width=50, font=self.font_normal)
         self.repo_url_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
         self.repo_url_entry.insert(0, self.repo_url)
         self.repo_url_entry.config(state="disabled")  # Deshabilitar edición
         
-        ttk.Label(github_frame, text=self.translate("json_folder"), font=self.font_normal).grid(row=1, column=0, sticky="w", pady=5)
+        self.translatable(ttk.Label(github_frame, font=self.font_normal), "json_folder").grid(row=1, column=0, sticky="w", pady=5)
         self.folder_entry = ttk.Entry(github_frame, width=50, font=self.font_normal)
         self.folder_entry.grid(row=1, column=1, padx=5, pady=5, sticky="ew")
         self.folder_entry.insert(0, self.folder_path)
@@ -73,18 +2010,25 @@ class GitHubJSONEditor:
         github_buttons_frame = ttk.Frame(github_frame)
         github_buttons_frame.grid(row=1, column=2, sticky="w", padx=5)
 
-        ttk.Button(github_buttons_frame, text=self.translate("settings"), command=self.open_settings_window, style="Custom.TButton").pack(side="left")
-        ttk.Button(github_buttons_frame, text=self.translate("load_files"), command=self.load_github_files, 
-                   style="Custom.TButton").pack(side="left", padx=5)
-
-        ttk.Label(github_frame, text=self.translate("github_token"), font=self.font_normal).grid(row=2, column=0, sticky="w", pady=5)
+        self.translatable(ttk.Button(github_buttons_frame, command=self.open_settings_window, style="Custom.TButton"), "settings").pack(side="left")
+        self.load_files_button = self.translatable(ttk.Button(github_buttons_frame, command=self.load_github_files, 
+                   style="Custom.TButton"), "load_files")
+        self.load_files_button.pack(side="left", padx=5)
+        self.sync_all_button = self.translatable(ttk.Button(github_buttons_frame, command=self.sync_all_files,
+                   style="Custom.TButton"), "sync_all")
+        self.sync_all_button.pack(side="left")
+        self.resync_aredl_button = self.translatable(ttk.Button(github_buttons_frame, command=self.resync_aredl_metadata,
+                   style="Custom.TButton"), "resync_aredl")
+        self.resync_aredl_button.pack(side="left", padx=5)
+
+        self.translatable(ttk.Label(github_frame, font=self.font_normal), "github_token").grid(row=2, column=0, sticky="w", pady=5)
         self.token_entry = ttk.Entry(github_frame, width=50, show="*", font=self.font_normal)
         self.token_entry.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
         self.token_entry.insert(0, self.github_token)
         self.token_entry.config(state="disabled")
 
         # Frame para archivos JSON
-        files_frame = ttk.LabelFrame(self.root, text=self.translate("json_files"), padding="10")
+        files_frame = self.translatable(ttk.LabelFrame(self.root, padding="10"), "json_files")
         files_frame.grid(row=1, column=0, sticky="nsew", padx=10, pady=5)
         files_frame.rowconfigure(1, weight=1)
         files_frame.columnconfigure(0, weight=1)
@@ -93,11 +2037,13 @@ class GitHubJSONEditor:
         search_frame = ttk.Frame(files_frame)
         search_frame.grid(row=0, column=0, sticky="ew", pady=(0, 5))
         search_frame.columnconfigure(1, weight=1)
-        ttk.Label(search_frame, text=self.translate("search"), font=self.font_normal).grid(row=0, column=0, sticky="w")
+        self.translatable(ttk.Label(search_frame, font=self.font_normal), "search").grid(row=0, column=0, sticky="w")
         self.search_var = tk.StringVar()
         self.search_var.trace_add("write", self.update_search)
         self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=30, font=self.font_normal)
         self.search_entry.grid(row=0, column=1, sticky="ew", padx=5)
+        self.translatable(ttk.Button(search_frame, command=self.open_global_search_window,
+                   style="Custom.TButton"), "global_search").grid(row=0, column=2, sticky="e")
 
         self.files_listbox = tk.Listbox(files_frame, height=8, font=self.font_normal)
         self.files_listbox.grid(row=1, column=0, sticky="nsew")
@@ -111,27 +2057,27 @@ class GitHubJSONEditor:
             self.update_files_listbox()
 
         # Frame para edición
-        edit_frame = ttk.LabelFrame(self.root, text=self.translate("edit_record"), padding="10")
+        edit_frame = self.translatable(ttk.LabelFrame(self.root, padding="10"), "edit_record")
         edit_frame.grid(row=2, column=0, sticky="ew", padx=10, pady=5)
         edit_frame.columnconfigure(1, weight=1)
 
-        ttk.Label(edit_frame, text=self.translate("user"), font=self.font_normal).grid(row=0, column=0, sticky="w", pady=5)
+        self.translatable(ttk.Label(edit_frame, font=self.font_normal), "user").grid(row=0, column=0, sticky="w", pady=5)
         self.user_entry = ttk.Entry(edit_frame, width=30, font=self.font_normal)
         self.user_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
 
-        ttk.Label(edit_frame, text=self.translate("link"), font=self.font_normal).grid(row=1, column=0, sticky="w", pady=5)
+        self.translatable(ttk.Label(edit_frame, font=self.font_normal), "link").grid(row=1, column=0, sticky="w", pady=5)
         self.link_entry = ttk.Entry(edit_frame, width=30, font=self.font_normal)
         self.link_entry.grid(row=1, column=1, padx=5, pady=5, sticky="ew")
 
-        ttk.Label(edit_frame, text=self.translate("percent"), font=self.font_normal).grid(row=2, column=0, sticky="w", pady=5)
+        self.translatable(ttk.Label(edit_frame, font=self.font_normal), "percent").grid(row=2, column=0, sticky="w", pady=5)
         self.percent_entry = ttk.Entry(edit_frame, width=30, font=self.font_normal)
         self.percent_entry.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
 
-        ttk.Label(edit_frame, text=self.translate("hz"), font=self.font_normal).grid(row=3, column=0, sticky="w", pady=5)
+        self.translatable(ttk.Label(edit_frame, font=self.font_normal), "hz").grid(row=3, column=0, sticky="w", pady=5)
         self.hz_entry = ttk.Entry(edit_frame, width=30, font=self.font_normal)
         self.hz_entry.grid(row=3, column=1, padx=5, pady=5, sticky="ew")
 
-        ttk.Label(edit_frame, text=self.translate("mobile"), font=self.font_normal).grid(row=4, column=0, sticky="w", pady=5)
+        self.translatable(ttk.Label(edit_frame, font=self.font_normal), "mobile").grid(row=4, column=0, sticky="w", pady=5)
         self.mobile_var = tk.BooleanVar()
         ttk.Checkbutton(edit_frame, text="", variable=self.mobile_var).grid(row=4, column=1, sticky="w", padx=5, pady=5)
 
@@ -139,22 +2085,25 @@ class GitHubJSONEditor:
         record_buttons_frame = ttk.Frame(edit_frame)
         record_buttons_frame.grid(row=5, column=0, columnspan=2, sticky="ew", pady=(10, 0))
 
-        self.update_list_button = ttk.Button(record_buttons_frame, text=self.translate("update_list"), command=self.open_list_updater, style="Custom.TButton")
+        self.update_list_button = self.translatable(ttk.Button(record_buttons_frame, command=self.open_list_updater, style="Custom.TButton"), "update_list")
         self.update_list_button.pack(side="left")
-        ttk.Button(record_buttons_frame, text=self.translate("add_level"), command=self.open_add_level_window, 
-                   style="Custom.TButton").pack(side="left", padx=5)
-        self.edit_level_button = ttk.Button(record_buttons_frame, text=self.translate("edit_level"), command=self.open_edit_level_window, style="Custom.TButton")
+        self.translatable(ttk.Button(record_buttons_frame, command=self.open_add_level_window, 
+                   style="Custom.TButton"), "add_level").pack(side="left", padx=5)
+        self.edit_level_button = self.translatable(ttk.Button(record_buttons_frame, command=self.open_edit_level_window, style="Custom.TButton"), "edit_level")
         self.edit_level_button.pack(side="left")
                    
-        ttk.Button(record_buttons_frame, text=self.translate("delete_record"), command=self.delete_record, 
-                   style="Custom.TButton").pack(side="right", padx=(5, 0))
-        ttk.Button(record_buttons_frame, text=self.translate("update_record"), command=self.update_record, 
-                   style="Custom.TButton").pack(side="right", padx=5)
-        ttk.Button(record_buttons_frame, text=self.translate("add_record"), command=self.add_record, 
-                   style="Custom.TButton").pack(side="right")
+        self.delete_record_button = self.translatable(ttk.Button(record_buttons_frame, command=self.delete_record, 
+                   style="Custom.TButton"), "delete_record")
+        self.delete_record_button.pack(side="right", padx=(5, 0))
+        self.update_record_button = self.translatable(ttk.Button(record_buttons_frame, command=self.update_record, 
+                   style="Custom.TButton"), "update_record")
+        self.update_record_button.pack(side="right", padx=5)
+        self.add_record_button = self.translatable(ttk.Button(record_buttons_frame, command=self.add_record, 
+                   style="Custom.TButton"), "add_record")
+        self.add_record_button.pack(side="right")
 
         # Frame para la tabla de records
-        records_frame = ttk.LabelFrame(self.root, text=self.translate("file_records"), padding="10")
+        records_frame = self.translatable(ttk.LabelFrame(self.root, padding="10"), "file_records")
         records_frame.grid(row=3, column=0, sticky="nsew", padx=10, pady=5)
         records_frame.rowconfigure(0, weight=1)
         records_frame.columnconfigure(0, weight=1)
@@ -162,11 +2111,8 @@ class GitHubJSONEditor:
         columns = ("user", "link", "percent", "hz", "mobile")
         self.records_tree = ttk.Treeview(records_frame, columns=columns, show="headings", height=10)
         
-        self.records_tree.heading("user", text=self.translate("user"))
-        self.records_tree.heading("link", text=self.translate("link"))
-        self.records_tree.heading("percent", text=self.translate("percent"))
-        self.records_tree.heading("hz", text=self.translate("hz"))
-        self.records_tree.heading("mobile", text=self.translate("mobile"))
+        for column in columns:
+            self.records_tree.heading(column, text=self.translate(column))
 
         self.records_tree.column("user", width=150)
         self.records_tree.column("link", width=300)
@@ -176,20 +2122,46 @@ class GitHubJSONEditor:
 
         self.records_tree.grid(row=0, column=0, sticky="nsew")
         self.records_tree.bind('<<TreeviewSelect>>', self.on_record_select)
-
-        tree_scrollbar = ttk.Scrollbar(records_frame, orient="vertical", command=self.records_tree.yview)
-        tree_scrollbar.grid(row=0, column=1, sticky="ns")
-        self.records_tree.config(yscrollcommand=tree_scrollbar.set)
+        self.records_rows = TreeviewDiffer(self.records_tree)
+
+        # La barra de scroll pasa por el editor: con muchos records la tabla es virtual
+        self.records_scrollbar = ttk.Scrollbar(records_frame, orient="vertical", command=self.on_records_scroll)
+        self.records_scrollbar.grid(row=0, column=1, sticky="ns")
+        self.records_tree.config(yscrollcommand=self.on_records_tree_yscroll)
+        self.records_tree.bind('<Configure>', lambda e: self.virtual_records and self.render_records_window())
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.records_tree.bind(sequence, self.on_records_wheel)
+        for sequence, step in (('<Up>', -1), ('<Down>', 1), ('<Prior>', "page_up"), ('<Next>', "page_down")):
+            self.records_tree.bind(sequence, lambda e, step=step: self.on_records_key(step))
 
         # Frame para botones de acción
         action_frame = ttk.Frame(self.root, padding="10")
         action_frame.grid(row=4, column=0, sticky="ew", padx=10, pady=5)
         action_frame.columnconfigure(0, weight=1)
 
-        self.text_editor_button = ttk.Button(action_frame, text=self.translate("text_editor"), command=self.open_text_editor, style="Custom.TButton")
+        self.text_editor_button = self.translatable(ttk.Button(action_frame, command=self.open_text_editor, style="Custom.TButton"), "text_editor")
         self.text_editor_button.pack(side="left", padx=5)
-        self.save_changes_button = ttk.Button(action_frame, text=self.translate("save_changes"), command=self.save_changes, style="Custom.TButton")
+        self.save_changes_button = self.translatable(ttk.Button(action_frame, command=self.save_changes, style="Custom.TButton"), "save_changes")
         self.save_changes_button.pack(side="right", padx=5)
+        self.publish_button = ttk.Button(action_frame, text=self.translate("publish_changes").format(count=0), command=self.publish_staged_changes, style="Custom.TButton")
+        self.publish_button.pack(side="right", padx=5)
+        self.pending_button = ttk.Button(action_frame, text=self.translate("pending_changes").format(count=0), command=self.open_pending_changes_window, style="Custom.TButton")
+        self.pending_button.pack(side="right", padx=5)
+        if not hasattr(self, 'batch_var'):
+            self.batch_var = tk.BooleanVar(value=self.batch_commits)
+        self.translatable(ttk.Checkbutton(action_frame, variable=self.batch_var), "batch_commits").pack(side="right", padx=5)
+
+        # Barra de estado
+        status_frame = ttk.Frame(self.root, padding=(10, 0, 10, 5))
+        status_frame.grid(row=5, column=0, sticky="ew", padx=10)
+        self.status_var = tk.StringVar()
+        ttk.Label(status_frame, textvariable=self.status_var, font=self.font_normal).pack(side="left")
+        self.rate_limit_var = tk.StringVar()
+        ttk.Label(status_frame, textvariable=self.rate_limit_var, font=self.font_normal).pack(side="right")
+        if tracer.enabled:
+            self.translatable(ttk.Button(status_frame, command=self.open_trace_summary_window,
+                       style="Custom.TButton"), "trace_summary").pack(side="right", padx=10)
+        self.refresh_rate_limit_status()
 
         # Configurar estilo de botones personalizados
         style = ttk.Style()
@@ -209,10 +2181,102 @@ class GitHubJSONEditor:
         list_loaded = hasattr(self, 'display_files') and self.display_files
         update_list_state = "normal" if list_loaded else "disabled"
 
+        # Mientras se escribe en GitHub no se permite otra escritura ni recargar la lista
+        writing = self.tasks.is_busy("write", "list")
+
         self.update_list_button.config(state=update_list_state)
         self.edit_level_button.config(state=file_selected_state)
+        # Sin documento abierto (o mientras aún se parsea) no hay records que editar
+        for button in (self.add_record_button, self.update_record_button, self.delete_record_button):
+            button.config(state=file_selected_state)
         self.text_editor_button.config(state=file_selected_state)
-        self.save_changes_button.config(state=file_selected_state)
+        self.save_changes_button.config(state="disabled" if writing else file_selected_state)
+        self.load_files_button.config(state="disabled" if writing else "normal")
+        self.sync_all_button.config(state="disabled" if writing else "normal")
+        self.resync_aredl_button.config(state="normal" if list_loaded and not self.tasks.is_busy("resync") else "disabled")
+        self.publish_button.config(text=self.translate("publish_changes").format(count=len(self.staged)),
+                                   state="normal" if self.staged and not writing else "disabled")
+        dirty = len(self.workspace.dirty_files())
+        self.pending_button.config(text=self.translate("pending_changes").format(count=dirty),
+                                   state="normal" if dirty else "disabled")
+
+    RATE_LIMIT_REFRESH_MS = 2000
+
+    def refresh_rate_limit_status(self):
+        """Muestra la cuota restante de la API de GitHub y cuándo se restablece."""
+        if getattr(self, '_rate_limit_after', None):
+            self.root.after_cancel(self._rate_limit_after)
+        state = self.http.rate_limits.snapshot(urlparse(GitHubClient.API_BASE).hostname)
+        if state and state["remaining"] is not None:
+            key = "rate_limit_low" if state["limit"] and state["remaining"] <= state["limit"] * RateLimitTracker.LOW_FRACTION else "rate_limit_status"
+            reset = time.strftime("%H:%M", time.localtime(state["reset"])) if state["reset"] else "-"
+            self.rate_limit_var.set(self.translate(key).format(remaining=state["remaining"], limit=state["limit"] or "?", reset=reset))
+        self._rate_limit_after = self.root.after(self.RATE_LIMIT_REFRESH_MS, self.refresh_rate_limit_status)
+
+    def open_trace_summary_window(self):
+        """Resumen de tiempos (p50/p95) por operación y fase de la instrumentación."""
+        win = tk.Toplevel(self.root)
+        win.title(self.translate("trace_summary"))
+        win.transient(self.root)
+        win.geometry("620x400")
+        win.rowconfigure(0, weight=1)
+        win.columnconfigure(0, weight=1)
+
+        columns = ("operation", "phase", "count", "p50", "p95")
+        tree = ttk.Treeview(win, columns=columns, show="headings")
+        for column, key, width in (("operation", "trace_operation", 120), ("phase", "trace_phase", 120),
+                                   ("count", "trace_count", 80), ("p50", "trace_p50", 100), ("p95", "trace_p95", 100)):
+            tree.heading(column, text=self.translate(key))
+            tree.column(column, width=width, anchor="w" if column in ("operation", "phase") else "e")
+        tree.grid(row=0, column=0, sticky="nsew", padx=10, pady=(10, 0))
+
+        def refresh():
+            tree.delete(*tree.get_children())
+            for operation, phase, count, p50, p95 in tracer.summary():
+                tree.insert("", tk.END, values=(operation, phase, count, f"{p50:.1f}", f"{p95:.1f}"))
+
+        bottom = ttk.Frame(win, padding="10")
+        bottom.grid(row=1, column=0, sticky="ew")
+        ttk.Label(bottom, text=tracer.path or "", font=self.font_normal).pack(side="left")
+        ttk.Button(bottom, text=self.translate("accept"), command=win.destroy, style="Custom.TButton").pack(side="right")
+        ttk.Button(bottom, text=self.translate("refresh"), command=refresh, style="Custom.TButton").pack(side="right", padx=5)
+        refresh()
+
+    def on_tasks_changed(self):
+        """Refleja en la interfaz si hay operaciones de red en curso."""
+        if not hasattr(self, 'status_var'):
+            return
+        busy = self.tasks.is_busy()
+        self.status_var.set(self.translate("status_working") if busy else "")
+        self.root.config(cursor="watch" if busy else "")
+        self.update_contextual_button_states()
+
+    def run_task(self, channel, func, on_success=None, on_error=None, parent=None, trace=None):
+        """Ejecuta func en segundo plano; avisa si una operación en conflicto sigue en curso.
+
+        Con trace, el trabajo en segundo plano se mide como fase "background" y la
+        traza se cierra si falla (si no, la cierra on_success cuando termina).
+        """
+        if trace is not None:
+            work, fail = func, on_error
+
+            def func():
+                with tracer.activate(trace), trace.span("background"):
+                    return work()
+
+            def on_error(e):
+                trace.finish(error=type(e).__name__)
+                if fail:
+                    fail(e)
+
+        if not self.tasks.submit(channel, func, on_success, on_error):
+            messagebox.showwarning(self.translate("warning"), self.translate("warn_task_running"), parent=parent or self.root)
+            return False
+        return True
+
+    def _dialog_parent(self, win):
+        """Devuelve la ventana sobre la que mostrar un mensaje, por si win ya se cerró."""
+        return win if win is not None and win.winfo_exists() else self.root
 
     def setup_translations(self):
         self.translations = {
@@ -278,9 +2342,9 @@ class GitHubJSONEditor:
                 "select_order_file_label": "Selecciona el archivo que contiene el orden:",
                 "warn_select_file": "Debes seleccionar un archivo.", "select": "Seleccionar",
                 "format_error": "Error de Formato", "format_error_details": "El archivo '{filename}' no contiene una lista de texto (strings).",
-                "error_loading_order_file": "No se pudo cargar el archivo de orden: {str(e)}",
+                "error_loading_order_file": "No se pudo cargar el archivo de orden: {error}",
                 "file_error": "Error de Archivo", "file_error_details": "El archivo '{filename}' no es un JSON válido.",
-                "error_processing_order_file": "Error al procesar el archivo de orden: {str(e)}",
+                "error_processing_order_file": "Error al procesar el archivo de orden: {error}",
                 "reorder_list": "Reordenar Lista", "add": "Añadir", "delete": "Eliminar", "up": "Subir", "down": "Bajar",
                 "save_apply": "Guardar y Aplicar", "success_list_reordered": "La lista de records ha sido reordenada.",
                 "text_editor_title": "Editor de Texto: {filename}", "save_close": "Guardar y Cerrar",
@@ -288,7 +2352,60 @@ class GitHubJSONEditor:
                 "json_error": "Error de JSON", "json_error_details": "El texto no es un JSON válido.\n\n{e}",
                 "token_needed_to_save": "Se necesita un token de GitHub en token.txt para guardar cambios",
                 "commit_update_records": "Actualización de records en {filename}",
-                "success_changes_saved_github": "Cambios guardados correctamente en GitHub"
+                "success_changes_saved_github": "Cambios guardados correctamente en GitHub",
+                "success_changes_saved_local": "Cambios guardados en un commit local. Usa 'Sincronizar Todo' para subirlos a GitHub.",
+                "success_file_deleted_local": "Archivo '{filename}' eliminado en la copia local. Usa 'Sincronizar Todo' para subir el cambio a GitHub.",
+                "success_level_added_local": "Nivel '{name}' añadido como '{filename}' en la copia local. Usa 'Sincronizar Todo' para subirlo a GitHub.",
+                "confirm_exit_unpushed": "Hay {count} commits locales sin subir a GitHub. ¿Salir de todos modos?",
+                "status_working": "Trabajando...",
+                "status_loading_records": "Cargando {name}: {count} records...",
+                "no_changes_to_save": "No hay cambios que guardar.",
+                "pending_changes": "Sin guardar ({count})",
+                "pending_changes_title": "Niveles con cambios sin guardar",
+                "pending_file": "Archivo",
+                "pending_level": "Nivel",
+                "pending_records": "Records",
+                "open": "Abrir",
+                "discard": "Descartar",
+                "save_all_dirty": "Guardar todos",
+                "confirm_discard_changes": "¿Descartar los cambios sin guardar de {filename}?",
+                "commit_save_all": "Actualizar {count} niveles",
+                "success_saved_all": "{count} niveles guardados en un solo commit.",
+                "success_staged_all": "{count} niveles añadidos a los cambios pendientes.",
+                "confirm_exit_unsaved": "Hay {count} niveles con cambios sin guardar. ¿Salir de todos modos?",
+                "confirm_exit_staged": "Hay {count} cambios agrupados sin publicar que se perderán. ¿Salir de todos modos?",
+                "confirm_discard_pending_repo": "Hay {count} cambios sin publicar o sin guardar del repositorio actual. Al cambiar de repositorio o carpeta se descartarán. ¿Continuar?",
+                "status_list_refresh_failed": "No se pudo actualizar la lista (se muestra la última guardada): {error}",
+                "warn_task_running": "Espera a que termine la operación en curso.",
+                "sync_all": "Sincronizar Todo",
+                "success_sync": "Sincronizados {count} archivos JSON ({downloaded} descargados, {size:.1f} KB) en {seconds:.2f} s.",
+                "warn_tree_truncated": "GitHub truncó el árbol del repositorio; algunos archivos se cargarán bajo demanda.",
+                "batch_commits": "Agrupar en un commit",
+                "publish_changes": "Publicar ({count})",
+                "commit_batch": "Actualizar {count} archivos",
+                "success_change_staged": "Cambio guardado como pendiente.\nUsa 'Publicar' para subir todos los cambios en un solo commit.",
+                "success_published": "{count} archivos publicados en un solo commit.",
+                "global_search": "Buscar en Todo", "global_search_title": "Búsqueda Global",
+                "search_file": "Archivo", "search_row": "Fila", "search_fields": "Campos", "search_match": "Coincidencia",
+                "level_metadata_row": "Nivel",
+                "search_status": "{results} resultados en {files} niveles indexados ({ms:.1f} ms).",
+                "search_not_indexed": "{count} archivos no descargados no están indexados: usa 'Sincronizar Todo'.",
+                "move_to_rank": "Mover a posición", "rank_prompt": "Nueva posición (1-{count}):",
+                "warn_invalid_rank": "Introduce un número entre 1 y {count}.", "filter": "Filtrar:",
+                "bulk_import_aredl": "Importar varios de AREDL",
+                "bulk_import_prompt": "IDs de niveles de AREDL (separados por espacios, comas o saltos de línea):",
+                "commit_bulk_add_levels": "Añadir {count} niveles desde AREDL",
+                "bulk_import_summary": "Niveles creados: {created}\nYa existían: {skipped}\nCon errores: {failed}",
+                "resync_aredl": "Resincronizar AREDL",
+                "resync_summary": "{checked} niveles comparados con AREDL, {changes} diferencias. Sin comprobar: {failed}",
+                "resync_field": "Campo", "resync_current": "Actual", "resync_aredl_value": "AREDL",
+                "apply_selected": "Aplicar seleccionados", "warn_select_changes": "Selecciona al menos un cambio.",
+                "commit_resync_level": "Actualizar metadatos de {filename} desde AREDL",
+                "commit_resync_levels": "Actualizar metadatos de {count} niveles desde AREDL",
+                "rate_limit_status": "API: {remaining}/{limit} (se restablece a las {reset})",
+                "rate_limit_low": "⚠ API: quedan {remaining}/{limit}, se restablece a las {reset}; las operaciones irán más despacio",
+                "trace_summary": "Rendimiento", "trace_operation": "Operación", "trace_phase": "Fase",
+                "trace_count": "Veces", "trace_p50": "p50 (ms)", "trace_p95": "p95 (ms)", "refresh": "Actualizar"
             },
             "en": {
                 "title": "No Wave List Manager", "github_config": "GitHub Configuration", "repo_url": "Repository URL:",
@@ -352,9 +2469,9 @@ class GitHubJSONEditor:
                 "select_order_file_label": "Select the file containing the order:",
                 "warn_select_file": "You must select a file.", "select": "Select",
                 "format_error": "Format Error", "format_error_details": "The file '{filename}' does not contain a list of strings.",
-                "error_loading_order_file": "Could not load the order file: {str(e)}",
+                "error_loading_order_file": "Could not load the order file: {error}",
                 "file_error": "File Error", "file_error_details": "The file '{filename}' is not a valid JSON.",
-                "error_processing_order_file": "Error processing the order file: {str(e)}",
+                "error_processing_order_file": "Error processing the order file: {error}",
                 "reorder_list": "Reorder List", "add": "Add", "delete": "Delete", "up": "Up", "down": "Down",
                 "save_apply": "Save and Apply", "success_list_reordered": "The records list has been reordered.",
                 "text_editor_title": "Text Editor: {filename}", "save_close": "Save and Close",
@@ -362,37 +2479,88 @@ class GitHubJSONEditor:
                 "json_error": "JSON Error", "json_error_details": "The text is not a valid JSON.\n\n{e}",
                 "token_needed_to_save": "A GitHub token in token.txt is needed to save changes",
                 "commit_update_records": "Update records in {filename}",
-                "success_changes_saved_github": "Changes saved successfully to GitHub"
+                "success_changes_saved_github": "Changes saved successfully to GitHub",
+                "success_changes_saved_local": "Changes saved in a local commit. Use 'Sync All' to upload them to GitHub.",
+                "success_file_deleted_local": "File '{filename}' deleted in the local clone. Use 'Sync All' to upload the change to GitHub.",
+                "success_level_added_local": "Level '{name}' added as '{filename}' in the local clone. Use 'Sync All' to upload it to GitHub.",
+                "confirm_exit_unpushed": "{count} local commits have not been pushed to GitHub. Exit anyway?",
+                "status_working": "Working...",
+                "status_loading_records": "Loading {name}: {count} records...",
+                "no_changes_to_save": "There are no changes to save.",
+                "pending_changes": "Unsaved ({count})",
+                "pending_changes_title": "Levels with unsaved changes",
+                "pending_file": "File",
+                "pending_level": "Level",
+                "pending_records": "Records",
+                "open": "Open",
+                "discard": "Discard",
+                "save_all_dirty": "Save All",
+                "confirm_discard_changes": "Discard the unsaved changes to {filename}?",
+                "commit_save_all": "Update {count} levels",
+                "success_saved_all": "{count} levels saved in a single commit.",
+                "success_staged_all": "{count} levels added to the pending changes.",
+                "confirm_exit_unsaved": "{count} levels have unsaved changes. Exit anyway?",
+                "confirm_exit_staged": "{count} grouped changes have not been published and will be lost. Exit anyway?",
+                "confirm_discard_pending_repo": "There are {count} unpublished or unsaved changes for the current repository. Changing the repository or folder will discard them. Continue?",
+                "status_list_refresh_failed": "Could not refresh the list (showing the last saved one): {error}",
+                "warn_task_running": "Wait for the current operation to finish.",
+                "sync_all": "Sync All",
+                "success_sync": "Synced {count} JSON files ({downloaded} downloaded, {size:.1f} KB) in {seconds:.2f} s.",
+                "warn_tree_truncated": "GitHub truncated the repository tree; some files will be loaded on demand.",
+                "batch_commits": "Group into one commit",
+                "publish_changes": "Publish ({count})",
+                "commit_batch": "Update {count} files",
+                "success_change_staged": "Change staged.\nUse 'Publish' to upload all pending changes in a single commit.",
+                "success_published": "{count} files published in a single commit.",
+                "global_search": "Search All", "global_search_title": "Global Search",
+                "search_file": "File", "search_row": "Row", "search_fields": "Fields", "search_match": "Match",
+                "level_metadata_row": "Level",
+                "search_status": "{results} results in {files} indexed levels ({ms:.1f} ms).",
+                "search_not_indexed": "{count} files not downloaded yet are not indexed: use 'Sync All'.",
+                "move_to_rank": "Move to rank", "rank_prompt": "New rank (1-{count}):",
+                "warn_invalid_rank": "Enter a number between 1 and {count}.", "filter": "Filter:",
+                "bulk_import_aredl": "Bulk Import from AREDL",
+                "bulk_import_prompt": "AREDL level IDs (separated by spaces, commas or new lines):",
+                "commit_bulk_add_levels": "Add {count} levels from AREDL",
+                "bulk_import_summary": "Levels created: {created}\nAlready existed: {skipped}\nFailed: {failed}",
+                "resync_aredl": "Resync AREDL",
+                "resync_summary": "{checked} levels compared with AREDL, {changes} differences. Not checked: {failed}",
+                "resync_field": "Field", "resync_current": "Current", "resync_aredl_value": "AREDL",
+                "apply_selected": "Apply Selected", "warn_select_changes": "Select at least one change.",
+                "commit_resync_level": "Update {filename} metadata from AREDL",
+                "commit_resync_levels": "Update metadata of {count} levels from AREDL",
+                "rate_limit_status": "API: {remaining}/{limit} (resets at {reset})",
+                "rate_limit_low": "⚠ API: {remaining}/{limit} left, resets at {reset}; operations will slow down",
+                "trace_summary": "Performance", "trace_operation": "Operation", "trace_phase": "Phase",
+                "trace_count": "Count", "trace_p50": "p50 (ms)", "trace_p95": "p95 (ms)", "refresh": "Refresh"
             }
         }
 
     def translate(self, key):
         return self.translations.get(self.current_lang, self.translations["en"]).get(key, key)
 
+    def translatable(self, widget, key, option="text"):
+        """Pone el texto traducido de `key` en el widget y lo registra para los cambios de idioma."""
+        widget.config(**{option: self.translate(key)})
+        self.translated_widgets.append((widget, option, key))
+        return widget
+
     def get_config_path(self):
         """Devuelve la ruta al archivo de configuración."""
-        if getattr(sys, 'frozen', False):
-            # Si la aplicación está "congelada" (ejecutable), la base es el directorio del .exe
-            base_path = os.path.dirname(sys.executable)
-        else:
-            # Si se está ejecutando como un script normal, la base es el directorio del script
-            base_path = os.path.dirname(os.path.abspath(__file__))
-        return os.path.join(base_path, "config.json")
+        return get_config_path()
 
     def load_config(self):
         """Carga la configuración desde config.json."""
-        try:
-            config_path = self.get_config_path()
-            if os.path.exists(config_path):
-                with open(config_path, "r", encoding="utf-8") as f:
-                    config = json.load(f)
-                    self.repo_url = config.get("repo_url", self.repo_url)
-                    self.folder_path = config.get("folder_path", self.folder_path)
-                    self.current_lang = config.get("language", self.current_lang)
-                    self.github_token = config.get("github_token", "")
-        except (IOError, json.JSONDecodeError):
-            # Usar valores por defecto si el archivo no existe o está corrupto
-            pass
+        config = read_config()
+        self.repo_url = config.get("repo_url", self.repo_url)
+        self.folder_path = config.get("folder_path", self.folder_path)
+        self.current_lang = config.get("language", self.current_lang)
+        self.github_token = config.get("github_token", "")
+        self.batch_commits = config.get("batch_commits", self.batch_commits)
+        self.aredl_api = config.get("aredl_api", self.aredl_api)
+        self.backend_config = {key: config[key] for key in ("backend", "local_clone", "git_remote") if key in config}
+        self.backend_config["github_token"] = self.github_token
+        self.tracing = bool(config.get("tracing", False))
 
     def save_config(self):
         """Guarda la configuración actual en config.json, preservando claves existentes como el token."""
@@ -411,6 +2579,7 @@ class GitHubJSONEditor:
         config['repo_url'] = self.repo_url
         config['folder_path'] = self.folder_path
         config['language'] = self.current_lang
+        config['batch_commits'] = self.batch_var.get() if hasattr(self, 'batch_var') else self.batch_commits
 
         try:
             with open(config_path, "w", encoding="utf-8") as f:
@@ -421,19 +2590,39 @@ class GitHubJSONEditor:
 
     def on_closing(self):
         """Maneja el evento de cierre de la ventana."""
+        dirty = self.workspace.dirty_files()
+        if dirty and not messagebox.askyesno(self.translate("warning"), self.translate("confirm_exit_unsaved").format(count=len(dirty))):
+            return
+        # Los cambios agrupados solo viven en memoria hasta publicarlos
+        if self.staged and not messagebox.askyesno(self.translate("warning"), self.translate("confirm_exit_staged").format(count=len(self.staged))):
+            return
+        if self.uses_local_clone():
+            try:
+                unpushed = self.github().unpushed_commits()
+            except (GitCommandError, OSError):
+                unpushed = 0
+            if unpushed and not messagebox.askyesno(self.translate("warning"), self.translate("confirm_exit_unpushed").format(count=unpushed)):
+                return
         self.save_config()
+        self.tasks.shutdown()
+        self.http.close()
         self.root.destroy()
         
     def parse_github_url(self, url):
         """Extrae el propietario y el nombre del repo de una URL de GitHub."""
-        parsed = urlparse(url)
-        path_parts = parsed.path.strip('/').split('/')
-        
-        if len(path_parts) >= 2:
-            owner = path_parts[0]
-            repo = path_parts[1]
-            return owner, repo
-        return None, None
+        return parse_github_url(url)
+
+    def uses_local_clone(self):
+        """Con la copia local, guardar crea un commit que no llega a GitHub hasta publicar o sincronizar."""
+        return self.backend_config.get("backend") == "local"
+
+    def can_write(self):
+        """Con la API hace falta token; la copia local escribe en disco y sube con las credenciales de git."""
+        return bool(self.github_token) or self.uses_local_clone()
+
+    def github(self):
+        """Backend (API de GitHub o clon local) para el repositorio y la carpeta configurados ahora mismo."""
+        return open_backend(self.backend_config, self.http, self.cache, self.repo_url, self.folder_path)
     
     def open_settings_window(self):
         """Abre una ventana emergente para editar la configuración."""
@@ -465,8 +2654,18 @@ class GitHubJSONEditor:
         buttons_frame.grid(row=3, column=1, sticky="e", pady=(10, 0))
 
         def save_and_close():
-            self.repo_url = url_entry.get()
-            self.folder_path = folder_entry.get()
+            new_repo_url, new_folder_path = url_entry.get(), folder_entry.get()
+            if (new_repo_url, new_folder_path) != (self.repo_url, self.folder_path):
+                # Lo pendiente pertenece al repositorio anterior: publicarlo en el nuevo lo mezclaría
+                pending = len(self.staged) + len(self.workspace.dirty_files())
+                if pending:
+                    if not messagebox.askyesno(self.translate("warning"), self.translate("confirm_discard_pending_repo").format(count=pending), parent=settings_win):
+                        return
+                self.staged.clear()
+                self.workspace = Workspace()
+                self.update_contextual_button_states()
+            self.repo_url = new_repo_url
+            self.folder_path = new_folder_path
 
             # Actualizar la UI principal (aunque estén deshabilitados, es buena práctica)
             self.repo_url_entry.config(state="normal"); self.repo_url_entry.delete(0, tk.END); self.repo_url_entry.insert(0, self.repo_url); self.repo_url_entry.config(state="disabled")
@@ -504,18 +2703,28 @@ class GitHubJSONEditor:
         settings_win.focus_set()
 
     def update_ui_language(self):
-        """Destruye y recrea todos los widgets para aplicar el nuevo idioma."""
-        for widget in self.root.winfo_children():
-            widget.destroy()
-        self.create_widgets()
-        self.load_github_files() # Recargar para que todo esté consistente
+        """Aplica el idioma actual reetiquetando los widgets registrados.
+
+        No reconstruye la interfaz ni vuelve a pedir nada a GitHub: el archivo abierto,
+        la selección y la posición de las listas se conservan.
+        """
+        self.root.title(self.translate("title"))
+        self.translated_widgets = [(widget, option, key) for widget, option, key in self.translated_widgets
+                                   if widget.winfo_exists()]
+        for widget, option, key in self.translated_widgets:
+            widget.config(**{option: self.translate(key)})
+        for column in self.records_tree["columns"]:
+            self.records_tree.heading(column, text=self.translate(column))
+        # La columna móvil muestra Sí/No traducido; el diff solo reescribe esas filas
+        self.render_records()
+        # Textos que se componen al vuelo (contador de publicación, cuota de la API)
+        self.update_contextual_button_states()
+        self.refresh_rate_limit_status()
 
-        
     def load_github_files(self):
         """Carga los archivos JSON del repositorio de GitHub y muestra el nombre del archivo."""
         self.repo_url = self.repo_url_entry.get()
         self.folder_path = self.folder_entry.get()
-        token = self.github_token
 
         if not self.repo_url or not self.folder_path:
             messagebox.showerror(self.translate("error"), self.translate("error_url_folder_empty"))
@@ -526,24 +2735,14 @@ class GitHubJSONEditor:
             messagebox.showerror(self.translate("error"), self.translate("error_invalid_github_url"))
             return
 
-        api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/{self.folder_path}"
-
-        headers = {}
-        if token:
-            headers['Authorization'] = f'token {token}'
-
-        try:
-            response = requests.get(api_url, headers=headers)
-            response.raise_for_status()
-
-            files = response.json()
-            json_files = [file['name'] for file in files if file['name'].endswith('.json')]
+        client = self.github()
 
+        def on_loaded(json_files):
             # Mostrar solo los nombres de archivo
-            self.display_files = [{"name": file_name, "file_name": file_name} for file_name in json_files]
-            self.update_files_listbox()
+            self.show_listing(json_files)
 
             # Limpiar selección actual y actualizar estado de botones
+            self.load_generation += 1  # Abandona un archivo grande que se estuviera parseando
             self.current_file_content = None
             self.current_file_name = None
             self.current_file_sha = None
@@ -552,22 +2751,206 @@ class GitHubJSONEditor:
 
             messagebox.showinfo(self.translate("success"), self.translate("success_files_found").format(count=len(self.display_files)))
 
-        except requests.exceptions.RequestException as e:
-            messagebox.showerror(self.translate("error"), self.translate("error_loading_files").format(error=str(e)))
-        except Exception as e:
-            messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=str(e)))
+        def on_error(e):
+            if isinstance(e, backend_errors()):
+                messagebox.showerror(self.translate("error"), self.translate("error_loading_files").format(error=str(e)))
+            else:
+                messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=str(e)))
+
+        self.run_task("list", client.list_files, on_loaded, on_error)
+
+    def show_listing(self, json_files):
+        """Muestra un listado [{"name", "sha"}] respetando el filtro y los cambios sin publicar."""
+        self.display_files = [{"name": file['name'], "file_name": file['name'], "sha": file['sha']} for file in json_files]
+        self.apply_staged_to_listing()
+        self.update_files_listbox(self.search_var.get())
+        self.update_contextual_button_states()
+
+    def on_first_paint(self):
+        """Primer ciclo libre de Tk tras crear la ventana: lista guardada y refresco en segundo plano."""
+        self.mark_startup("first_paint")
+        owner, repo = self.parse_github_url(self.repo_url)
+        if not owner or not repo or not self.folder_path:
+            self.finish_startup()
+            return
+        client = self.github()
+        cached = client.cached_listing()
+        if cached:
+            self.show_listing(cached)
+            self.mark_startup("cached_list")
+
+        def on_loaded(json_files):
+            # No se toca el archivo abierto ni la selección: el usuario pudo empezar con la lista guardada
+            self.show_listing(json_files)
+            self.mark_startup("list_refreshed")
+            self.finish_startup()
+
+        def on_error(e):
+            self.status_var.set(self.translate("status_list_refresh_failed").format(error=e))
+            self.finish_startup(error=type(e).__name__)
+
+        if not self.run_task("list", client.list_files, on_loaded, on_error):
+            self.finish_startup()
+
+    def mark_startup(self, phase):
+        """Anota el tiempo de una fase del arranque, contado desde que empezó a cargarse el módulo."""
+        elapsed = time.perf_counter() - STARTUP_T0
+        self.startup_times[phase] = elapsed
+        tracer.record(self.startup_trace, phase, elapsed, {})
+        logger.info("startup %s: %.0f ms", phase, elapsed * 1000)
+
+    def finish_startup(self, **attrs):
+        """Cierra la traza del arranque; con --startup-time imprime los tiempos y sale."""
+        self.startup_trace.finish(**attrs)
+        if self.startup_timing:
+            for phase, seconds in self.startup_times.items():
+                print(f"{phase}: {seconds * 1000:.0f} ms")
+            self.tasks.shutdown()
+            self.http.close()
+            self.root.after_idle(self.root.destroy)
+
+    def sync_all_files(self):
+        """Descarga de una vez todos los JSON de la carpeta a la caché local.
+
+        Usa el árbol recursivo de la rama (una petición) y pide en paralelo solo los
+        blobs que aún no están en caché, así cada nivel se abre después sin red.
+        """
+        self.repo_url = self.repo_url_entry.get()
+        self.folder_path = self.folder_entry.get()
+
+        if not self.repo_url or not self.folder_path:
+            messagebox.showerror(self.translate("error"), self.translate("error_url_folder_empty"))
+            return
+
+        owner, repo = self.parse_github_url(self.repo_url)
+        if not owner or not repo:
+            messagebox.showerror(self.translate("error"), self.translate("error_invalid_github_url"))
+            return
+
+        client = self.github()
+
+        def on_synced(result):
+            self.show_listing(result['files'])
+            if result['truncated']:
+                messagebox.showwarning(self.translate("warning"), self.translate("warn_tree_truncated"))
+            messagebox.showinfo(self.translate("success"), self.translate("success_sync").format(
+                count=len(result['files']), downloaded=result['downloaded'],
+                size=result['bytes'] / 1024, seconds=result['elapsed']))
+
+        def on_error(e):
+            if isinstance(e, backend_errors()):
+                messagebox.showerror(self.translate("error"), self.translate("error_loading_files").format(error=str(e)))
+            else:
+                messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=str(e)))
+
+        self.run_task("list", client.sync_folder, on_synced, on_error)
+
+    def read_level_bytes(self, client, file_name, known_sha):
+        """Devuelve (bytes, sha) priorizando la versión pendiente de publicar, si la hay.
+
+        Recuerda el formato del archivo para que al guardarlo se escriba igual.
+        """
+        staged = self.staged.get(file_name)
+        if staged and staged["data"] is not None:
+            data, sha = staged["data"], known_sha
+        else:
+            data, sha = client.read_file(file_name, known_sha)
+        self.file_styles[file_name] = JsonStyle.detect(data)
+        return data, sha
+
+    def encode_level(self, file_name, doc):
+        """Serializa un nivel con el formato de su archivo (el de la app si es nuevo)."""
+        return self.file_styles.get(file_name, DEFAULT_JSON_STYLE).encode(doc)
+
+    def is_unchanged(self, file_name, sha, data, doc):
+        """Indica si escribir data no cambiaría nada respecto a lo pendiente o a lo descargado.
+
+        Primero compara el SHA del blob (sin red); si solo difiere el formato (un archivo
+        escrito a mano) se compara el documento con el de la caché.
+        """
+        staged = self.staged.get(file_name)
+        if staged is not None:
+            baseline = staged["data"]
+            if baseline is None:
+                return False  # Borrado pendiente: guardar lo recupera
+        else:
+            if not sha:
+                return False
+            if git_blob_sha(data) == sha:
+                return True
+            baseline = self.cache.get_blob(sha)
+            if baseline is None:
+                return False
+        if data == baseline:
+            return True
+        try:
+            return json.loads(baseline.decode('utf-8')) == doc
+        except ValueError:
+            return False
+
+    def get_known_sha(self, file_name):
+        """SHA del archivo según el último listado, si se conoce."""
+        for item in getattr(self, 'display_files', None) or []:
+            if item["file_name"] == file_name:
+                return item.get("sha")
+        return None
+
+    def set_known_sha(self, file_name, sha):
+        """Actualiza el SHA del listado tras escribir un archivo para no servir una copia antigua."""
+        for item in getattr(self, 'display_files', None) or []:
+            if item["file_name"] == file_name:
+                item["sha"] = sha
+                return
+
+    def insert_listed_file(self, file_name, sha):
+        """Añade un archivo al listado en su posición ordenada, sin volver a listar la carpeta."""
+        if not hasattr(self, 'display_files'):
+            self.display_files = []
+        if any(item["file_name"] == file_name for item in self.display_files):
+            self.set_known_sha(file_name, sha)
+            return
+        names = [item["name"] for item in self.display_files]
+        index = bisect.bisect_left(names, file_name)
+        self.display_files.insert(index, {"name": file_name, "file_name": file_name, "sha": sha})
+
+        self.update_files_listbox(self.search_var.get())
+        self.update_contextual_button_states()
+
+    def remove_listed_file(self, file_name):
+        """Quita un archivo del listado y del listbox, sin volver a listar la carpeta."""
+        self.display_files = [item for item in getattr(self, 'display_files', []) if item["file_name"] != file_name]
+        self.update_files_listbox(self.search_var.get())
+        self.search_index.remove_document(file_name)
+        self.update_contextual_button_states()
 
     def update_files_listbox(self, filter_text=""):
-        """Actualiza la lista de archivos mostrados en el listbox, usando filtro si aplica."""
-        self.files_listbox.delete(0, tk.END)
-        for item in self.display_files:
-            if filter_text.lower() in item["name"].lower():
-                self.files_listbox.insert(tk.END, item["name"])
+        """Actualiza la lista de archivos mostrados en el listbox, usando filtro si aplica.
+
+        Solo se insertan o borran las filas cuya visibilidad (o posición) cambia.
+        """
+        self.file_index.update([item["name"] for item in getattr(self, 'display_files', None) or []])
+        wanted = self.file_index.match(filter_text)
+        current = self.files_listbox.get(0, tk.END)
+        if list(current) == wanted:
+            return
+
+        opcodes = difflib.SequenceMatcher(None, current, wanted, autojunk=False).get_opcodes()
+        # Se aplican de atrás hacia delante para que los índices anteriores sigan siendo válidos
+        for tag, i1, i2, j1, j2 in reversed(opcodes):
+            if tag in ("replace", "delete"):
+                self.files_listbox.delete(i1, i2 - 1)
+            if tag in ("replace", "insert"):
+                self.files_listbox.insert(i1, *wanted[j1:j2])
 
     def update_search(self, *args):
-        """Filtra la lista de archivos según la búsqueda."""
-        filter_text = self.search_var.get()
-        self.update_files_listbox(filter_text)
+        """Filtra la lista de archivos según la búsqueda, esperando a que se deje de teclear."""
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(self.SEARCH_DELAY_MS, self.apply_search)
+
+    def apply_search(self):
+        self.search_after_id = None
+        self.update_files_listbox(self.search_var.get())
 
     def on_file_select(self, event):
         """Cuando se selecciona un archivo de la lista"""
@@ -581,44 +2964,301 @@ class GitHubJSONEditor:
                 self.load_file_content(item["file_name"])
                 break
     
-    def load_file_content(self, file_name):
-        """Carga el contenido del archivo seleccionado"""
-        owner, repo = self.parse_github_url(self.repo_url)
-        token = self.github_token
-        
-        file_path = f"{self.folder_path}/{file_name}"
-        api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/{file_path}"
-        
-        headers = {}
-        if token:
-            headers['Authorization'] = f'token {token}'
-        
-        try:
-            response = requests.get(api_url, headers=headers)
-            response.raise_for_status()
-            
-            file_data = response.json()
-            content = base64.b64decode(file_data['content']).decode('utf-8')
-            
-            self.current_file_content = json.loads(content)
+    def load_file_content(self, file_name, on_done=None):
+        """Carga el contenido del archivo seleccionado.
+
+        Los archivos grandes se parsean por partes: la tabla muestra las primeras filas
+        enseguida y el resto de records se añade por lotes entre eventos de Tk. Hasta
+        terminar el archivo no queda abierto para editarlo ni guardarlo.
+        """
+        known_sha = self.get_known_sha(file_name)
+        entry = self.workspace.get(file_name, known_sha)
+        if entry is not None:
+            # Ya está parseado (y quizá con cambios sin guardar): ni red ni parseo
+            trace = tracer.start("load", file=file_name, workspace=True)
+            self.load_generation += 1
+            self.status_var.set("")
+            self.current_file_content, self.current_file_sha = entry["doc"], entry["sha"]
             self.current_file_name = file_name
-            self.current_file_sha = file_data['sha']
-            
-            self.populate_records_treeview()
+            self.records_offset = 0
+            with trace.span("render", records=len(entry["doc"].get("records", [])) if isinstance(entry["doc"], dict) else 0):
+                self.populate_records_treeview()
             self.update_contextual_button_states()
-            
-        except requests.exceptions.RequestException as e:
-            messagebox.showerror(self.translate("error"), self.translate("error_loading_file").format(error=str(e)))
-        except Exception as e:
-            messagebox.showerror(self.translate("error"), self.translate("error_processing_file").format(error=str(e)))
+            trace.finish()
+            if on_done:
+                on_done()
+            return
+
+        client = self.github()
+        trace = tracer.start("load", file=file_name)
+        self.load_generation += 1
+        generation = self.load_generation
+
+        def fetch():
+            # La descarga, la decodificación y el parseo se hacen fuera del hilo de Tk
+            with trace.span("read") as span:
+                data, sha = self.read_level_bytes(client, file_name, known_sha)
+                span["bytes"] = size = len(data)
+            if size < self.STREAM_PARSE_MIN_BYTES:
+                with trace.span("parse", bytes=size):
+                    return json.loads(data.decode('utf-8')), sha, size, None
+            with trace.span("parse_head", bytes=size):
+                parser = IncrementalLevelParser(data.decode('utf-8'))
+                del data  # Solo se conserva el texto mientras dura el parseo
+                doc = parser.read_metadata()
+                parser.read_records(self.STREAM_FIRST_RECORDS)
+            return doc, sha, size, parser
+
+        def show(doc, sha, size):
+            self.current_file_content, self.current_file_sha = doc, sha
+            self.current_file_name = file_name
+            self.workspace.open(file_name, doc, sha, size)
+            self.update_contextual_button_states()
+            if self.current_file_sha is None or self.search_index.shas.get(file_name) != self.current_file_sha:
+                with trace.span("index"):
+                    self.search_index.update_document(file_name, self.current_file_content, self.current_file_sha)
+            trace.finish()
+            if on_done:
+                on_done()
+
+        def on_loaded(result):
+            doc, sha, size, parser = result
+            if generation != self.load_generation:
+                trace.finish(cancelled=True)  # Mientras tanto se abrió otro nivel del espacio de trabajo
+                return
+            self.records_offset = 0
+            if parser is None or parser.done:
+                self.current_file_content = doc
+                with trace.span("render", records=len(doc.get("records", [])) if isinstance(doc, dict) else 0):
+                    self.populate_records_treeview()
+                show(doc, sha, size)
+                return
+
+            # Mientras llegan records no hay archivo abierto: nada puede editar un documento a medias
+            self.current_file_content = self.current_file_sha = self.current_file_name = None
+            self.update_contextual_button_states()
+            self.record_model.sync([])
+            self.record_model.extend(doc["records"])
+            self.render_records()
+            self.reset_record_form()
+            tracer.record(trace, "first_rows", time.perf_counter() - trace.start, {"records": len(doc["records"])})
+            self.root.after(1, lambda: stream(doc, sha, size, parser))
+
+        def stream(doc, sha, size, parser):
+            if generation != self.load_generation:
+                trace.finish(cancelled=True)  # Se abrió otro archivo
+                return
+            try:
+                with trace.span("stream") as span:
+                    deadline = time.perf_counter() + self.STREAM_SLICE_MS / 1000
+                    while not parser.done and time.perf_counter() < deadline:
+                        self.record_model.extend(parser.read_records(self.STREAM_BATCH))
+                    span["records"] = len(self.record_model.order)
+            except ValueError as e:
+                trace.finish(error=type(e).__name__)
+                self.status_var.set("")
+                self.record_model.sync([])
+                self.render_records()
+                messagebox.showerror(self.translate("error"), self.translate("error_processing_file").format(error=str(e)))
+                return
+            self.render_records()
+            if not parser.done:
+                self.status_var.set(self.translate("status_loading_records").format(
+                    name=doc.get("name", file_name), count=len(self.record_model.order)))
+                self.root.after(1, lambda: stream(doc, sha, size, parser))
+                return
+            self.status_var.set("")
+            self.current_file_content = doc
+            self.refresh_records_view()  # Conserva la fila que se haya seleccionado mientras tanto
+            show(doc, sha, size)
+
+        def on_error(e):
+            if isinstance(e, backend_errors()):
+                messagebox.showerror(self.translate("error"), self.translate("error_loading_file").format(error=str(e)))
+            else:
+                messagebox.showerror(self.translate("error"), self.translate("error_processing_file").format(error=str(e)))
+
+        # Canal sin conflictos: si el usuario cambia de archivo, solo cuenta la última carga
+        self.run_task("load", fetch, on_loaded, on_error, trace=trace)
     
+    def index_current_document(self):
+        """Reindexa el archivo abierto tras un cambio en memoria (sin SHA: aún no está guardado)."""
+        if self.current_file_name and self.current_file_content is not None:
+            self.search_index.update_document(self.current_file_name, self.current_file_content)
+
+    def document_changed(self):
+        """Tras editar en memoria el archivo abierto: lo marca sin guardar y lo reindexa."""
+        if self.current_file_name and self.current_file_content is not None:
+            self.workspace.mark_dirty(self.current_file_name, self.current_file_content)
+        self.index_current_document()
+        self.update_contextual_button_states()
+
+    def refresh_search_index(self, on_done=None):
+        """Indexa en segundo plano los niveles de la caché local que no estén al día en el índice."""
+        files = [(item["file_name"], item.get("sha")) for item in getattr(self, 'display_files', None) or []]
+        pending = [(name, sha) for name, sha in files
+                   if name not in self.search_index.doc_tokens or (sha and self.search_index.shas.get(name) != sha)]
+        staged = {name: entry["data"] for name, entry in self.staged.items() if entry["data"] is not None}
+
+        # Quitar del índice los archivos que ya no están en el listado
+        listed = {name for name, _ in files}
+        for name in list(self.search_index.doc_tokens):
+            if name not in listed:
+                self.search_index.remove_document(name)
+
+        def build():
+            parsed, missing = [], 0
+            for name, sha in pending:
+                data = staged.get(name)
+                if data is None:
+                    data = self.cache.get_blob(sha) if sha else None
+                if data is None:
+                    missing += 1
+                    continue
+                try:
+                    parsed.append((name, None if name in staged else sha, json.loads(data.decode('utf-8'))))
+                except ValueError:
+                    continue  # Un JSON inválido no debe impedir indexar el resto
+            return parsed, missing
+
+        def on_built(result):
+            parsed, missing = result
+            for name, sha, doc in parsed:
+                # Los niveles abiertos pueden tener cambios en memoria más recientes
+                if name == self.current_file_name and self.current_file_content is not None:
+                    continue
+                if name in self.workspace and self.workspace.peek(name)["dirty"]:
+                    continue
+                self.search_index.update_document(name, doc, sha)
+            if on_done:
+                on_done(missing)
+
+        def on_error(e):
+            messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=str(e)))
+
+        self.run_task("index", build, on_built, on_error)
+
+    def open_global_search_window(self):
+        """Busca en los records y metadatos de todos los niveles y salta al resultado elegido."""
+        win = tk.Toplevel(self.root)
+        win.title(self.translate("global_search_title"))
+        win.transient(self.root)
+        win.geometry("800x500")
+        win.rowconfigure(1, weight=1)
+        win.columnconfigure(0, weight=1)
+
+        query_frame = ttk.Frame(win, padding="10")
+        query_frame.grid(row=0, column=0, sticky="ew")
+        query_frame.columnconfigure(1, weight=1)
+        ttk.Label(query_frame, text=self.translate("search"), font=self.font_normal).grid(row=0, column=0, sticky="w")
+        query_var = tk.StringVar()
+        query_entry = ttk.Entry(query_frame, textvariable=query_var, font=self.font_normal)
+        query_entry.grid(row=0, column=1, sticky="ew", padx=5)
+
+        results_frame = ttk.Frame(win, padding=(10, 0))
+        results_frame.grid(row=1, column=0, sticky="nsew")
+        results_frame.rowconfigure(0, weight=1)
+        results_frame.columnconfigure(0, weight=1)
+
+        columns = ("file", "row", "fields", "match")
+        results_tree = ttk.Treeview(results_frame, columns=columns, show="headings")
+        results_tree.heading("file", text=self.translate("search_file"))
+        results_tree.heading("row", text=self.translate("search_row"))
+        results_tree.heading("fields", text=self.translate("search_fields"))
+        results_tree.heading("match", text=self.translate("search_match"))
+        results_tree.column("file", width=180)
+        results_tree.column("row", width=70, anchor="center")
+        results_tree.column("fields", width=120)
+        results_tree.column("match", width=400)
+        results_tree.grid(row=0, column=0, sticky="nsew")
+        scrollbar = ttk.Scrollbar(results_frame, orient="vertical", command=results_tree.yview)
+        scrollbar.grid(row=0, column=1, sticky="ns")
+        results_tree.config(yscrollcommand=scrollbar.set)
+
+        status_var = tk.StringVar()
+        ttk.Label(win, textvariable=status_var, font=self.font_normal, padding="10").grid(row=2, column=0, sticky="w")
+
+        hits = {}
+        missing_count = [0]
+
+        def run_query(*args):
+            start = time.perf_counter()
+            results = self.search_index.search(query_var.get())
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            results_tree.delete(*results_tree.get_children())
+            hits.clear()
+            for i, (file_name, row, fields, label) in enumerate(results):
+                row_text = self.translate("level_metadata_row") if row is None else str(row + 1)
+                results_tree.insert("", tk.END, iid=str(i), values=(file_name, row_text, ", ".join(fields), label))
+                hits[str(i)] = (file_name, row)
+            status = self.translate("search_status").format(results=len(results), files=len(self.search_index), ms=elapsed_ms)
+            if missing_count[0]:
+                status += "  " + self.translate("search_not_indexed").format(count=missing_count[0])
+            status_var.set(status)
+
+        def on_open(event=None):
+            selection = results_tree.selection()
+            if selection:
+                file_name, row = hits[selection[0]]
+                self.jump_to_record(file_name, row)
+
+        def on_indexed(missing):
+            missing_count[0] = missing
+            if win.winfo_exists():
+                run_query()
+
+        query_var.trace_add("write", run_query)
+        results_tree.bind("<Double-1>", on_open)
+        results_tree.bind("<Return>", on_open)
+
+        ttk.Button(win, text=self.translate("accept"), command=win.destroy, style="Custom.TButton").grid(row=2, column=0, sticky="e", padx=10, pady=10)
+        query_entry.focus_set()
+        self.refresh_search_index(on_indexed)
+
+    def jump_to_record(self, file_name, row):
+        """Abre un archivo (si no lo está ya) y selecciona el record indicado."""
+        visible = self.files_listbox.get(0, tk.END)
+        if file_name in visible:
+            index = visible.index(file_name)
+            self.files_listbox.selection_clear(0, tk.END)
+            self.files_listbox.selection_set(index)
+            self.files_listbox.see(index)
+
+        if self.current_file_name == file_name and self.current_file_content is not None:
+            self.select_record_row(row)
+        else:
+            self.load_file_content(file_name, on_done=lambda: self.select_record_row(row))
+
+    def select_record_row(self, row):
+        """Selecciona y muestra la fila del record con ese índice (None = ninguna)."""
+        if row is None:
+            return
+        iid = self.record_model.uid_at(row)
+        if iid is None:
+            return
+        if self.virtual_records:
+            self.scroll_records_to(row)
+        if self.records_tree.exists(iid):
+            self.records_tree.selection_set(iid)
+            self.records_tree.focus(iid)
+            self.records_tree.see(iid)
+
     def on_record_select(self, event):
         """Cuando se selecciona un record de la tabla"""
         selection = self.records_tree.selection()
         if not selection:
+            # En modo virtual la fila seleccionada desaparece al salir de la ventana
+            # visible, pero el record sigue seleccionado para el formulario.
+            if (self.virtual_records and self.selected_record_id is not None
+                    and not self.records_tree.exists(self.selected_record_id)
+                    and self.record_model.index_of(self.selected_record_id) is not None):
+                return
             self.selected_record_id = None
             return
-        
+        if selection[0] == self.selected_record_id:
+            # Re-selección tras volver a mostrarse la fila: no pisar lo que se esté editando
+            return
+
         self.selected_record_id = selection[0]
         record_values = self.records_tree.item(self.selected_record_id, 'values')
 
@@ -634,13 +3274,133 @@ class GitHubJSONEditor:
         self.hz_entry.delete(0, tk.END)
         self.hz_entry.insert(0, record_values[3])
 
-        self.mobile_var.set(record_values[4] == self.translate("yes"))
+        # El texto de la columna depende del idioma: el valor se lee del propio record
+        record = self.record_model.record(self.selected_record_id)
+        self.mobile_var.set(record is not None and record.get("mobile") is True)
 
     def populate_records_treeview(self):
-        """Rellena la tabla con los records del archivo actual"""
-        # Limpiar tabla
-        for i in self.records_tree.get_children():
-            self.records_tree.delete(i)
+        """Rellena la tabla con los records del archivo actual y limpia el formulario"""
+        self.refresh_records_view()
+        self.reset_record_form()
+
+    def record_row_values(self, record, yes=None, no=None):
+        mobile_status = (yes or self.translate("yes")) if record.get("mobile") is True else (no or self.translate("no"))
+        return (record.get("user", ""), record.get("link", ""), record.get("percent", ""), record.get("hz", ""), mobile_status)
+
+    def refresh_records_view(self):
+        """Sincroniza la tabla con los records actuales aplicando solo las diferencias.
+
+        Conserva la selección, el formulario y el scroll.
+        """
+        records = []
+        if self.current_file_content and "records" in self.current_file_content:
+            records = self.current_file_content["records"]
+        self.record_model.sync(records)
+        self.render_records()
+
+    def render_records(self):
+        """Dibuja la tabla según el modelo: entera o, con muchos records, la ventana visible."""
+        order = self.record_model.order
+        self.virtual_records = len(order) > self.VIRTUAL_RECORDS_THRESHOLD
+        if self.virtual_records:
+            self.render_records_window()
+            return
+        self.records_offset = 0
+        yes, no = self.translate("yes"), self.translate("no")
+        self.records_rows.render([(uid, self.record_row_values(self.record_model.record(uid), yes, no)) for uid in order])
+
+    def visible_record_rows(self):
+        """Número de filas que caben en la tabla con su tamaño actual."""
+        tree = self.records_tree
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 0) or tkfont.nametofont("TkDefaultFont").metrics("linespace") + 4
+        height = tree.winfo_height()
+        if height <= 1:  # todavía sin dibujar
+            return int(tree.cget("height"))
+        return max(1, height // row_height - 1)  # una fila la ocupa la cabecera
+
+    def render_records_window(self):
+        """Modo virtual: crea solo las filas de la ventana visible (más un pequeño margen).
+
+        Desplazarse unas filas cuesta unas pocas inserciones y borrados en el Treeview,
+        sin importar cuántos records tenga el archivo.
+        """
+        order = self.record_model.order
+        total = len(order)
+        visible = self.visible_record_rows()
+        self.records_offset = max(0, min(self.records_offset, total - visible))
+        end = min(total, self.records_offset + visible + self.VIRTUAL_RECORDS_BUFFER)
+
+        yes, no = self.translate("yes"), self.translate("no")
+        self.records_rows.render([(uid, self.record_row_values(self.record_model.record(uid), yes, no))
+                                  for uid in order[self.records_offset:end]])
+        self.records_tree.yview_moveto(0)
+        if total:
+            self.records_scrollbar.set(self.records_offset / total, min(1.0, (self.records_offset + visible) / total))
+        else:
+            self.records_scrollbar.set(0.0, 1.0)
+
+        selected = self.selected_record_id
+        if selected is not None and self.records_tree.exists(selected) and selected not in self.records_tree.selection():
+            self.records_tree.selection_set(selected)
+
+    def scroll_records_to(self, row):
+        """Desplaza la ventana virtual lo mínimo para que se vea la fila indicada."""
+        visible = self.visible_record_rows()
+        if row < self.records_offset:
+            self.records_offset = row
+        elif row >= self.records_offset + visible:
+            self.records_offset = row - visible + 1
+        else:
+            return
+        self.render_records_window()
+
+    def on_records_scroll(self, action, amount, unit=None):
+        """Comando de la barra de scroll: en modo virtual mueve la ventana de records."""
+        if not self.virtual_records:
+            self.records_tree.yview(action, amount, *([unit] if unit else []))
+            return
+        total = len(self.record_model.order)
+        if action == "moveto":
+            self.records_offset = int(float(amount) * total)
+        else:
+            step = self.visible_record_rows() if unit == "pages" else 1
+            self.records_offset += int(amount) * step
+        self.render_records_window()
+
+    def on_records_tree_yscroll(self, first, last):
+        # En modo virtual la posición de la barra la calcula render_records_window
+        if not self.virtual_records:
+            self.records_scrollbar.set(first, last)
+
+    def on_records_wheel(self, event):
+        if not self.virtual_records:
+            return None
+        if event.num == 4 or event.delta > 0:
+            self.records_offset -= 3
+        else:
+            self.records_offset += 3
+        self.render_records_window()
+        return "break"
+
+    def on_records_key(self, step):
+        """Flechas y RePág/AvPág en modo virtual: mueven el foco más allá de la ventana."""
+        if not self.virtual_records:
+            return None
+        current = self.record_model.index_of(self.records_tree.focus())
+        if current is None:
+            current = self.records_offset
+        if step in ("page_up", "page_down"):
+            visible = self.visible_record_rows()
+            step = -visible if step == "page_up" else visible
+        row = max(0, min(len(self.record_model.order) - 1, current + step))
+        self.select_record_row(row)
+        return "break"
+
+    def reset_record_form(self):
+        """Limpia los campos de entrada y la selección."""
+        selection = self.records_tree.selection()
+        if selection:
+            self.records_tree.selection_remove(*selection)
 
         # Limpiar campos de entrada y selección
         self.user_entry.delete(0, tk.END)
@@ -651,12 +3411,6 @@ class GitHubJSONEditor:
         self.hz_entry.insert(0, " ")
         self.mobile_var.set(False)
         self.selected_record_id = None
-
-        if self.current_file_content and "records" in self.current_file_content:
-            for i, record in enumerate(self.current_file_content["records"]):
-                mobile_status = self.translate("yes") if record.get("mobile") is True else self.translate("no")
-                values = (record.get("user", ""), record.get("link", ""), record.get("percent", ""), record.get("hz", ""), mobile_status)
-                self.records_tree.insert("", tk.END, iid=str(i), values=values)
     
     def add_record(self):
         """Agrega un nuevo record al JSON"""
@@ -680,14 +3434,7 @@ class GitHubJSONEditor:
             return
 
         # Crear nuevo record
-        new_record = {
-            "user": user,
-            "link": link,
-            "percent": percent,
-            "hz": hz
-        }
-        if self.mobile_var.get():
-            new_record["mobile"] = True
+        new_record = build_record(user, link, percent, hz, self.mobile_var.get())
 
         # Asegurarse de que existe el array de records
         if "records" not in self.current_file_content:
@@ -698,11 +3445,16 @@ class GitHubJSONEditor:
 
         # Actualizar la vista (esto también limpia y resetea los campos)
         self.populate_records_treeview()
+        if self.virtual_records:
+            self.scroll_records_to(len(self.current_file_content["records"]) - 1)
+        self.document_changed()
 
         messagebox.showinfo(self.translate("success"), self.translate("success_record_added"))
 
     def update_record(self):
         """Actualiza un record existente"""
+        if self.current_file_content is None:
+            return  # Archivo aún cargándose: la fila es de un documento a medias
         if self.selected_record_id is None:
             messagebox.showwarning(self.translate("warning"), self.translate("warn_select_record_update"))
             return
@@ -722,8 +3474,10 @@ class GitHubJSONEditor:
             messagebox.showwarning(self.translate("warning"), self.translate("warn_percent_integer"))
             return
 
-        record_index = int(self.selected_record_id)
-        record = self.current_file_content["records"][record_index]
+        record = self.record_model.record(self.selected_record_id)
+        if record is None:
+            messagebox.showwarning(self.translate("warning"), self.translate("warn_select_record_update"))
+            return
         
         record["user"] = user
         record["link"] = link
@@ -735,11 +3489,15 @@ class GitHubJSONEditor:
         elif "mobile" in record:
             del record["mobile"]
 
-        self.populate_records_treeview()
+        # Solo cambia una fila: el diff la actualiza sin perder selección ni scroll
+        self.refresh_records_view()
+        self.document_changed()
         messagebox.showinfo(self.translate("success"), self.translate("success_record_updated"))
 
     def delete_record(self):
         """Elimina el record seleccionado"""
+        if self.current_file_content is None:
+            return  # Archivo aún cargándose: la fila es de un documento a medias
         if self.selected_record_id is None:
             messagebox.showwarning(self.translate("warning"), self.translate("warn_select_record_delete"))
             return
@@ -748,10 +3506,13 @@ class GitHubJSONEditor:
             return
 
         try:
-            record_index = int(self.selected_record_id)
+            record_index = self.record_model.index_of(self.selected_record_id)
+            if record_index is None:
+                raise IndexError(self.selected_record_id)
             del self.current_file_content["records"][record_index]
             
             self.populate_records_treeview()
+            self.document_changed()
             messagebox.showinfo(self.translate("success"), self.translate("success_record_deleted"))
         except (ValueError, IndexError):
             messagebox.showerror(self.translate("error"), self.translate("error_deleting_record"))
@@ -832,65 +3593,114 @@ class GitHubJSONEditor:
                 percent_val = int(fields[self.translate("level_percent_qualify")].get().strip())
                 creators_list = [c.strip() for c in fields[self.translate("level_creators")].get().strip().split(',') if c.strip()]
 
-                content_dict = {
+                # Se actualiza una copia del documento: las claves conservan su orden y las
+                # que el formulario no muestra se mantienen
+                content_dict = dict(self.current_file_content)
+                content_dict.update({
                     "id": id_val, "name": name,
-                    "author": fields["Autor"].get().strip(),
-                    "verifier": fields["Verificador"].get().strip(),
+                    "author": fields[self.translate("level_author")].get().strip(),
+                    "verifier": fields[self.translate("level_verifier")].get().strip(),
                     "creators": creators_list,
-                    "verification": fields["Link de Verificación"].get().strip(),
+                    "verification": fields[self.translate("level_verification_link")].get().strip(),
                     "percentToQualify": percent_val,
-                    "records": self.current_file_content.get("records", [])
-                }
-                content_json = json.dumps(content_dict, indent=2, ensure_ascii=False)
-                encoded_content = base64.b64encode(content_json.encode('utf-8')).decode('utf-8')
-
-                owner, repo = self.parse_github_url(self.repo_url_entry.get())
-                token = self.github_token
-                file_path = f"{self.folder_entry.get()}/{self.current_file_name}"
-                api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/{file_path}"
-                headers = {'Authorization': f'token {token}'}
-                commit_data = { "message": self.translate("commit_update_metadata").format(filename=self.current_file_name), "content": encoded_content, "sha": self.current_file_sha }
+                })
+                content_data = self.encode_level(self.current_file_name, content_dict)
+                commit_message = self.translate("commit_update_metadata").format(filename=self.current_file_name)
+            except ValueError:
+                messagebox.showerror(self.translate("error"), self.translate("error_id_percent_integer"), parent=win)
+                return
+            except Exception as e:
+                messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=str(e)), parent=win)
+                return
 
-                response = requests.put(api_url, headers=headers, json=commit_data)
-                response.raise_for_status()
+            file_name = self.current_file_name
+            revision = self.workspace.revision(file_name)
+            if self.is_unchanged(file_name, self.current_file_sha, content_data, content_dict):
+                self.workspace.mark_saved(file_name, revision=revision)
+                self.update_contextual_button_states()
+                win.destroy()
+                messagebox.showinfo(self.translate("success"), self.translate("no_changes_to_save"))
+                return
 
+            if self.batch_var.get():
+                self.stage_change(file_name, content_data, commit_message)
                 win.destroy()
-                self.load_file_content(self.current_file_name) # Recargar para obtener nuevo SHA
+                self.current_file_content = content_dict # Mostrar la versión pendiente de publicar
+                self.workspace.mark_saved(file_name, revision=revision, doc=content_dict)
+                self.index_current_document()
+                self.update_contextual_button_states()
+                messagebox.showinfo(self.translate("success"), self.translate("success_change_staged"))
+                return
+
+            client = self.github()
+            sha = self.current_file_sha
+
+            def commit():
+                return client.put_file(file_name, content_data, commit_message, sha)
+
+            def on_saved(new_sha):
+                if win.winfo_exists():
+                    win.destroy()
+                self.set_known_sha(file_name, new_sha)
+                if self.current_file_name == file_name:
+                    # Lo enviado es ya el nuevo estado: no hace falta volver a descargarlo
+                    self.current_file_content = content_dict
+                    self.current_file_sha = new_sha
+                    self.workspace.mark_saved(file_name, new_sha, revision, doc=content_dict)
+                    self.search_index.update_document(file_name, content_dict, new_sha)
+                    self.update_contextual_button_states()
                 messagebox.showinfo(self.translate("success"), self.translate("success_metadata_updated"))
 
-            except ValueError:
-                messagebox.showerror(self.translate("error"), self.translate("error_id_percent_integer"), parent=win)
-            except requests.exceptions.RequestException as e:
-                messagebox.showerror(self.translate("error"), self.translate("error_saving_changes").format(error=str(e)), parent=win)
-            except Exception as e:
-                messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=str(e)), parent=win)
+            def on_error(e):
+                if isinstance(e, backend_errors()):
+                    messagebox.showerror(self.translate("error"), self.translate("error_saving_changes").format(error=str(e)), parent=self._dialog_parent(win))
+                else:
+                    messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=str(e)), parent=self._dialog_parent(win))
+
+            self.run_task("write", commit, on_saved, on_error, parent=win)
 
         def delete_level():
             if not messagebox.askyesno(self.translate("confirm_deletion"), self.translate("confirm_delete_level").format(filename=self.current_file_name), parent=win):
                 return
-            try:
-                owner, repo = self.parse_github_url(self.repo_url_entry.get())
-                token = self.github_token
-                file_path = f"{self.folder_entry.get()}/{self.current_file_name}"
-                api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/{file_path}"
-                headers = {'Authorization': f'token {token}'}
-                commit_data = { "message": self.translate("commit_delete_level").format(filename=self.current_file_name), "sha": self.current_file_sha }
+            file_name = self.current_file_name
+            commit_message = self.translate("commit_delete_level").format(filename=file_name)
+
+            def forget_current_file():
+                self.workspace.discard(file_name)
+                if self.current_file_name == file_name:
+                    self.current_file_name = None
+                    self.current_file_content = None
+                    self.current_file_sha = None
+                    self.populate_records_treeview()
+                    self.update_contextual_button_states()
+
+            if self.batch_var.get():
+                self.stage_change(file_name, None, commit_message)
+                win.destroy()
+                forget_current_file()
+                messagebox.showinfo(self.translate("success"), self.translate("success_change_staged"))
+                return
 
-                response = requests.delete(api_url, headers=headers, json=commit_data)
-                response.raise_for_status()
+            client = self.github()
+            sha = self.current_file_sha
 
-                messagebox.showinfo(self.translate("success"), self.translate("success_file_deleted").format(filename=self.current_file_name))
-                win.destroy()
-                self.current_file_name = None
-                self.current_file_content = None
-                self.current_file_sha = None
-                self.populate_records_treeview()
-                self.update_contextual_button_states()
-                self.load_github_files()
-            except requests.exceptions.RequestException as e:
-                messagebox.showerror(self.translate("error"), self.translate("error_deleting_file").format(error=str(e)), parent=win)
-            except Exception as e:
-                messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=str(e)), parent=win)
+            def commit():
+                client.delete_file(file_name, sha, commit_message)
+
+            def on_deleted(_):
+                messagebox.showinfo(self.translate("success"), self.translate("success_file_deleted_local" if self.uses_local_clone() else "success_file_deleted").format(filename=file_name))
+                if win.winfo_exists():
+                    win.destroy()
+                forget_current_file()
+                self.remove_listed_file(file_name)
+
+            def on_error(e):
+                if isinstance(e, backend_errors()):
+                    messagebox.showerror(self.translate("error"), self.translate("error_deleting_file").format(error=str(e)), parent=self._dialog_parent(win))
+                else:
+                    messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=str(e)), parent=self._dialog_parent(win))
+
+            self.run_task("write", commit, on_deleted, on_error, parent=win)
 
         buttons_frame = ttk.Frame(frame)
         buttons_frame.grid(row=len(fields), column=0, columnspan=2, sticky="ew", pady=(10, 0))
@@ -945,40 +3755,39 @@ class GitHubJSONEditor:
                 return
 
             level_id = level_id.strip()
-            API_BASE = 'https://api.aredl.net/v2/api/aredl/levels'
 
-            try:
-                # Obtener información principal del nivel
-                info_resp = requests.get(f"{API_BASE}/{level_id}")
-                info_resp.raise_for_status()
-                info = info_resp.json()
-
-                # Obtener creadores
-                creators_resp = requests.get(f"{API_BASE}/{level_id}/creators")
-                creators_resp.raise_for_status()
-                creators_data = creators_resp.json()
+            def on_fetched(result):
+                if not win.winfo_exists():
+                    return
+                content = aredl_level_content(*result)
 
                 # Rellenar campos
-                fields[self.translate("level_id")].set(info.get('level_id', ''))
-                fields[self.translate("level_name")].set(info.get('name', ''))
-                fields[self.translate("level_author")].set(info.get('publisher', {}).get('global_name', ''))
-                
-                verifications = info.get('verifications')
-                fields[self.translate("level_verifier")].set(verifications[0].get('submitted_by', {}).get('global_name', '') if verifications else '')
-                fields[self.translate("level_verification_link")].set(verifications[0].get('video_url', '') if verifications else '')
-
-                creator_names = [c.get('global_name') for c in creators_data if c.get('global_name')]
-                fields[self.translate("level_creators")].set(", ".join(creator_names) if creator_names else info.get('publisher', {}).get('global_name', ''))
-
+                fields[self.translate("level_id")].set(content["id"])
+                fields[self.translate("level_name")].set(content["name"])
+                fields[self.translate("level_author")].set(content["author"])
+                fields[self.translate("level_verifier")].set(content["verifier"])
+                fields[self.translate("level_verification_link")].set(content["verification"])
+                fields[self.translate("level_creators")].set(", ".join(content["creators"]))
                 fields[self.translate("level_percent_qualify")].set("100")
                 messagebox.showinfo(self.translate("success"), self.translate("success_aredl_import"), parent=win)
 
-            except requests.exceptions.HTTPError as e:
-                messagebox.showerror(self.translate("api_error"), self.translate("api_error_details").format(code=e.response.status_code, level_id=level_id), parent=win)
-            except requests.exceptions.RequestException as e:
-                messagebox.showerror(self.translate("network_error"), self.translate("network_error_details").format(e=e), parent=win)
-            except Exception as e:
-                messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=e), parent=win)
+            def on_error(e):
+                parent = self._dialog_parent(win)
+                if isinstance(e, load_requests().exceptions.HTTPError):
+                    messagebox.showerror(self.translate("api_error"), self.translate("api_error_details").format(code=e.response.status_code, level_id=level_id), parent=parent)
+                elif isinstance(e, backend_errors()):
+                    messagebox.showerror(self.translate("network_error"), self.translate("network_error_details").format(e=e), parent=parent)
+                else:
+                    messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=e), parent=parent)
+
+            trace = tracer.start("import", level_id=level_id)
+            fill = on_fetched
+
+            def on_fetched(result):
+                trace.finish()
+                fill(result)
+
+            self.run_task("aredl", lambda: self.aredl.fetch_level(level_id), on_fetched, on_error, parent=win, trace=trace)
 
         def save_new_level():
             try:
@@ -1001,11 +3810,10 @@ class GitHubJSONEditor:
                 creators_list = [c.strip() for c in creators_str.split(',') if c.strip()]
                 
                 # 2. Create filename
-                safe_name = re.sub(r'[^a-z0-9_]', '', name.lower().replace(' ', '_'))
-                if not safe_name:
+                file_name = level_file_name(name)
+                if not file_name:
                     messagebox.showerror(self.translate("error"), self.translate("invalid_level_name_filename"), parent=win)
                     return
-                file_name = f"{safe_name}.json"
 
                 # 3. Check if file exists in loaded list
                 if hasattr(self, 'display_files') and self.display_files and any(d['name'].lower() == file_name.lower() for d in self.display_files):
@@ -1014,38 +3822,52 @@ class GitHubJSONEditor:
 
                 # 4. Construct JSON
                 content_dict = { "id": id_val, "name": name, "author": author, "verifier": verifier, "creators": creators_list, "verification": verification, "percentToQualify": percent_val, "records": [] }
-                content_json = json.dumps(content_dict, indent=2, ensure_ascii=False)
-                encoded_content = base64.b64encode(content_json.encode('utf-8')).decode('utf-8')
+                content_data = DEFAULT_JSON_STYLE.encode(content_dict)
+                commit_message = self.translate("commit_add_level").format(name=name)
 
-                # 5. Commit to GitHub
-                owner, repo = self.parse_github_url(self.repo_url_entry.get())
-                token = self.github_token
-                if not token:
+                if not self.can_write():
                     messagebox.showerror(self.translate("error"), self.translate("token_needed_to_create"), parent=win)
                     return
 
-                file_path = f"{self.folder_entry.get()}/{file_name}"
-                api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/{file_path}"
-                headers = {'Authorization': f'token {token}'}
-                commit_data = { "message": self.translate("commit_add_level").format(name=name), "content": encoded_content }
-
-                response = requests.put(api_url, headers=headers, json=commit_data)
-                response.raise_for_status()
-                
-                messagebox.showinfo(self.translate("success"), self.translate("success_level_added").format(name=name, filename=file_name))
-                win.destroy()
-                self.load_github_files() # Refresh the list
-
             except ValueError:
                 messagebox.showerror(self.translate("error"), self.translate("error_id_percent_integer"), parent=win)
-            except requests.exceptions.RequestException as e:
-                messagebox.showerror(self.translate("error"), self.translate("error_creating_file").format(error=str(e)), parent=win)
+                return
             except Exception as e:
                 messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=str(e)), parent=win)
+                return
+
+            # 5. Commit to GitHub (or stage it for the next batch commit)
+            if self.batch_var.get():
+                self.stage_change(file_name, content_data, commit_message, new=True)
+                self.search_index.update_document(file_name, content_dict)
+                win.destroy()
+                messagebox.showinfo(self.translate("success"), self.translate("success_change_staged"))
+                return
+
+            client = self.github()
+
+            def commit():
+                return client.put_file(file_name, content_data, commit_message)
+
+            def on_created(new_sha):
+                messagebox.showinfo(self.translate("success"), self.translate("success_level_added_local" if self.uses_local_clone() else "success_level_added").format(name=name, filename=file_name))
+                if win.winfo_exists():
+                    win.destroy()
+                self.insert_listed_file(file_name, new_sha) # Update the list in place, no reload
+                self.search_index.update_document(file_name, content_dict, new_sha)
+
+            def on_error(e):
+                if isinstance(e, backend_errors()):
+                    messagebox.showerror(self.translate("error"), self.translate("error_creating_file").format(error=str(e)), parent=self._dialog_parent(win))
+                else:
+                    messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=str(e)), parent=self._dialog_parent(win))
+
+            self.run_task("write", commit, on_created, on_error, parent=win)
 
         buttons_frame = ttk.Frame(frame)
         buttons_frame.grid(row=len(fields), column=0, columnspan=2, sticky="ew", pady=(10, 0))
         ttk.Button(buttons_frame, text=self.translate("import_from_aredl"), command=import_from_aredl, style="Custom.TButton").pack(side="left")
+        ttk.Button(buttons_frame, text=self.translate("bulk_import_aredl"), command=lambda: self.open_bulk_import_window(win), style="Custom.TButton").pack(side="left", padx=5)
         ttk.Button(buttons_frame, text=self.translate("save"), command=save_new_level, style="Custom.TButton").pack(side="right")
         ttk.Button(buttons_frame, text=self.translate("cancel"), command=win.destroy, style="Custom.TButton").pack(side="right", padx=5)
 
@@ -1057,6 +3879,255 @@ class GitHubJSONEditor:
         win.geometry(f"+{pos_x}+{pos_y}")
         win.focus_set()
 
+    def open_bulk_import_window(self, parent):
+        """Pide una lista de IDs de AREDL y crea todos los niveles de una vez."""
+        win = tk.Toplevel(parent)
+        win.title(self.translate("bulk_import_aredl"))
+        win.transient(parent)
+        win.grab_set()
+
+        frame = ttk.Frame(win, padding="15")
+        frame.pack(expand=True, fill="both")
+        frame.columnconfigure(0, weight=1)
+        frame.rowconfigure(1, weight=1)
+
+        ttk.Label(frame, text=self.translate("bulk_import_prompt"), font=self.font_normal).grid(row=0, column=0, sticky="w", pady=(0, 5))
+        ids_text = tk.Text(frame, width=50, height=10, font=self.font_mono)
+        ids_text.grid(row=1, column=0, sticky="nsew")
+
+        def start_import():
+            tokens = [t for t in re.split(r'[\s,;]+', ids_text.get("1.0", tk.END)) if t]
+            if not tokens or not all(t.isdigit() for t in tokens):
+                messagebox.showwarning(self.translate("invalid_input"), self.translate("numeric_id_required"), parent=win)
+                return
+            if not self.can_write():
+                messagebox.showerror(self.translate("error"), self.translate("token_needed_to_create"), parent=win)
+                return
+            level_ids = list(dict.fromkeys(tokens))  # sin duplicados, conservando el orden
+
+            trace = tracer.start("import", levels=len(level_ids))
+
+            def on_fetched(results):
+                trace.finish()
+                self.create_levels_from_aredl(level_ids, results, win)
+
+            def on_error(e):
+                messagebox.showerror(self.translate("network_error"), self.translate("network_error_details").format(e=e), parent=self._dialog_parent(win))
+
+            self.run_task("aredl", lambda: self.aredl.fetch_levels(level_ids), on_fetched, on_error, parent=win, trace=trace)
+
+        buttons_frame = ttk.Frame(frame)
+        buttons_frame.grid(row=2, column=0, sticky="ew", pady=(10, 0))
+        ttk.Button(buttons_frame, text=self.translate("import_from_aredl"), command=start_import, style="Custom.TButton").pack(side="right")
+        ttk.Button(buttons_frame, text=self.translate("cancel"), command=win.destroy, style="Custom.TButton").pack(side="right", padx=5)
+        ids_text.focus_set()
+
+    def create_levels_from_aredl(self, level_ids, results, win):
+        """Crea en un solo commit (o deja pendientes) los niveles descargados de AREDL."""
+        listed = {item["name"].lower() for item in getattr(self, 'display_files', None) or []}
+        new_files, skipped, failed = {}, [], []
+        for level_id in level_ids:
+            result = results.get(level_id)
+            if isinstance(result, Exception) or result is None:
+                failed.append(level_id)
+                continue
+            content = aredl_level_content(*result)
+            file_name = level_file_name(content["name"])
+            if not file_name or not all([content["name"], content["author"], content["verifier"], content["verification"]]):
+                failed.append(level_id)
+            elif file_name.lower() in listed or file_name in new_files:
+                skipped.append(file_name)
+            else:
+                new_files[file_name] = content
+
+        summary = self.translate("bulk_import_summary").format(
+            created=len(new_files), skipped=", ".join(skipped) or "-", failed=", ".join(failed) or "-")
+        if not new_files:
+            messagebox.showinfo(self.translate("bulk_import_aredl"), summary, parent=self._dialog_parent(win))
+            return
+
+        encoded = {file_name: DEFAULT_JSON_STYLE.encode(content) for file_name, content in new_files.items()}
+        if self.batch_var.get():
+            for file_name, content in new_files.items():
+                self.stage_change(file_name, encoded[file_name], self.translate("commit_add_level").format(name=content["name"]), new=True)
+                self.search_index.update_document(file_name, content)
+            if win.winfo_exists():
+                win.destroy()
+            messagebox.showinfo(self.translate("success"), summary + "\n\n" + self.translate("success_change_staged"))
+            return
+
+        client = self.github()
+        message = self.translate("commit_bulk_add_levels").format(count=len(new_files))
+
+        def on_published(new_shas):
+            for file_name, sha in new_shas.items():
+                self.insert_listed_file(file_name, sha)
+                self.search_index.update_document(file_name, new_files[file_name], sha)
+            if win.winfo_exists():
+                win.destroy()
+            messagebox.showinfo(self.translate("success"), summary)
+
+        def on_error(e):
+            if isinstance(e, backend_errors()):
+                messagebox.showerror(self.translate("error"), self.translate("error_creating_file").format(error=str(e)), parent=self._dialog_parent(win))
+            else:
+                messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=str(e)), parent=self._dialog_parent(win))
+
+        self.run_task("write", lambda: client.publish(encoded, message), on_published, on_error, parent=win)
+
+    def resync_aredl_metadata(self):
+        """Compara los metadatos de todos los niveles con AREDL en segundo plano."""
+        files = [(item["file_name"], item.get("sha")) for item in getattr(self, 'display_files', None) or []]
+        if not files:
+            messagebox.showwarning(self.translate("warning"), self.translate("warn_load_files_first"))
+            return
+        client = self.github()
+
+        def collect():
+            def read(entry):
+                file_name, sha = entry
+                data, sha = self.read_level_bytes(client, file_name, sha)
+                return file_name, json.loads(data.decode('utf-8')), sha
+
+            docs, unreadable = {}, []
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                futures = [pool.submit(tracer.bind(read), entry) for entry in files]
+                for future, (file_name, _) in zip(futures, files):
+                    try:
+                        file_name, doc, sha = future.result()
+                    except backend_errors() + (ValueError,):
+                        unreadable.append(file_name)
+                        continue
+                    if isinstance(doc, dict) and isinstance(doc.get("id"), int):
+                        docs[file_name] = (doc, sha)
+
+            ids = list(dict.fromkeys(str(doc["id"]) for doc, _ in docs.values()))
+            results = self.aredl.fetch_levels(ids, max_workers=4)
+
+            diffs, failed = [], []
+            for file_name, (doc, sha) in sorted(docs.items()):
+                result = results.get(str(doc["id"]))
+                if isinstance(result, Exception) or result is None:
+                    failed.append(file_name)
+                    continue
+                fresh = aredl_level_content(*result)
+                diffs.extend((file_name, field, old, new) for field, old, new in aredl_metadata_diff(doc, fresh))
+            return {"diffs": diffs, "docs": docs, "failed": failed + unreadable, "checked": len(docs)}
+
+        def on_collected(result):
+            self.open_resync_window(result)
+
+        def on_error(e):
+            messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=str(e)))
+
+        self.run_task("resync", collect, on_collected, on_error)
+
+    def open_resync_window(self, result):
+        """Muestra las diferencias con AREDL y aplica las seleccionadas en un solo lote."""
+        diffs = result["diffs"]
+        summary = self.translate("resync_summary").format(
+            checked=result["checked"], changes=len(diffs), failed=", ".join(result["failed"]) or "-")
+        if not diffs:
+            messagebox.showinfo(self.translate("resync_aredl"), summary)
+            return
+
+        win = tk.Toplevel(self.root)
+        win.title(self.translate("resync_aredl"))
+        win.transient(self.root)
+        win.grab_set()
+        win.geometry("900x450")
+        win.rowconfigure(1, weight=1)
+        win.columnconfigure(0, weight=1)
+
+        ttk.Label(win, text=summary, font=self.font_normal, padding="10").grid(row=0, column=0, columnspan=2, sticky="w")
+
+        columns = ("file", "field", "current", "aredl")
+        tree = ttk.Treeview(win, columns=columns, show="headings", selectmode="extended")
+        for column, key, width in (("file", "search_file", 180), ("field", "resync_field", 100),
+                                   ("current", "resync_current", 280), ("aredl", "resync_aredl_value", 280)):
+            tree.heading(column, text=self.translate(key))
+            tree.column(column, width=width)
+        tree.grid(row=1, column=0, sticky="nsew", padx=(10, 0))
+        scrollbar = ttk.Scrollbar(win, orient="vertical", command=tree.yview)
+        scrollbar.grid(row=1, column=1, sticky="ns", padx=(0, 10))
+        tree.config(yscrollcommand=scrollbar.set)
+
+        def show(value):
+            return ", ".join(value) if isinstance(value, list) else ("" if value is None else str(value))
+
+        for i, (file_name, field, old, new) in enumerate(diffs):
+            tree.insert("", tk.END, iid=str(i), values=(file_name, field, show(old), show(new)))
+        tree.selection_set(tree.get_children())  # por defecto se aplican todas
+
+        def apply_selected():
+            selected = [diffs[int(iid)] for iid in tree.selection()]
+            if not selected:
+                messagebox.showwarning(self.translate("warning"), self.translate("warn_select_changes"), parent=win)
+                return
+            self.apply_aredl_updates(selected, result["docs"], win)
+
+        buttons_frame = ttk.Frame(win, padding="10")
+        buttons_frame.grid(row=2, column=0, columnspan=2, sticky="ew")
+        ttk.Button(buttons_frame, text=self.translate("apply_selected"), command=apply_selected, style="Custom.TButton").pack(side="right")
+        ttk.Button(buttons_frame, text=self.translate("cancel"), command=win.destroy, style="Custom.TButton").pack(side="right", padx=5)
+
+    def apply_aredl_updates(self, selected, docs, win):
+        """Escribe los campos elegidos en sus archivos: un commit, o cambios pendientes en modo lote."""
+        updates = {}
+        for file_name, field, _, new in selected:
+            updates.setdefault(file_name, {})[field] = new
+
+        new_docs = {}
+        for file_name, fields in updates.items():
+            doc = dict(docs[file_name][0])
+            doc.update(fields)
+            new_docs[file_name] = doc
+        encoded = {file_name: self.encode_level(file_name, doc) for file_name, doc in new_docs.items()}
+
+        def refresh_open_file(file_name, sha=None):
+            # Los niveles abiertos reciben los mismos campos sin perder sus ediciones sin guardar
+            entry = self.workspace.peek(file_name)
+            if entry is not None:
+                entry["doc"].update(updates[file_name])
+                self.workspace.update_sha(file_name, sha)
+            if self.current_file_name == file_name and self.current_file_content is not None:
+                self.current_file_content.update(updates[file_name])
+                if sha:
+                    self.current_file_sha = sha
+
+        if self.batch_var.get():
+            for file_name, doc in new_docs.items():
+                self.stage_change(file_name, encoded[file_name], self.translate("commit_resync_level").format(filename=file_name))
+                self.search_index.update_document(file_name, doc)
+                refresh_open_file(file_name)
+            win.destroy()
+            messagebox.showinfo(self.translate("success"), self.translate("success_change_staged"))
+            return
+
+        if not self.can_write():
+            messagebox.showwarning(self.translate("warning"), self.translate("token_needed_to_save"), parent=win)
+            return
+
+        client = self.github()
+        message = self.translate("commit_resync_levels").format(count=len(new_docs))
+
+        def on_published(new_shas):
+            for file_name, sha in new_shas.items():
+                self.set_known_sha(file_name, sha)
+                self.search_index.update_document(file_name, new_docs[file_name], sha)
+                refresh_open_file(file_name, sha)
+            if win.winfo_exists():
+                win.destroy()
+            messagebox.showinfo(self.translate("success"), self.translate("success_published").format(count=len(new_docs)))
+
+        def on_error(e):
+            if isinstance(e, backend_errors()):
+                messagebox.showerror(self.translate("error"), self.translate("error_saving_changes").format(error=str(e)), parent=self._dialog_parent(win))
+            else:
+                messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=str(e)), parent=self._dialog_parent(win))
+
+        self.run_task("write", lambda: client.publish(encoded, message), on_published, on_error, parent=win)
+
     def open_list_updater(self):
         """Abre una ventana para seleccionar un archivo de orden de la lista de GitHub."""
         if not hasattr(self, 'display_files') or not self.display_files:
@@ -1108,28 +4179,33 @@ class GitHubJSONEditor:
 
     def load_and_show_reorder_window(self, file_name):
         """Carga el contenido de un archivo de orden desde GitHub y abre la ventana de reordenamiento."""
-        owner, repo = self.parse_github_url(self.repo_url)
-        token = self.github_token
-        file_path_api = f"{self.folder_path}/{file_name}"
-        api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/{file_path_api}"
-        headers = {'Authorization': f'token {token}'} if token else {}
-        
-        try:
-            response = requests.get(api_url, headers=headers)
-            response.raise_for_status()
-            file_data = response.json()
-            content = base64.b64decode(file_data['content']).decode('utf-8')
-            order_list = json.loads(content)
+        known_sha = self.get_known_sha(file_name)
+        client = self.github()
+        trace = tracer.start("reorder", file=file_name)
+
+        def fetch():
+            data, _ = self.read_level_bytes(client, file_name, known_sha)
+            with trace.span("parse", bytes=len(data)):
+                return json.loads(data.decode('utf-8'))
+
+        def on_loaded(order_list):
             if not isinstance(order_list, list) or not all(isinstance(item, str) for item in order_list):
+                trace.finish(error="format")
                 messagebox.showerror(self.translate("format_error"), self.translate("format_error_details").format(filename=file_name))
                 return
-            self.open_reorder_window(order_list)
-        except requests.exceptions.RequestException as e:
-            messagebox.showerror(self.translate("error"), self.translate("error_loading_order_file").format(str(e)))
-        except json.JSONDecodeError:
-            messagebox.showerror(self.translate("file_error"), self.translate("file_error_details").format(filename=file_name))
-        except Exception as e:
-            messagebox.showerror(self.translate("error"), self.translate("error_processing_order_file").format(str(e)))
+            with trace.span("render", items=len(order_list)):
+                self.open_reorder_window(order_list)
+            trace.finish()
+
+        def on_error(e):
+            if isinstance(e, backend_errors()):
+                messagebox.showerror(self.translate("error"), self.translate("error_loading_order_file").format(error=str(e)))
+            elif isinstance(e, json.JSONDecodeError):
+                messagebox.showerror(self.translate("file_error"), self.translate("file_error_details").format(filename=file_name))
+            else:
+                messagebox.showerror(self.translate("error"), self.translate("error_processing_order_file").format(error=str(e)))
+
+        self.run_task("order", fetch, on_loaded, on_error, trace=trace)
 
     def open_reorder_window(self, order_list):
         """Abre una ventana para reordenar una lista de items."""
@@ -1149,62 +4225,159 @@ class GitHubJSONEditor:
         list_frame.rowconfigure(0, weight=1)
         list_frame.columnconfigure(0, weight=1)
 
-        listbox = tk.Listbox(list_frame, font=self.font_normal)
-        listbox.grid(row=0, column=0, sticky='nsew')
-        
-        for i, item in enumerate(order_list):
-            listbox.insert(tk.END, f"{i + 1}. {item}")
+        model = ReorderModel(order_list)
+        filter_var = tk.StringVar()
+        view = list(range(len(model)))  # fila del listbox -> índice en el modelo
+
+        filter_frame = ttk.Frame(list_frame)
+        filter_frame.grid(row=0, column=0, columnspan=2, sticky='ew', pady=(0, 5))
+        filter_frame.columnconfigure(1, weight=1)
+        ttk.Label(filter_frame, text=self.translate("filter")).grid(row=0, column=0, padx=(0, 5))
+        ttk.Entry(filter_frame, textvariable=filter_var, font=self.font_normal).grid(row=0, column=1, sticky='ew')
+
+        list_frame.rowconfigure(0, weight=0)
+        list_frame.rowconfigure(1, weight=1)
+        listbox = tk.Listbox(list_frame, font=self.font_normal, selectmode=tk.EXTENDED)
+        listbox.grid(row=1, column=0, sticky='nsew')
 
         scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=listbox.yview)
-        scrollbar.grid(row=0, column=1, sticky="ns")
+        scrollbar.grid(row=1, column=1, sticky="ns")
         listbox.config(yscrollcommand=scrollbar.set)
 
-        def renumber_list():
-            for i in range(listbox.size()):
-                item_text = listbox.get(i)
-                name = ". ".join(item_text.split(". ")[1:])
-                listbox.delete(i)
-                listbox.insert(i, f"{i + 1}. {name}")
+        def row_text(index):
+            return f"{index + 1}. {model.items[index]}"
+
+        def visible(index):
+            query = filter_var.get().strip().casefold()
+            return not query or query in model.items[index].casefold()
+
+        def render_all():
+            view[:] = [i for i in range(len(model)) if visible(i)]
+            listbox.delete(0, tk.END)
+            if view:
+                listbox.insert(tk.END, *[row_text(i) for i in view])
+
+        def render_range(lo, hi):
+            """Vuelve a pintar solo las filas del modelo entre lo y hi (ambos incluidos)."""
+            first = bisect.bisect_left(view, lo)
+            # Si el rango llega al final (altas y bajas) también sobran las filas de detrás
+            last = bisect.bisect_right(view, hi) if hi < len(model) - 1 else len(view)
+            wanted = [i for i in range(lo, min(hi, len(model) - 1) + 1) if visible(i)]
+            old_rows = listbox.get(first, last - 1) if last > first else ()
+            new_rows = [row_text(i) for i in wanted]
+            view[first:last] = wanted
+            if len(old_rows) != len(new_rows):
+                if old_rows:
+                    listbox.delete(first, last - 1)
+                if new_rows:
+                    listbox.insert(first, *new_rows)
+                return
+            for k, (old, new) in enumerate(zip(old_rows, new_rows)):
+                if old != new:
+                    listbox.delete(first + k)
+                    listbox.insert(first + k, new)
+
+        def selected_indices():
+            return [view[row] for row in listbox.curselection()]
+
+        def apply(result):
+            """Pinta el rango afectado por una operación y vuelve a seleccionar lo movido."""
+            if result is None:
+                return
+            new_positions, (lo, hi) = result
+            render_range(lo, hi)
+            listbox.selection_clear(0, tk.END)
+            rows = [bisect.bisect_left(view, i) for i in new_positions]
+            rows = [row for row in rows if row < len(view) and view[row] in new_positions]
+            for row in rows:
+                listbox.selection_set(row)
+            if rows:
+                listbox.activate(rows[0])
+                listbox.see(rows[0])
+
+        render_all()
+        filter_var.trace_add("write", lambda *args: render_all())
 
         def add_item():
             new_item_name = self._custom_ask_string(self.translate("add_level"), self.translate("level_name") + ":", reorder_win)
             if new_item_name and new_item_name.strip():
-                listbox.insert(tk.END, f"0. {new_item_name.strip()}") # Número temporal
-                renumber_list()
-                listbox.selection_set(tk.END)
-                listbox.see(tk.END)
+                apply(model.insert(len(model), new_item_name.strip()))
         
         def delete_item():
-            selection_indices = listbox.curselection()
-            if not selection_indices:
+            indices = selected_indices()
+            if not indices:
                 messagebox.showwarning(self.translate("warning"), self.translate("warn_select_record_delete"), parent=reorder_win)
                 return
             
             if messagebox.askyesno(self.translate("confirm_deletion"), self.translate("confirm_delete_record"), parent=reorder_win):
-                listbox.delete(selection_indices[0])
-                renumber_list()
+                apply(model.delete(indices))
 
-        def move_item(direction):
-            selection_indices = listbox.curselection()
-            if not selection_indices: return
-            selected_index = selection_indices[0]
-            
-            if direction == 'up' and selected_index > 0: new_index = selected_index - 1
-            elif direction == 'down' and selected_index < listbox.size() - 1: new_index = selected_index + 1
-            else: return
+        def view_delta(step):
+            """Desplazamiento en el modelo equivalente a mover step filas en la vista filtrada."""
+            rows = listbox.curselection()
+            anchor = rows[0] if step < 0 else rows[-1]
+            target = max(0, min(len(view) - 1, anchor + step))
+            return view[target] - view[anchor]
 
-            item = listbox.get(selected_index)
-            listbox.delete(selected_index)
-            listbox.insert(new_index, item)
-            renumber_list()
+        def move_item(direction):
+            indices = selected_indices()
+            if not indices: return
+            apply(model.shift(indices, view_delta(-1 if direction == 'up' else 1)))
 
-            # Restaurar la selección en la nueva posición para no perder el foco
-            listbox.selection_set(new_index)
-            listbox.activate(new_index)
-            listbox.see(new_index)
+        def move_to_rank():
+            indices = selected_indices()
+            if not indices:
+                return
+            answer = self._custom_ask_string(self.translate("move_to_rank"), self.translate("rank_prompt").format(count=len(model)), reorder_win)
+            if answer is None:
+                return
+            try:
+                rank = int(answer.strip())
+            except ValueError:
+                rank = 0
+            if not 1 <= rank <= len(model):
+                messagebox.showwarning(self.translate("warning"), self.translate("warn_invalid_rank").format(count=len(model)), parent=reorder_win)
+                return
+            apply(model.move_to(indices, rank - 1))
+
+        # Arrastrar y soltar: mueve el bloque seleccionado siguiendo al ratón
+        drag = {"row": None, "moved": False}
+
+        def on_press(event):
+            row = listbox.nearest(event.y)
+            drag["row"], drag["moved"] = row, False
+            # Pulsar sobre una selección múltiple sin modificadores la conserva para arrastrarla
+            if row in listbox.curselection() and len(listbox.curselection()) > 1 and not event.state & 0x0005:
+                return "break"
+            return None
+
+        def on_motion(event):
+            if drag["row"] is None or not view:
+                return "break"
+            row = listbox.nearest(event.y)
+            if row != drag["row"] and listbox.curselection():
+                result = model.shift(selected_indices(), view[row] - view[drag["row"]])
+                apply(result)
+                if result is not None:
+                    drag["moved"] = True
+                drag["row"] = row
+            return "break"
+
+        def on_release(event):
+            row = drag["row"]
+            if row is not None and not drag["moved"] and not event.state & 0x0005 and len(listbox.curselection()) > 1:
+                listbox.selection_clear(0, tk.END)
+                listbox.selection_set(row)
+            drag["row"] = None
+
+        listbox.bind('<ButtonPress-1>', on_press)
+        listbox.bind('<B1-Motion>', on_motion)
+        listbox.bind('<ButtonRelease-1>', on_release)
+        listbox.bind('<Alt-Up>', lambda e: move_item('up'))
+        listbox.bind('<Alt-Down>', lambda e: move_item('down'))
 
         def apply_changes():
-            final_order = [".".join(listbox.get(i).split(". ")[1:]) for i in range(listbox.size())]
+            final_order = model.items
             original_records = self.current_file_content.get('records', [])
             records_map = {record['user']: record for record in original_records}
             new_records_list = []
@@ -1218,7 +4391,9 @@ class GitHubJSONEditor:
             for user in sorted(list(users_in_original_records)): new_records_list.append(records_map[user])
 
             self.current_file_content['records'] = new_records_list
-            self.populate_records_treeview()
+            with tracer.span("apply", trace=tracer.start("reorder"), records=len(new_records_list)):
+                self.refresh_records_view()
+                self.document_changed()
             messagebox.showinfo(self.translate("success"), self.translate("success_list_reordered"), parent=reorder_win)
             reorder_win.destroy()
 
@@ -1226,6 +4401,7 @@ class GitHubJSONEditor:
         move_buttons_frame.grid(row=1, column=0, pady=(10,0), sticky='w')
         ttk.Button(move_buttons_frame, text=self.translate("up"), command=lambda: move_item('up')).pack(side='left')
         ttk.Button(move_buttons_frame, text=self.translate("down"), command=lambda: move_item('down')).pack(side='left', padx=5)
+        ttk.Button(move_buttons_frame, text=self.translate("move_to_rank"), command=move_to_rank).pack(side='left')
         ttk.Button(move_buttons_frame, text=self.translate("add"), command=add_item).pack(side='left', padx=(20, 5))
         ttk.Button(move_buttons_frame, text=self.translate("delete"), command=delete_item).pack(side='left')
 
@@ -1267,7 +4443,8 @@ class GitHubJSONEditor:
                 new_content_dict = json.loads(new_content_str)
                 
                 self.current_file_content = new_content_dict
-                self.populate_records_treeview()
+                self.refresh_records_view()
+                self.document_changed()
                 
                 messagebox.showinfo(self.translate("success"), self.translate("success_content_updated_memory"), parent=editor_win)
                 editor_win.destroy()
@@ -1290,50 +4467,394 @@ class GitHubJSONEditor:
 
     def save_changes(self):
         """Guarda los cambios en GitHub"""
-        owner, repo = self.parse_github_url(self.repo_url)
-        token = self.github_token
-        
-        if not token:
+        if not self.can_write():
             messagebox.showwarning(self.translate("warning"), self.translate("token_needed_to_save"))
             return
         
-        file_path = f"{self.folder_path}/{self.current_file_name}"
-        api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/{file_path}"
-        
-        # Primero obtener el SHA del archivo actual
-        headers = {'Authorization': f'token {token}'}
-        
+        trace = tracer.start("save", file=self.current_file_name)
+        # Se serializa en el hilo de Tk para capturar el estado actual del documento
+        with trace.span("serialize") as span:
+            content = self.encode_level(self.current_file_name, self.current_file_content)
+            span["bytes"] = len(content)
+        file_name = self.current_file_name
+        commit_message = self.translate("commit_update_records").format(filename=self.current_file_name)
+        # Si se edita mientras se sube, el nivel sigue marcado como sin guardar
+        revision = self.workspace.revision(file_name)
+
+        if self.is_unchanged(file_name, self.current_file_sha, content, self.current_file_content):
+            trace.finish(unchanged=True)
+            self.workspace.mark_saved(file_name, revision=revision)
+            self.update_contextual_button_states()
+            messagebox.showinfo(self.translate("success"), self.translate("no_changes_to_save"))
+            return
+
+        if self.batch_var.get():
+            self.stage_change(file_name, content, commit_message)
+            self.workspace.mark_saved(file_name, revision=revision)
+            self.update_contextual_button_states()
+            trace.finish(staged=True)
+            messagebox.showinfo(self.translate("success"), self.translate("success_change_staged"))
+            return
+
+        client = self.github()
+        # El SHA se conoce desde la carga (o el último guardado): basta con un PUT
+        sha = self.current_file_sha
+
+        def commit():
+            return client.put_file(file_name, content, commit_message, sha)
+
+        def on_saved(new_sha):
+            self.set_known_sha(file_name, new_sha)
+            self.workspace.mark_saved(file_name, new_sha, revision)
+            if self.current_file_name == file_name:
+                self.current_file_sha = new_sha
+            self.update_contextual_button_states()
+            trace.finish()
+            messagebox.showinfo(self.translate("success"), self.translate("success_changes_saved_local" if self.uses_local_clone() else "success_changes_saved_github"))
+
+        def on_error(e):
+            if isinstance(e, backend_errors()):
+                messagebox.showerror(self.translate("error"), self.translate("error_saving_changes").format(error=str(e)))
+            else:
+                messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=str(e)))
+
+        self.run_task("write", commit, on_saved, on_error, trace=trace)
+
+    def stage_change(self, file_name, data, message, new=False):
+        """Añade un cambio (data=None para borrar) a los pendientes del próximo commit."""
+        if data is None:
+            self.staged.stage_delete(file_name, message)
+            self.remove_listed_file(file_name)
+        else:
+            self.staged.stage(file_name, data, message, new=new)
+            self.insert_listed_file(file_name, self.get_known_sha(file_name))
+
+    def apply_staged_to_listing(self):
+        """Refleja en el listado los archivos añadidos o borrados que aún no se han publicado."""
+        if not hasattr(self, 'display_files'):
+            self.display_files = []
+        listed = {item["file_name"] for item in self.display_files}
+        for file_name, entry in self.staged.items():
+            if entry["data"] is None:
+                self.display_files = [item for item in self.display_files if item["file_name"] != file_name]
+            elif file_name not in listed:
+                self.display_files.append({"name": file_name, "file_name": file_name, "sha": None})
+        self.display_files.sort(key=lambda item: item["name"])
+
+    def publish_staged_changes(self):
+        """Publica todos los cambios pendientes en un único commit."""
+        if not self.staged:
+            return
+        if not self.can_write():
+            messagebox.showwarning(self.translate("warning"), self.translate("token_needed_to_save"))
+            return
+
+        changes = self.staged.snapshot()
+        message = self.staged.commit_message(self.translate("commit_batch").format(count=len(changes)))
+        client = self.github()
+        trace = tracer.start("publish", files=len(changes), bytes=sum(len(data) for data in changes.values() if data))
+
+        def on_published(new_shas):
+            trace.finish()
+            self.staged.discard_published(changes)
+            for file_name, sha in new_shas.items():
+                if sha:
+                    self.set_known_sha(file_name, sha)
+                    self.workspace.update_sha(file_name, sha)
+                    if self.current_file_name == file_name:
+                        self.current_file_sha = sha
+            self.update_contextual_button_states()
+            messagebox.showinfo(self.translate("success"), self.translate("success_published").format(count=len(changes)))
+
+        def on_error(e):
+            if isinstance(e, backend_errors()):
+                messagebox.showerror(self.translate("error"), self.translate("error_saving_changes").format(error=str(e)))
+            else:
+                messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=str(e)))
+
+        self.run_task("write", lambda: client.publish(changes, message), on_published, on_error, trace=trace)
+
+    def open_pending_changes_window(self):
+        """Lista los niveles abiertos con cambios sin guardar: abrirlos, descartarlos o guardarlos todos."""
+        win = tk.Toplevel(self.root)
+        win.title(self.translate("pending_changes_title"))
+        win.transient(self.root)
+        win.geometry("560x320")
+        win.rowconfigure(0, weight=1)
+        win.columnconfigure(0, weight=1)
+
+        columns = ("file", "level", "records")
+        tree = ttk.Treeview(win, columns=columns, show="headings", selectmode="browse")
+        for column, key, width in (("file", "pending_file", 200), ("level", "pending_level", 220), ("records", "pending_records", 80)):
+            tree.heading(column, text=self.translate(key))
+            tree.column(column, width=width, anchor="e" if column == "records" else "w")
+        tree.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+
+        def refresh():
+            tree.delete(*tree.get_children())
+            for file_name in self.workspace.dirty_files():
+                doc = self.workspace.peek(file_name)["doc"]
+                name = doc.get("name", "") if isinstance(doc, dict) else ""
+                records = len(doc.get("records", [])) if isinstance(doc, dict) else 0
+                tree.insert("", "end", iid=file_name, values=(file_name, name, records))
+            if not tree.get_children() and win.winfo_exists():
+                win.destroy()
+
+        def selected():
+            selection = tree.selection()
+            return selection[0] if selection else None
+
+        def open_selected(event=None):
+            file_name = selected()
+            if file_name:
+                self.jump_to_record(file_name, None)
+
+        def discard_selected():
+            file_name = selected()
+            if not file_name or not messagebox.askyesno(self.translate("confirm_deletion"), self.translate("confirm_discard_changes").format(filename=file_name), parent=win):
+                return
+            self.workspace.discard(file_name)
+            if self.current_file_name == file_name:
+                self.load_file_content(file_name)  # Vuelve a la versión guardada (de la caché si se puede)
+            else:
+                self.search_index.remove_document(file_name)  # Se reindexa desde la caché al buscar
+            self.update_contextual_button_states()
+            refresh()
+
+        tree.bind("<Double-1>", open_selected)
+        tree.bind("<Return>", open_selected)
+
+        buttons_frame = ttk.Frame(win, padding=(10, 0, 10, 10))
+        buttons_frame.grid(row=1, column=0, sticky="ew")
+        ttk.Button(buttons_frame, text=self.translate("open"), command=open_selected, style="Custom.TButton").pack(side="left")
+        ttk.Button(buttons_frame, text=self.translate("discard"), command=discard_selected, style="Custom.TButton").pack(side="left", padx=5)
+        ttk.Button(buttons_frame, text=self.translate("accept"), command=win.destroy, style="Custom.TButton").pack(side="right")
+        ttk.Button(buttons_frame, text=self.translate("save_all_dirty"),
+                   command=lambda: self.save_all_dirty(on_done=lambda: win.winfo_exists() and refresh(), parent=win),
+                   style="Custom.TButton").pack(side="right", padx=5)
+        refresh()
+
+    def save_all_dirty(self, on_done=None, parent=None):
+        """Guarda todos los niveles con cambios sin guardar en un único commit (o los deja pendientes)."""
+        if not self.can_write():
+            messagebox.showwarning(self.translate("warning"), self.translate("token_needed_to_save"), parent=self._dialog_parent(parent))
+            return
+
+        trace = tracer.start("save_all")
+        changes, revisions, docs = {}, {}, {}
+        with trace.span("serialize") as span:
+            for file_name in self.workspace.dirty_files():
+                entry = self.workspace.peek(file_name)
+                data = self.encode_level(file_name, entry["doc"])
+                if self.is_unchanged(file_name, entry["sha"], data, entry["doc"]):
+                    self.workspace.mark_saved(file_name, revision=entry["revision"])
+                    continue
+                changes[file_name], revisions[file_name], docs[file_name] = data, entry["revision"], entry["doc"]
+            span["files"], span["bytes"] = len(changes), sum(len(data) for data in changes.values())
+
+        if not changes:
+            trace.finish(unchanged=True)
+            self.update_contextual_button_states()
+            messagebox.showinfo(self.translate("success"), self.translate("no_changes_to_save"), parent=self._dialog_parent(parent))
+            if on_done:
+                on_done()
+            return
+
+        if self.batch_var.get():
+            for file_name, data in changes.items():
+                self.stage_change(file_name, data, self.translate("commit_update_records").format(filename=file_name))
+                self.workspace.mark_saved(file_name, revision=revisions[file_name])
+            trace.finish(staged=True)
+            self.update_contextual_button_states()
+            messagebox.showinfo(self.translate("success"), self.translate("success_staged_all").format(count=len(changes)), parent=self._dialog_parent(parent))
+            if on_done:
+                on_done()
+            return
+
+        client = self.github()
+        message = self.translate("commit_save_all").format(count=len(changes))
+
+        def on_published(new_shas):
+            trace.finish()
+            for file_name, sha in new_shas.items():
+                self.set_known_sha(file_name, sha)
+                self.workspace.mark_saved(file_name, sha, revisions[file_name])
+                self.search_index.update_document(file_name, docs[file_name], sha)
+                if self.current_file_name == file_name:
+                    self.current_file_sha = sha
+            self.update_contextual_button_states()
+            messagebox.showinfo(self.translate("success"), self.translate("success_saved_all").format(count=len(changes)), parent=self._dialog_parent(parent))
+            if on_done:
+                on_done()
+
+        def on_error(e):
+            if isinstance(e, backend_errors()):
+                messagebox.showerror(self.translate("error"), self.translate("error_saving_changes").format(error=str(e)), parent=self._dialog_parent(parent))
+            else:
+                messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=str(e)), parent=self._dialog_parent(parent))
+
+        self.run_task("write", lambda: client.publish(changes, message), on_published, on_error, parent=parent, trace=trace)
+
+class CLIError(Exception):
+    """Error de uso o de datos en el modo de línea de comandos (se muestra sin traza)."""
+
+TRUE_VALUES = {"1", "true", "yes", "y", "si", "sí", "x"}
+
+def read_record_rows(path):
+    """Lee los records a importar de un CSV con cabecera o de un JSONL (una fila por línea).
+
+    Columnas: level (archivo del nivel), user, link, percent y, opcionalmente, hz y mobile.
+    Devuelve [(número de línea, fila)].
+    """
+    rows = []
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        rows.append((line_number, json.loads(line)))
+                    except json.JSONDecodeError as e:
+                        raise CLIError(f"{path}:{line_number}: invalid JSON ({e})")
+        else:
+            for line_number, row in enumerate(csv.DictReader(f), 2):
+                rows.append((line_number, row))
+    return rows
+
+def record_from_row(row):
+    """Convierte una fila importada en (archivo, campos); lanza ValueError si no es válida."""
+    if not isinstance(row, dict):
+        raise ValueError("expected an object")
+    level = str(row.get("level") or row.get("file") or "").strip()
+    user = str(row.get("user") or "").strip()
+    link = str(row.get("link") or "").strip()
+    if not level or not user or not link:
+        raise ValueError("level, user and link are required")
+    try:
+        percent = int(row.get("percent"))
+    except (TypeError, ValueError):
+        raise ValueError(f"percent must be an integer, got {row.get('percent')!r}")
+    fields = {"user": user, "link": link, "percent": percent}
+    # Las columnas vacías u omitidas no cambian el record existente
+    if str(row.get("hz") or "").strip():
+        fields["hz"] = str(row["hz"]).strip()
+    mobile = row.get("mobile")
+    if isinstance(mobile, bool):
+        fields["mobile"] = mobile
+    elif str(mobile or "").strip():
+        fields["mobile"] = str(mobile).strip().casefold() in TRUE_VALUES
+    file_name = level if level.endswith(".json") else f"{level}.json"
+    return file_name, fields
+
+def cli_import_records(client, path, message=None, dry_run=False):
+    """Aplica todas las filas del archivo a sus niveles y lo publica en un único commit."""
+    by_file, errors = {}, []
+    for line_number, row in read_record_rows(path):
         try:
-            # Obtener información del archivo actual
-            response = requests.get(api_url, headers=headers)
-            response.raise_for_status()
-            current_file_info = response.json()
-            sha = current_file_info['sha']
-            
-            # Preparar datos para el commit
-            content = json.dumps(self.current_file_content, indent=2, ensure_ascii=False)
-            encoded_content = base64.b64encode(content.encode('utf-8')).decode('utf-8')
-            
-            commit_data = {
-                "message": self.translate("commit_update_records").format(filename=self.current_file_name),
-                "content": encoded_content,
-                "sha": sha
-            }
-            
-            # Hacer el commit
-            response = requests.put(api_url, headers=headers, json=commit_data)
-            response.raise_for_status()
-            
-            messagebox.showinfo(self.translate("success"), self.translate("success_changes_saved_github"))
-            
-        except requests.exceptions.RequestException as e:
-            messagebox.showerror(self.translate("error"), self.translate("error_saving_changes").format(error=str(e)))
-        except Exception as e:
-            messagebox.showerror(self.translate("error"), self.translate("error_unexpected").format(error=str(e)))
+            file_name, fields = record_from_row(row)
+        except ValueError as e:
+            errors.append(f"{path}:{line_number}: {e}")
+            continue
+        by_file.setdefault(file_name, []).append(fields)
+    if errors:
+        raise CLIError("\n".join(errors))
+    if not by_file:
+        raise CLIError(f"{path}: no records to import")
+
+    known = {file['name']: file['sha'] for file in client.list_files()}
+    missing = sorted(name for name in by_file if name not in known)
+    if missing:
+        raise CLIError("unknown levels: " + ", ".join(missing))
+
+    def load(file_name):
+        data, _ = client.read_file(file_name, known[file_name])
+        return data
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        originals = dict(zip(by_file, pool.map(tracer.bind(load), by_file)))
+
+    added = updated = 0
+    changes = {}
+    for file_name, records in by_file.items():
+        doc = json.loads(originals[file_name].decode('utf-8'))
+        if not isinstance(doc, dict):
+            raise CLIError(f"{file_name}: not a level file")
+        for fields in records:
+            if upsert_record(doc, fields) == "added":
+                added += 1
+            else:
+                updated += 1
+        # Mismo formato que el archivo; los niveles que quedan igual no se publican
+        data = JsonStyle.detect(originals[file_name]).encode(doc)
+        if data != originals[file_name] and json.loads(originals[file_name].decode('utf-8')) != doc:
+            changes[file_name] = data
+
+    print(f"{added} records added, {updated} updated in {len(changes)} levels")
+    if dry_run:
+        return
+    if not changes:
+        print("Nothing changed; no commit made.")
+        return
+    client.publish(changes, message or f"Import {added + updated} records into {len(changes)} levels")
+    print("Published in a single commit.")
+
+def run_cli(argv):
+    """Modo sin interfaz: mismas credenciales, repositorio y formato que la aplicación."""
+    parser = argparse.ArgumentParser(prog="NWLmanager", description="No Wave List manager (command-line mode).")
+    parser.add_argument("--repo", help="GitHub repository URL (default: repo_url from config.json)")
+    parser.add_argument("--folder", help="folder with the level files (default: folder_path from config.json)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="list the level files")
+    dump = commands.add_parser("dump", help="print a level file")
+    dump.add_argument("level")
+    records = commands.add_parser("import-records", help="add or update records from a CSV or JSONL file in one commit")
+    records.add_argument("path")
+    records.add_argument("-m", "--message", help="commit message")
+    records.add_argument("--dry-run", action="store_true", help="show what would change without publishing")
+    args = parser.parse_args(argv)
+
+    config = read_config()
+    tracer.configure(os.path.join(os.path.dirname(get_config_path()), "trace.jsonl"), bool(config.get("tracing", False)))
+    token = config.get("github_token", "")
+    http = HttpSession(token)
+    cache = ContentCache(os.path.join(os.path.dirname(get_config_path()), "cache"))
+    client = open_backend(config, http, cache, args.repo or config.get("repo_url", "https://github.com/Abuigsito/nowavelist"),
+                          args.folder or config.get("folder_path", "data"))
+    try:
+        if not client.owner or not client.repo:
+            raise CLIError("invalid GitHub repository URL")
+        if args.command == "list":
+            for file in client.list_files():
+                print(file['name'])
+        elif args.command == "dump":
+            file_name = args.level if args.level.endswith(".json") else f"{args.level}.json"
+            data, _ = client.read_file(file_name)
+            sys.stdout.write(data.decode('utf-8'))
+            sys.stdout.write("\n")
+        elif args.command == "import-records":
+            if not token and not args.dry_run and config.get("backend") != "local":
+                raise CLIError("a github_token in config.json is needed to publish")
+            trace = tracer.start("import", source=os.path.basename(args.path))
+            with tracer.activate(trace):
+                cli_import_records(client, args.path, args.message, args.dry_run)
+            trace.finish()
+    except CLIError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    except backend_errors() + (IOError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        http.close()
+    return 0
 
 def main():
+    # --startup-time: abre la ventana, imprime el tiempo hasta la primera pintura y hasta
+    # tener la lista actualizada, y sale
+    startup_timing = sys.argv[1:] == ["--startup-time"]
+    if len(sys.argv) > 1 and not startup_timing:
+        sys.exit(run_cli(sys.argv[1:]))
     root = tk.Tk()
-    app = GitHubJSONEditor(root)
+    app = GitHubJSONEditor(root, startup_timing=startup_timing)
     root.mainloop()
 
 if __name__ == "__main__":
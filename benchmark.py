@@ -0,0 +1,427 @@
+"""Benchmarks reproducibles de NWLmanager contra una copia local de la API de GitHub.
+
+Arranca un http.server que imita los endpoints Contents y Git Data que usa el editor,
+lo llena con niveles sintéticos y mide la lógica sin interfaz: listar, sincronizar,
+cargar, guardar, publicar, reordenar y buscar. Para cada escenario informa de la
+latencia, el número de peticiones y el pico de memoria.
+
+    python benchmark.py --levels 10 100 1000 --records 20 --json resultados.json
+"""
+import argparse
+import base64
+import hashlib
+import json
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+import NWLmanager as nwl
+
+OWNER, REPO, FOLDER, BRANCH = "bench", "nowavelist", "data", "main"
+CONTENTS_INLINE_LIMIT = 1024 * 1024
+
+class FakeRepository:
+    """Estado en memoria del repositorio: blobs, árboles, commits y la rama principal."""
+
+    def __init__(self, files):
+        self.lock = threading.Lock()
+        self.blobs = {}
+        self.trees = {}
+        self.commits = {}
+        self.requests = {}  # "MÉTODO endpoint" -> número de peticiones
+        snapshot = {}
+        for path, data in files.items():
+            snapshot[path] = self.put_blob(data)
+        self.head = self.commit(snapshot, [], "initial")
+
+    def put_blob(self, data):
+        sha = nwl.git_blob_sha(data)
+        self.blobs[sha] = data
+        return sha
+
+    def tree(self, snapshot):
+        sha = hashlib.sha1(json.dumps(sorted(snapshot.items())).encode()).hexdigest()
+        self.trees[sha] = dict(snapshot)
+        return sha
+
+    def commit(self, snapshot, parents, message):
+        tree = self.tree(snapshot)
+        sha = hashlib.sha1(f"{tree}{parents}{message}{len(self.commits)}".encode()).hexdigest()
+        self.commits[sha] = {"tree": tree, "parents": parents, "message": message}
+        return sha
+
+    def snapshot(self):
+        return self.trees[self.commits[self.head]["tree"]]
+
+    def count(self, method, endpoint):
+        key = f"{method} {endpoint}"
+        self.requests[key] = self.requests.get(key, 0) + 1
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    """Los endpoints de la API de GitHub que usan GitHubClient y el editor."""
+
+    protocol_version = "HTTP/1.1"
+    # Cabeceras y cuerpo van en escrituras separadas: sin esto Nagle + ACK retardado
+    # añaden ~40 ms a cada petición y falsean las latencias
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, status, payload=None, raw=None, headers=None):
+        body = raw if raw is not None else (json.dumps(payload).encode() if payload is not None else b"")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def not_modified(self, etag):
+        return self.headers.get("If-None-Match") == etag
+
+    def route(self, method):
+        repo = self.server.repository
+        url = urlparse(self.path)
+        match = re.match(r"^/repos/[^/]+/[^/]+(/.*)?$", url.path)
+        if not match:
+            return self.send(404, {"message": "Not Found"})
+        rest = match.group(1) or ""
+        endpoint = re.sub(r"/[0-9a-f]{40}$", "/:sha", rest.split("?")[0])
+        endpoint = "/contents" if rest.startswith("/contents/") else endpoint
+        repo.count(method, endpoint or "/")
+
+        with repo.lock:
+            snapshot = repo.snapshot()
+            if rest == "" and method == "GET":
+                return self.send(200, {"default_branch": BRANCH})
+
+            if rest.startswith("/contents/"):
+                return self.contents(method, rest[len("/contents/"):], snapshot)
+
+            if rest.startswith("/git/trees/") and method == "GET":
+                entries = [{"path": path, "type": "blob", "sha": sha, "mode": "100644"} for path, sha in sorted(snapshot.items())]
+                return self.send(200, {"sha": repo.commits[repo.head]["tree"], "tree": entries, "truncated": False})
+            if rest.startswith("/git/blobs/") and method == "GET":
+                return self.send(200, raw=repo.blobs[rest.rsplit("/", 1)[-1]])
+            if rest == "/git/blobs" and method == "POST":
+                return self.send(201, {"sha": repo.put_blob(base64.b64decode(self.read_body()["content"]))})
+            if rest.startswith("/git/ref/heads/") and method == "GET":
+                return self.send(200, {"object": {"sha": repo.head}})
+            if rest.startswith("/git/commits/") and method == "GET":
+                sha = rest.rsplit("/", 1)[-1]
+                return self.send(200, {"sha": sha, "tree": {"sha": repo.commits[sha]["tree"]}})
+            if rest == "/git/trees" and method == "POST":
+                body = self.read_body()
+                tree = dict(repo.trees[body["base_tree"]])
+                for entry in body["tree"]:
+                    if entry["sha"] is None:
+                        tree.pop(entry["path"], None)
+                    else:
+                        tree[entry["path"]] = entry["sha"]
+                return self.send(201, {"sha": repo.tree(tree)})
+            if rest == "/git/commits" and method == "POST":
+                body = self.read_body()
+                return self.send(201, {"sha": repo.commit(repo.trees[body["tree"]], body["parents"], body["message"])})
+            if rest.startswith("/git/refs/heads/") and method == "PATCH":
+                body = self.read_body()
+                if repo.head not in repo.commits[body["sha"]]["parents"]:
+                    return self.send(422, {"message": "Update is not a fast forward"})
+                repo.head = body["sha"]
+                return self.send(200, {"object": {"sha": repo.head}})
+        return self.send(404, {"message": f"Not Found: {method} {rest}"})
+
+    def contents(self, method, path, snapshot):
+        repo = self.server.repository
+        if method == "GET":
+            if path in snapshot:
+                sha = snapshot[path]
+                etag = f'"{sha}"'
+                if self.not_modified(etag):
+                    return self.send(304)
+                data = repo.blobs[sha]
+                # Como GitHub: a partir de 1 MB el contenido no va en la respuesta
+                inline = len(data) <= CONTENTS_INLINE_LIMIT
+                return self.send(200, {"name": path.rsplit("/", 1)[-1], "path": path, "sha": sha, "size": len(data),
+                                       "encoding": "base64" if inline else "none",
+                                       "content": base64.b64encode(data).decode() if inline else ""}, headers={"ETag": etag})
+            prefix = f"{path}/"
+            items = [{"name": p[len(prefix):], "path": p, "sha": sha, "type": "file"} for p, sha in sorted(snapshot.items())
+                     if p.startswith(prefix) and "/" not in p[len(prefix):]]
+            if not items:
+                return self.send(404, {"message": "Not Found"})
+            etag = '"' + hashlib.sha1(json.dumps(items).encode()).hexdigest() + '"'
+            if self.not_modified(etag):
+                return self.send(304)
+            return self.send(200, items, headers={"ETag": etag})
+
+        body = self.read_body()
+        updated = dict(snapshot)
+        if method == "PUT":
+            if path in snapshot and body.get("sha") != snapshot[path]:
+                return self.send(409, {"message": "sha does not match"})
+            sha = repo.put_blob(base64.b64decode(body["content"]))
+            updated[path] = sha
+            repo.head = repo.commit(updated, [repo.head], body["message"])
+            return self.send(200 if path in snapshot else 201, {"content": {"sha": sha, "path": path}, "commit": {"sha": repo.head}})
+        if method == "DELETE":
+            if snapshot.get(path) != body.get("sha"):
+                return self.send(409, {"message": "sha does not match"})
+            del updated[path]
+            repo.head = repo.commit(updated, [repo.head], body["message"])
+            return self.send(200, {"commit": {"sha": repo.head}})
+        return self.send(405, {"message": "Method Not Allowed"})
+
+    def do_GET(self):
+        self.route("GET")
+
+    def do_PUT(self):
+        self.route("PUT")
+
+    def do_POST(self):
+        self.route("POST")
+
+    def do_PATCH(self):
+        self.route("PATCH")
+
+    def do_DELETE(self):
+        self.route("DELETE")
+
+def start_fake_github(files):
+    """Arranca el servidor en un puerto libre; devuelve el servidor (con .repository)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHubHandler)
+    server.daemon_threads = True
+    server.repository = FakeRepository(files)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def synthetic_level(index, records, rng):
+    """Nivel con el mismo formato que los archivos reales."""
+    return {
+        "id": 100000 + index,
+        "name": f"Level {index}",
+        "author": f"author{rng.randrange(500)}",
+        "verifier": f"player{rng.randrange(5000)}",
+        "creators": [f"creator{rng.randrange(2000)}" for _ in range(rng.randint(1, 4))],
+        "verification": f"https://youtu.be/v{index}",
+        "percentToQualify": 100,
+        "records": [nwl.build_record(f"player{rng.randrange(5000)}", f"https://youtu.be/r{index}_{i}",
+                                     rng.choice([100, 100, 100, 57, 80]), rng.choice(["60", "144", "240", "360"]),
+                                     rng.random() < 0.1)
+                    for i in range(records)],
+    }
+
+def synthetic_files(levels, records, seed=0):
+    rng = random.Random(seed)
+    files = {}
+    for i in range(levels):
+        content = json.dumps(synthetic_level(i, records, rng), indent=2, ensure_ascii=False).encode("utf-8")
+        files[f"{FOLDER}/level_{i:05d}.json"] = content
+    return files
+
+class Bench:
+    """Ejecuta escenarios contra un servidor y acumula los resultados."""
+
+    def __init__(self, server, measure_memory=True):
+        self.server = server
+        self.measure_memory = measure_memory
+        self.results = []
+        self.cache_dir = tempfile.mkdtemp(prefix="nwl-bench-")
+
+    def client(self, fresh_cache=False):
+        if fresh_cache:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            self.cache_dir = tempfile.mkdtemp(prefix="nwl-bench-")
+        http = nwl.HttpSession("bench-token")
+        return nwl.GitHubClient(http, nwl.ContentCache(self.cache_dir), f"https://github.com/{OWNER}/{REPO}", FOLDER)
+
+    def run(self, size, name, func):
+        repository = self.server.repository
+        repository.requests = {}
+        if self.measure_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            detail = func()
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if self.measure_memory else None
+            if self.measure_memory:
+                tracemalloc.stop()
+        result = {
+            "levels": size,
+            "scenario": name,
+            "ms": round(elapsed * 1000, 2),
+            "requests": sum(repository.requests.values()),
+            "by_endpoint": dict(sorted(repository.requests.items())),
+            "peak_kb": round(peak / 1024, 1) if peak is not None else None,
+        }
+        if detail:
+            result.update(detail)
+        self.results.append(result)
+        print(f"{size:>6} {name:<16} {result['ms']:>10.1f} ms {result['requests']:>7} req "
+              f"{'' if peak is None else format(result['peak_kb'], '>10.1f') + ' KB'}", flush=True)
+        return result
+
+    def close(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+def run_suite(bench, levels, sample):
+    """Escenarios de la lógica sin interfaz para un repositorio de `levels` niveles."""
+    files = {}
+
+    def list_files(fresh):
+        def scenario():
+            files["listing"] = bench.client(fresh_cache=fresh).list_files()
+            return {"files": len(files["listing"])}
+        return scenario
+
+    bench.run(levels, "list_cold", list_files(True))
+    bench.run(levels, "list_warm", list_files(False))
+
+    def sync(fresh):
+        def scenario():
+            stats = bench.client(fresh_cache=fresh).sync_folder()
+            return {"downloaded": stats["downloaded"], "bytes": stats["bytes"]}
+        return scenario
+
+    bench.run(levels, "sync_cold", sync(True))
+    bench.run(levels, "sync_warm", sync(False))
+
+    names = [(f["name"], f["sha"]) for f in files["listing"]][:sample]
+
+    def load(fresh):
+        def scenario():
+            client = bench.client(fresh_cache=fresh)
+            docs = {}
+            for name, sha in names:
+                data, _ = client.read_file(name, None if fresh else sha)
+                docs[name] = json.loads(data.decode("utf-8"))
+            files["docs"] = docs
+            return {"files": len(docs)}
+        return scenario
+
+    bench.run(levels, "load_cold", load(True))
+    bench.run(levels, "load_warm", load(False))
+
+    def save():
+        client = bench.client()
+        shas = dict(names)
+        for name, _ in names[:10]:
+            doc = files["docs"][name]
+            doc["records"].append(nwl.build_record("bench", "https://youtu.be/bench", 100, "60"))
+            shas[name] = client.put_file(name, json.dumps(doc, indent=2, ensure_ascii=False).encode("utf-8"), f"Update {name}", shas[name])
+        return {"files": min(10, len(names))}
+
+    bench.run(levels, "save", save)
+
+    def publish():
+        changes = {name: json.dumps(doc, indent=2, ensure_ascii=False).encode("utf-8")
+                   for name, doc in files["docs"].items()}
+        bench.client().publish(changes, f"Update {len(changes)} files")
+        return {"files": len(changes)}
+
+    bench.run(levels, "publish", publish)
+
+    def reorder():
+        rng = random.Random(1)
+        model = nwl.ReorderModel([f["name"] for f in files["listing"]])
+        for _ in range(1000):
+            i = rng.randrange(len(model))
+            model.shift([i], rng.choice([-1, 1]))
+        for _ in range(100):
+            block = rng.sample(range(len(model)), min(5, len(model)))
+            model.move_to(block, rng.randrange(len(model)))
+        return {"moves": 1100}
+
+    bench.run(levels, "reorder", reorder)
+
+    # El índice completo se construye desde la caché sincronizada (fuera de la medida)
+    synced = bench.client().sync_folder()["files"]
+
+    def search():
+        client = bench.client()
+        index = nwl.SearchIndex()
+        for f in synced:
+            data, sha = client.read_file(f["name"], f["sha"])
+            index.update_document(f["name"], json.loads(data.decode("utf-8")), sha)
+        rng = random.Random(2)
+        hits = 0
+        for _ in range(100):
+            hits += len(index.search(rng.choice([f"player{rng.randrange(5000)}", "level", "creator1", "youtu"])))
+        filter_index = nwl.FileNameIndex()
+        filter_index.update([f["name"] for f in synced])
+        for query in ("level", "level_00", "lvel_01", "9"):
+            hits += len(filter_index.match(query))
+        return {"hits": hits}
+
+    bench.run(levels, "search", search)
+
+def run_records_suite(bench, records):
+    """Mantener la tabla de records de un nivel muy grande (modelo sin Tk)."""
+    def scenario():
+        rng = random.Random(3)
+        doc = synthetic_level(0, records, rng)
+        model = nwl.RecordModel()
+        model.sync(doc["records"])
+        for _ in range(100):
+            i = rng.randrange(len(doc["records"]))
+            doc["records"][i]["percent"] = rng.randrange(100)
+            model.sync(doc["records"])
+        doc["records"].reverse()
+        model.sync(doc["records"])
+        return {"records": records}
+
+    bench.run(records, "records_model", scenario)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NWLmanager benchmarks against a local fake GitHub API.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[10, 100, 1000], help="repository sizes (number of levels)")
+    parser.add_argument("--records", type=int, default=20, help="records per synthetic level")
+    parser.add_argument("--sample", type=int, default=50, help="levels loaded/published per scenario")
+    parser.add_argument("--big-level", type=int, default=10000, help="records in the large level for records_model")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (cleaner timings)")
+    parser.add_argument("--json", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    original_api = nwl.GitHubClient.API_BASE
+    results = []
+    print(f"{'levels':>6} {'scenario':<16} {'latency':>13} {'requests':>11} {'peak memory':>13}")
+    try:
+        for levels in args.levels:
+            server = start_fake_github(synthetic_files(levels, args.records))
+            nwl.GitHubClient.API_BASE = f"http://127.0.0.1:{server.server_port}"
+            bench = Bench(server, measure_memory=not args.no_memory)
+            try:
+                run_suite(bench, levels, args.sample)
+            finally:
+                bench.close()
+                server.shutdown()
+                server.server_close()
+            results.extend(bench.results)
+
+        bench = Bench(None, measure_memory=not args.no_memory)
+        bench.server = type("NoServer", (), {"repository": FakeRepository({})})()
+        run_records_suite(bench, args.big_level)
+        results.extend(bench.results)
+    finally:
+        nwl.GitHubClient.API_BASE = original_api
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "records_per_level": args.records, "results": results}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
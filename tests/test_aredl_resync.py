@@ -0,0 +1,245 @@
+"""Pruebas del resync de metadatos con AREDL contra servidores locales de AREDL y de GitHub.
+
+    python -m unittest discover tests
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import NWLmanager as nwl
+import benchmark
+
+# Lo que AREDL sabe de cada nivel; el 404 no existe
+AREDL_LEVELS = {
+    101: {"name": "Alpha", "publisher": "NewAuthor", "verifier": "Ver1", "video": "https://youtu.be/alpha", "creators": ["C1", "C2"]},
+    102: {"name": "Beta", "publisher": "Auth2", "verifier": "Ver2", "video": "https://youtu.be/beta", "creators": ["C3"]},
+    103: {"name": "Gamma", "publisher": "", "verifier": "NewVer", "video": "", "creators": []},
+}
+
+class FakeAREDLHandler(BaseHTTPRequestHandler):
+    """Imita GET /levels/{id} y /levels/{id}/creators de la API de AREDL."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        parts = self.path.strip("/").split("/")
+        level = AREDL_LEVELS.get(int(parts[1])) if len(parts) >= 2 and parts[1].isdigit() else None
+        if level is None:
+            payload, status = {"message": "Not found"}, 404
+        elif len(parts) == 3 and parts[2] == "creators":
+            payload, status = [{"global_name": name} for name in level["creators"]], 200
+        else:
+            payload, status = {
+                "level_id": int(parts[1]), "name": level["name"],
+                "publisher": {"global_name": level["publisher"]},
+                "verifications": [{"submitted_by": {"global_name": level["verifier"]}, "video_url": level["video"]}],
+            }, 200
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def start_fake_aredl():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeAREDLHandler)
+    server.daemon_threads = True
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def level_file(level_id, name, author, verifier, creators, verification):
+    doc = {"id": level_id, "name": name, "author": author, "verifier": verifier, "creators": creators,
+           "verification": verification, "percentToQualify": 100, "records": [{"user": "p", "link": "l", "percent": 100, "hz": "60"}]}
+    return (json.dumps(doc, indent=4, ensure_ascii=False) + "\n").encode("utf-8")
+
+class AREDLDiffTests(unittest.TestCase):
+    def test_level_content_from_aredl_response(self):
+        info = {"level_id": 7, "name": "Lvl", "publisher": {"global_name": "Pub"},
+                "verifications": [{"submitted_by": {"global_name": "Ver"}, "video_url": "https://v"}]}
+        content = nwl.aredl_level_content(info, [])
+        self.assertEqual((content["id"], content["author"], content["verifier"], content["verification"]),
+                         (7, "Pub", "Ver", "https://v"))
+        self.assertEqual(content["creators"], ["Pub"])  # Sin creadores, el autor
+
+    def test_diff_ignores_empty_aredl_values(self):
+        doc = {"author": "A", "verifier": "V", "creators": ["A"], "verification": "https://old"}
+        fresh = {"author": "", "verifier": "V2", "creators": ["A"], "verification": "https://new"}
+        self.assertEqual(nwl.aredl_metadata_diff(doc, fresh),
+                         [("verifier", "V", "V2"), ("verification", "https://old", "https://new")])
+
+class AREDLCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix="nwl-aredl-cache-")
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+
+    def test_flush_prunes_entries_older_than_max_age(self):
+        cache = nwl.ContentCache(self.cache_dir, max_age=60)
+        cache.put_entry("https://aredl/levels/1", "e1", {"a": 1}, persist=False)
+        cache.put_entry("https://aredl/levels/2", "e2", {"a": 2}, persist=False)
+        cache.entries["https://aredl/levels/1"]["fetched"] -= 120
+        cache.flush()
+        self.assertEqual(list(nwl.ContentCache(self.cache_dir).entries), ["https://aredl/levels/2"])
+
+    def test_drop_entries_by_prefix(self):
+        cache = nwl.ContentCache(self.cache_dir)
+        cache.put_entry("https://api.github.com/repos/o/r/contents/data", "e", [])
+        cache.put_entry("https://aredl/levels/1", "e1", {})
+        cache.drop_entries("https://aredl/")
+        self.assertEqual(list(nwl.ContentCache(self.cache_dir).entries), ["https://api.github.com/repos/o/r/contents/data"])
+
+class ResyncTests(unittest.TestCase):
+    def setUp(self):
+        files = {
+            f"{benchmark.FOLDER}/alpha.json": level_file(101, "Alpha", "OldAuthor", "Ver1", ["C1", "C2"], "https://youtu.be/alpha"),
+            f"{benchmark.FOLDER}/beta.json": level_file(102, "Beta", "Auth2", "Ver2", ["C3"], "https://youtu.be/beta"),
+            f"{benchmark.FOLDER}/gamma.json": level_file(103, "Gamma", "GA", "OldVer", ["GA"], "https://youtu.be/gamma"),
+            f"{benchmark.FOLDER}/missing.json": level_file(404, "Missing", "M", "M", ["M"], "https://m"),
+            f"{benchmark.FOLDER}/broken.json": b"{",
+        }
+        self.github = benchmark.start_fake_github(files)
+        self.aredl = start_fake_aredl()
+        for server in (self.github, self.aredl):
+            self.addCleanup(server.server_close)
+            self.addCleanup(server.shutdown)
+        original_api = nwl.GitHubClient.API_BASE
+        nwl.GitHubClient.API_BASE = f"http://127.0.0.1:{self.github.server_port}"
+        self.addCleanup(setattr, nwl.GitHubClient, "API_BASE", original_api)
+        self.cache_dir = tempfile.mkdtemp(prefix="nwl-aredl-")
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        for name in ("showinfo", "showwarning", "showerror"):
+            patcher = mock.patch.object(nwl.messagebox, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.editor = self.make_editor()
+
+    def make_editor(self, batch=False):
+        """Editor sin ventana: solo el estado que usan el resync y la escritura de los cambios."""
+        editor = nwl.GitHubJSONEditor.__new__(nwl.GitHubJSONEditor)
+        editor.current_lang = "en"
+        editor.setup_translations()
+        editor.backend_config = {}
+        editor.github_token = "test-token"
+        editor.repo_url = f"https://github.com/{benchmark.OWNER}/{benchmark.REPO}"
+        editor.folder_path = benchmark.FOLDER
+        editor.http = nwl.HttpSession(editor.github_token)
+        editor.cache = nwl.ContentCache(self.cache_dir)
+        aredl_cache = nwl.ContentCache(os.path.join(self.cache_dir, "aredl"), max_age=nwl.AREDLClient.CACHE_KEEP)
+        editor.aredl = nwl.AREDLClient(editor.http, aredl_cache, api_base=f"http://127.0.0.1:{self.aredl.server_port}/levels")
+        editor.staged = nwl.StagedChanges()
+        editor.file_styles = {}
+        editor.workspace = nwl.Workspace()
+        editor.search_index = nwl.SearchIndex()
+        editor.current_file_name = editor.current_file_content = editor.current_file_sha = None
+        editor.batch_var = SimpleNamespace(get=lambda: batch)
+        editor.display_files = [{"name": f["name"], "file_name": f["name"], "sha": f["sha"]}
+                                for f in editor.github().list_files()]
+        editor.resync_results = []
+        editor.open_resync_window = editor.resync_results.append
+
+        def run_task(channel, func, on_success=None, on_error=None, parent=None, trace=None):
+            try:
+                result = func()
+            except Exception as e:
+                on_error(e)
+                raise
+            if on_success:
+                on_success(result)
+            return True
+
+        editor.run_task = run_task
+        return editor
+
+    def resync(self, editor=None):
+        editor = editor or self.editor
+        editor.resync_aredl_metadata()
+        return editor.resync_results[-1]
+
+    def remote_doc(self, name):
+        repository = self.github.repository
+        return repository.blobs[repository.snapshot()[f"{benchmark.FOLDER}/{name}"]]
+
+    def test_resync_reports_field_diffs_and_failures(self):
+        result = self.resync()
+        self.assertEqual(result["checked"], 4)
+        self.assertEqual(sorted(result["failed"]), ["broken.json", "missing.json"])
+        self.assertEqual(result["diffs"], [
+            ("alpha.json", "author", "OldAuthor", "NewAuthor"),
+            ("gamma.json", "verifier", "OldVer", "NewVer"),
+        ])
+
+    def test_aredl_responses_are_cached(self):
+        self.resync()
+        first = len(self.aredl.requests)
+        self.assertEqual(first, 8)  # info y creadores de cada uno de los 4 niveles con id
+        self.resync()
+        # Solo se repiten las del nivel que AREDL no tiene (los errores no se guardan)
+        self.assertEqual(sorted(self.aredl.requests[first:]), ["/levels/404", "/levels/404/creators"])
+
+    def test_apply_publishes_selected_fields_in_one_commit(self):
+        result = self.resync()
+        head = self.github.repository.head
+        win = SimpleNamespace(winfo_exists=lambda: True, destroy=lambda: None)
+        self.editor.apply_aredl_updates(result["diffs"][:1], result["docs"], win)
+
+        repository = self.github.repository
+        self.assertEqual(repository.commits[repository.head]["parents"], [head])
+        self.assertEqual(repository.commits[repository.head]["message"], "Update metadata of 1 levels from AREDL")
+        expected = level_file(101, "Alpha", "NewAuthor", "Ver1", ["C1", "C2"], "https://youtu.be/alpha")
+        self.assertEqual(self.remote_doc("alpha.json"), expected)  # mismo formato y orden de claves
+        self.assertEqual(self.remote_doc("gamma.json"), level_file(103, "Gamma", "GA", "OldVer", ["GA"], "https://youtu.be/gamma"))
+        self.assertEqual(self.editor.get_known_sha("alpha.json"), nwl.git_blob_sha(expected))
+
+    def test_apply_in_batch_mode_stages_changes(self):
+        editor = self.make_editor(batch=True)
+        result = self.resync(editor)
+        head = self.github.repository.head
+        win = SimpleNamespace(winfo_exists=lambda: True, destroy=lambda: None)
+        editor.apply_aredl_updates(result["diffs"], result["docs"], win)
+
+        self.assertEqual(self.github.repository.head, head)
+        self.assertEqual(sorted(name for name, _ in editor.staged.items()), ["alpha.json", "gamma.json"])
+        self.assertEqual(json.loads(editor.staged.get("gamma.json")["data"])["verifier"], "NewVer")
+
+    def enable_tracing(self):
+        nwl.tracer.configure(None, True)
+        nwl.tracer.spans.clear()
+        self.addCleanup(nwl.tracer.spans.clear)
+        self.addCleanup(nwl.tracer.configure, None, False)
+
+    def http_spans(self, trace):
+        return [span for span in nwl.tracer.spans if span["phase"] == "http" and span["trace"] == trace.id]
+
+    def test_import_trace_contains_its_http_spans(self):
+        self.enable_tracing()
+        trace = nwl.tracer.start("import", levels=2)
+        with nwl.tracer.activate(trace):
+            results = self.editor.aredl.fetch_levels(["101", "102"])
+        self.assertEqual(sorted(results), ["101", "102"])
+        spans = self.http_spans(trace)
+        self.assertEqual(len(spans), 4)  # las peticiones de los hilos del pool cuentan para la importación
+        self.assertTrue(all(span["operation"] == "import" for span in spans))
+
+    def test_publish_trace_contains_blob_uploads(self):
+        self.enable_tracing()
+        trace = nwl.tracer.start("publish", files=2)
+        with nwl.tracer.activate(trace):
+            self.editor.github().publish({"alpha.json": b"{}\n", "beta.json": b"[]\n"}, "two files")
+        urls = [span["url"] for span in self.http_spans(trace)]
+        self.assertEqual(sum(url.endswith("/git/blobs") for url in urls), 2)
+
+if __name__ == "__main__":
+    unittest.main()
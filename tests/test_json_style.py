@@ -0,0 +1,116 @@
+"""Pruebas del formato de los archivos (JsonStyle) y de la detección de guardados sin cambios.
+
+    python -m unittest discover tests
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import NWLmanager as nwl
+
+DOC = {
+    "id": 42,
+    "name": "Ñandú Wave, the level",
+    "creators": ["a", "b"],
+    "verification": "https://youtu.be/x",
+    "empty": {},
+    "records": [{"user": "player, one", "percent": 100, "hz": "240", "mobile": True}, {"user": "日本", "percent": 57}],
+}
+
+def variant(doc, indent=None, separators=None, ensure_ascii=False, newline="\n", final_newline=False):
+    text = json.dumps(doc, indent=indent, separators=separators, ensure_ascii=ensure_ascii)
+    text = text.replace("\n", newline)
+    return (text + newline if final_newline else text).encode("utf-8")
+
+VARIANTS = {
+    "app_default": dict(indent=2),
+    "four_spaces_final_newline": dict(indent=4, final_newline=True),
+    "tabs": dict(indent="\t", final_newline=True),
+    "crlf": dict(indent=2, newline="\r\n", final_newline=True),
+    "crlf_no_final_newline": dict(indent=4, newline="\r\n"),
+    "ensure_ascii": dict(indent=2, ensure_ascii=True),
+    "compact_key_separator": dict(indent=2, separators=(",", ":")),
+    "single_line": dict(),
+    "minified": dict(separators=(",", ":")),
+    "minified_ascii_newline": dict(separators=(",", ":"), ensure_ascii=True, final_newline=True),
+}
+
+class JsonStyleTests(unittest.TestCase):
+    def test_round_trip_keeps_every_byte(self):
+        for name, options in VARIANTS.items():
+            with self.subTest(variant=name):
+                data = variant(DOC, **options)
+                style = nwl.JsonStyle.detect(data)
+                self.assertEqual(style.encode(json.loads(data)), data)
+
+    def test_edit_changes_only_the_edited_line(self):
+        data = variant(DOC, indent=4, newline="\r\n", final_newline=True)
+        doc = json.loads(data)
+        doc["records"][1]["percent"] = 58
+        before, after = data.split(b"\r\n"), nwl.JsonStyle.detect(data).encode(doc).split(b"\r\n")
+        self.assertEqual(len(before), len(after))
+        self.assertEqual([line for old, line in zip(before, after) if old != line], [b'            "percent": 58'])
+
+    def test_separators_inside_strings_are_ignored(self):
+        # Las comas y dos puntos dentro de los valores no cuentan como separadores del archivo
+        data = b'{"name":"a, b: c","records":[{"user":"x, y"}]}'
+        self.assertEqual(nwl.JsonStyle.detect(data).encode(json.loads(data)), data)
+
+    def test_ensure_ascii_detection(self):
+        self.assertTrue(nwl.JsonStyle.detect(variant(DOC, indent=2, ensure_ascii=True)).ensure_ascii)
+        self.assertFalse(nwl.JsonStyle.detect(variant(DOC, indent=2)).ensure_ascii)
+
+    def test_default_style_is_the_app_format(self):
+        self.assertEqual(nwl.DEFAULT_JSON_STYLE.encode(DOC), json.dumps(DOC, indent=2, ensure_ascii=False).encode("utf-8"))
+
+class IsUnchangedTests(unittest.TestCase):
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp(prefix="nwl-style-")
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        self.editor = nwl.GitHubJSONEditor.__new__(nwl.GitHubJSONEditor)
+        self.editor.staged = nwl.StagedChanges()
+        self.editor.cache = nwl.ContentCache(cache_dir)
+        self.fetched = variant(DOC, indent=4, final_newline=True)
+        self.sha = nwl.git_blob_sha(self.fetched)
+
+    def unchanged(self, doc, data=None, sha="fetched"):
+        data = self.fetched if data is None else data
+        return self.editor.is_unchanged("level.json", self.sha if sha == "fetched" else sha, data, doc)
+
+    def test_same_bytes_as_fetched_sha(self):
+        self.assertTrue(self.unchanged(DOC))  # sin caché: basta el SHA
+
+    def test_real_change_is_saved(self):
+        doc = json.loads(self.fetched)
+        doc["records"].append({"user": "new"})
+        self.assertFalse(self.unchanged(doc, nwl.JsonStyle.detect(self.fetched).encode(doc)))
+
+    def test_format_only_difference_against_cached_blob(self):
+        reformatted = variant(DOC, indent=2)
+        self.assertFalse(self.unchanged(DOC, reformatted))  # sin la copia descargada no se puede asegurar
+        self.editor.cache.put_blob(self.sha, self.fetched)
+        self.assertTrue(self.unchanged(DOC, reformatted))
+
+    def test_unknown_sha_is_saved(self):
+        self.assertFalse(self.unchanged(DOC, sha=None))
+
+    def test_against_staged_bytes(self):
+        doc = dict(DOC, name="Staged name")
+        staged = nwl.DEFAULT_JSON_STYLE.encode(doc)
+        self.editor.staged.stage("level.json", staged, "stage")
+        # Lo pendiente manda sobre lo descargado, aunque el SHA coincida
+        self.assertFalse(self.unchanged(DOC))
+        self.assertTrue(self.unchanged(doc, staged))
+        self.assertTrue(self.unchanged(doc, variant(doc, indent=4)))
+
+    def test_staged_delete_is_never_unchanged(self):
+        self.editor.staged.stage_delete("level.json", "delete")
+        self.assertFalse(self.unchanged(DOC))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""Pruebas de IncrementalLevelParser: mismo resultado que json.loads, por lotes.
+
+    python -m unittest discover tests
+"""
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import NWLmanager as nwl
+
+def records(count):
+    return [{"user": f"player{i}", "link": f"https://youtu.be/{i}", "percent": 100 - i % 3, "hz": "240",
+             **({"mobile": True} if i % 4 == 0 else {})} for i in range(count)]
+
+DOCUMENTS = {
+    "empty_object": "{}",
+    "no_records": json.dumps({"id": 1, "name": "Level", "creators": ["a", "b"]}),
+    "empty_records": json.dumps({"id": 1, "records": [], "name": "after"}, indent=2),
+    "records_not_a_list": json.dumps({"id": 1, "records": None, "name": "x"}),
+    "records_first": json.dumps({"records": records(3), "id": 7, "name": "tail"}),
+    "records_last": json.dumps({"id": 7, "name": "Level", "records": records(25)}, indent=4),
+    "nested_values": json.dumps({"meta": {"records": [1, 2], "deep": {"a": [{"b": None}]}}, "records": [[1, [2]], {"k": {"v": [True, False]}}, "s", 1.5e10, -0], "z": {}}),
+    "escapes": json.dumps({"name": "Quote \" slash \\ tab \t nl \n", "author": "ñandú 🎵 \u2028", "records": [{"user": "\u00e9\u4e2d"}]}, ensure_ascii=True),
+    "unicode_raw": json.dumps({"name": "ñandú 🎵", "records": [{"user": "中文"}]}, ensure_ascii=False),
+    "key_order": '{"z": 1, "a": 2, "records": [{"b": 1, "a": 2}], "m": 3}',
+    "duplicate_keys": '{"name": "first", "id": 1, "name": "second"}',
+    "odd_whitespace": '\r\n\t{ "id" :1 ,\n"records"\t:\r\n[ {"u":1} ,\n\n{"u":2}\t] , "x" : [ ] }\n\n',
+    "top_level_list": json.dumps([{"a": 1}, 2]),
+    "top_level_scalar": ' "just a string" ',
+}
+
+MALFORMED = {
+    "empty": "",
+    "truncated_metadata": '{"id": 1, "name": "Lev',
+    "truncated_records": '{"id": 1, "records": [{"user": "a"}, {"user": "b"',
+    "missing_comma_between_records": '{"records": [{"u": 1} {"u": 2}]}',
+    "trailing_comma_in_records": '{"records": [{"u": 1},]}',
+    "trailing_comma_in_object": '{"id": 1,}',
+    "missing_colon": '{"id" 1}',
+    "unquoted_key": '{id: 1}',
+    "bad_token": '{"id": nope}',
+    "extra_data": '{"id": 1} {"id": 2}',
+    "extra_data_after_records": '{"records": [1, 2]} x',
+    "unclosed_object_after_records": '{"records": [1, 2]',
+}
+
+def parse_in_batches(text, batch):
+    """Parsea como el editor: metadatos y después records de batch en batch."""
+    parser = nwl.IncrementalLevelParser(text)
+    doc = parser.read_metadata()
+    batches = []
+    for _ in range(10000):
+        if parser.done:
+            break
+        batches.append(parser.read_records(batch))
+    else:
+        raise AssertionError("el parser no terminó")
+    return doc, batches
+
+def ordered(value):
+    """Representación que también compara el orden de las claves."""
+    if isinstance(value, dict):
+        return [(key, ordered(item)) for key, item in value.items()]
+    if isinstance(value, list):
+        return [ordered(item) for item in value]
+    return value
+
+class IncrementalLevelParserTests(unittest.TestCase):
+    def test_same_result_as_json_loads(self):
+        for name, text in DOCUMENTS.items():
+            for batch in (1, 2, 7, 100):
+                with self.subTest(document=name, batch=batch):
+                    doc, _ = parse_in_batches(text, batch)
+                    self.assertEqual(ordered(doc), ordered(json.loads(text)))
+
+    def test_metadata_is_available_before_records(self):
+        text = json.dumps({"id": 7, "name": "Level", "records": records(10), "after": 1})
+        parser = nwl.IncrementalLevelParser(text)
+        doc = parser.read_metadata()
+        self.assertEqual(doc, {"id": 7, "name": "Level", "records": []})
+        self.assertFalse(parser.done)
+        self.assertEqual(parser.read_records(4), records(10)[:4])
+        self.assertIs(doc["records"][0], parser.doc["records"][0])
+
+    def test_batch_boundaries(self):
+        text = json.dumps({"id": 1, "records": records(10), "name": "tail"})
+        doc, batches = parse_in_batches(text, 4)
+        self.assertEqual([len(batch) for batch in batches], [4, 4, 2])
+        self.assertEqual([record for batch in batches for record in batch], records(10))
+        self.assertEqual(doc["name"], "tail")
+
+        # Un lote que termina justo con la lista también cierra el documento
+        doc, batches = parse_in_batches(json.dumps({"records": records(8)}), 4)
+        self.assertEqual([len(batch) for batch in batches], [4, 4])
+
+    def test_documents_without_records_finish_in_read_metadata(self):
+        for name in ("empty_object", "no_records", "empty_records", "records_not_a_list", "top_level_list"):
+            with self.subTest(document=name):
+                parser = nwl.IncrementalLevelParser(DOCUMENTS[name])
+                parser.read_metadata()
+                self.assertTrue(parser.done)
+                self.assertEqual(parser.read_records(10), [])
+
+    def test_malformed_input_raises_like_json_loads(self):
+        for name, text in MALFORMED.items():
+            with self.subTest(document=name):
+                with self.assertRaises(json.JSONDecodeError) as expected:
+                    json.loads(text)
+                with self.assertRaises(json.JSONDecodeError) as actual:
+                    parse_in_batches(text, 1)
+                self.assertEqual((actual.exception.msg, actual.exception.pos),
+                                 (expected.exception.msg, expected.exception.pos))
+
+if __name__ == "__main__":
+    unittest.main()
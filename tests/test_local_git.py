@@ -0,0 +1,116 @@
+"""Pruebas del backend de copia local (LocalGitBackend) contra un repositorio bare temporal.
+
+    python -m unittest discover tests
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import NWLmanager as nwl
+
+REPO_URL = "https://github.com/test/nowavelist"
+FOLDER = "data"
+
+def git(*args, cwd=None):
+    command = ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com"]
+    if cwd:
+        command += ["-C", cwd]
+    return subprocess.run(command + list(args), check=True, capture_output=True, text=True).stdout
+
+def level(level_id, records=()):
+    return (json.dumps({"id": level_id, "name": f"Level {level_id}", "records": list(records)}, indent=2) + "\n").encode("utf-8")
+
+@unittest.skipUnless(shutil.which("git"), "git no está instalado")
+class LocalGitBackendTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="nwl-git-")
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.remote = os.path.join(self.tmp, "remote.git")
+        git("init", "-q", "--bare", "-b", "main", self.remote)
+        # Un segundo clon hace de "otro usuario" que sube cambios al remoto
+        self.other = os.path.join(self.tmp, "other")
+        git("clone", "-q", self.remote, self.other)
+        os.makedirs(os.path.join(self.other, FOLDER))
+        for level_id in (1, 2):
+            with open(os.path.join(self.other, FOLDER, f"l{level_id}.json"), "wb") as f:
+                f.write(level(level_id))
+        git("add", ".", cwd=self.other)
+        git("commit", "-q", "-m", "initial", cwd=self.other)
+        git("push", "-q", "origin", "HEAD:main", cwd=self.other)
+        self.backend = nwl.LocalGitBackend(REPO_URL, FOLDER, os.path.join(self.tmp, "clone"), remote=self.remote)
+
+    def remote_file(self, name):
+        return subprocess.run(["git", "-C", self.remote, "show", f"main:{FOLDER}/{name}"],
+                              capture_output=True).stdout
+
+    def remote_commits(self):
+        return git("log", "--format=%s", "main", cwd=self.remote).splitlines()
+
+    def test_list_and_read_use_the_clone(self):
+        files = self.backend.list_files()
+        self.assertEqual([f["name"] for f in files], ["l1.json", "l2.json"])
+        data, sha = self.backend.read_file("l1.json")
+        self.assertEqual(data, level(1))
+        self.assertEqual(sha, nwl.git_blob_sha(data))
+        self.assertEqual(files[0]["sha"], sha)
+
+    def test_put_file_commits_locally_until_published(self):
+        self.backend.list_files()
+        sha = self.backend.put_file("l1.json", level(1, [{"user": "a"}]), "Update l1")
+        self.assertEqual(sha, nwl.git_blob_sha(level(1, [{"user": "a"}])))
+        self.assertEqual(self.remote_file("l1.json"), level(1))
+        self.assertEqual(self.backend.unpushed_commits(), 1)
+
+        self.backend.publish({}, "nothing")
+        self.assertEqual(self.remote_file("l1.json"), level(1, [{"user": "a"}]))
+        self.assertEqual(self.backend.unpushed_commits(), 0)
+
+    def test_publish_is_a_single_commit_and_push(self):
+        self.backend.list_files()
+        new_shas = self.backend.publish({"l1.json": level(1, [{"user": "b"}]), "l2.json": None, "l3.json": level(3)},
+                                        "Update 3 files")
+        self.assertEqual(new_shas, {"l1.json": nwl.git_blob_sha(level(1, [{"user": "b"}])), "l2.json": None,
+                                    "l3.json": nwl.git_blob_sha(level(3))})
+        self.assertEqual(self.remote_commits(), ["Update 3 files", "initial"])
+        self.assertEqual(self.remote_file("l2.json"), b"")
+        self.assertEqual(self.remote_file("l3.json"), level(3))
+
+    def test_publish_rebases_over_remote_changes(self):
+        self.backend.list_files()
+        with open(os.path.join(self.other, FOLDER, "l2.json"), "wb") as f:
+            f.write(level(2, [{"user": "other"}]))
+        git("commit", "-q", "-am", "remote edit", cwd=self.other)
+        git("push", "-q", "origin", "HEAD:main", cwd=self.other)
+
+        self.backend.publish({"l1.json": level(1, [{"user": "me"}])}, "local edit")
+        self.assertEqual(self.remote_commits(), ["local edit", "remote edit", "initial"])
+        self.assertEqual(self.remote_file("l2.json"), level(2, [{"user": "other"}]))
+
+    def test_sync_folder_pulls_and_pushes_pending_commits(self):
+        self.backend.list_files()
+        self.backend.delete_file("l1.json", None, "Delete l1")
+        with open(os.path.join(self.other, FOLDER, "l2.json"), "wb") as f:
+            f.write(level(2, [{"user": "other"}]))
+        git("commit", "-q", "-am", "remote edit", cwd=self.other)
+        git("push", "-q", "origin", "HEAD:main", cwd=self.other)
+
+        stats = self.backend.sync_folder()
+        self.assertEqual([f["name"] for f in stats["files"]], ["l2.json"])
+        self.assertEqual(stats["downloaded"], 1)
+        self.assertEqual(self.backend.read_file("l2.json")[0], level(2, [{"user": "other"}]))
+        self.assertEqual(self.remote_commits(), ["Delete l1", "remote edit", "initial"])
+        self.assertEqual(self.backend.unpushed_commits(), 0)
+
+    def test_unchanged_write_creates_no_commit(self):
+        self.backend.list_files()
+        self.backend.put_file("l1.json", level(1), "no-op")
+        self.assertEqual(self.backend.unpushed_commits(), 0)
+
+if __name__ == "__main__":
+    unittest.main()